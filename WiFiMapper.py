@@ -1,36 +1,406 @@
 import sys
 import os
 import time
-import math
-import json
-import csv
-import datetime
 import platform
+import tempfile
+from collections import OrderedDict
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QComboBox, QFileDialog, QTabWidget,
     QTableWidget, QTableWidgetItem, QLineEdit, QSpinBox,
     QCheckBox, QMessageBox, QProgressBar, QDockWidget, QToolBar,
     QStatusBar, QDialog, QFormLayout, QDoubleSpinBox, QTextEdit,
-    QGroupBox
+    QGroupBox, QTableView, QAbstractItemView
 )
 from PyQt6.QtGui import (
-    QIcon, QPainter, QPen, QBrush, QColor, QFont, QPixmap, QAction
+    QIcon, QPainter, QPen, QBrush, QColor, QFont, QPixmap, QAction, QTransform
+)
+from PyQt6.QtCore import (
+    Qt, QTimer, QRectF, QSize, QTranslator, QLocale, QThread, pyqtSignal,
+    QAbstractTableModel, QModelIndex
 )
-from PyQt6.QtCore import Qt, QTimer, QRectF, QSize, QTranslator, QLocale
 import pyqtgraph as pg
 import numpy as np
-import pandas as pd
-try:
-    import pywifi
-    from pywifi import const
-except ImportError:
-    pywifi = None
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-import qdarkstyle
-from PIL import Image
+
+from wifimapper_core.building import (
+    FLOOR_ATTENUATION_DB, FLOOR_HEIGHT_M, Building, Floor, building_sources, compute_building_heatmap
+)
+from wifimapper_core.channels import (
+    PLAN_CHANNELS, ap_coupling_dbm, external_costs, interferers, plan_channels, recommend_channel
+)
+from wifimapper_core.deadzones import DEAD_ZONE_DBM, find_dead_zones
+from wifimapper_core.exporters import HISTORY_EXPORTERS
+from wifimapper_core.georef import GeoTransform
+from wifimapper_core.heatmap import (
+    DEFAULT_METERS_PER_PIXEL, PARALLEL_MIN_EVALUATIONS, HeatmapCache, HeatmapCancelled,
+    HeatmapLayers, calibrated_sources, compute_heatmap, compute_heatmap_parallel,
+    heatmap_cache_key, heatmap_executor
+)
+from wifimapper_core.history import ScanHistory
+from wifimapper_core.interpolation import INTERPOLATORS, SurveyPoints
+from wifimapper_core.metrics import METRICS, span
+from wifimapper_core.placement import (
+    COVERAGE_TARGET, COVERAGE_THRESHOLD_DBM, plan_ap_placement, placement_resolution
+)
+from wifimapper_core.project import load_project_file, save_project_file
+from wifimapper_core.propagation import (
+    AP_CLIENT_CAPACITY, AP_TX_POWER_DBM, BAND_CENTER_MHZ, WALL_ATTENUATION_DB, WallCrossingIndex,
+    predict_coverage, wall_raster_from_blocks
+)
+from wifimapper_core.reports import network_positions, write_csv_report, write_kmz_report, write_pdf_report
+from wifimapper_core.scanner import ScanTimingPolicy, open_wifi, scan_all
+from wifimapper_core.surveydb import SurveyDatabase
+from wifimapper_core.tiles import FloorPlanPyramid
+
+pg.setConfigOptions(imageAxisOrder='row-major')
+
+
+FLOOR_PLAN_TILE_CACHE = 64  # Decoded tiles kept in memory (768 KiB each at 512 x 512)
+
+# Stacked floor view: each floor's heatmap is drawn as a sheared, flattened
+# layer, ground floor at the bottom
+STACK_SHEAR = 0.5  # Horizontal shift of the back edge, as a share of the plan depth
+STACK_SQUASH = 0.35  # Drawn depth of a layer relative to the plan depth
+STACK_GAP = 0.15  # Space between layers, relative to the plan depth
+
+
+class FloorPlanTiles:
+    # Shows the pyramid tiles that cover the visible part of a plot, at the
+    # level matching the current zoom, so memory does not grow with plan size
+    def __init__(self, plot, pyramid, max_cached=FLOOR_PLAN_TILE_CACHE):
+        self.plot = plot
+        self.pyramid = pyramid
+        self.max_cached = max_cached
+        self.items = {}  # (level, row, col) -> ImageItem in the plot
+        self.cache = OrderedDict()  # (level, row, col) -> decoded tile
+        self.plot.vb.sigRangeChanged.connect(self.update_view)
+        
+    def attach(self):
+        # After the plot has been cleared
+        self.items = {}
+        self.update_view()
+        
+    def detach(self):
+        self.plot.vb.sigRangeChanged.disconnect(self.update_view)
+        for item in self.items.values():
+            self.plot.removeItem(item)
+        self.items = {}
+        
+    def tile(self, key):
+        tile = self.cache.get(key)
+        if tile is None:
+            tile = self.cache[key] = self.pyramid.load_tile(*key)
+            while len(self.cache) > self.max_cached:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return tile
+        
+    def update_view(self, *args):
+        (left, right), (top, bottom) = self.plot.vb.viewRange()
+        pixel_width, pixel_height = self.plot.vb.viewPixelSize()
+        level = self.pyramid.level_for_scale(max(pixel_width, pixel_height))
+        wanted = {
+            (level, row, col)
+            for row, col in self.pyramid.visible_tiles(level, left, top, right, bottom)
+        }
+        for key in set(self.items) - wanted:
+            self.plot.removeItem(self.items.pop(key))
+        for key in wanted - set(self.items):
+            item = pg.ImageItem(self.tile(key))
+            item.setRect(QRectF(*self.pyramid.tile_rect(*key)))
+            item.setZValue(-1)
+            self.plot.addItem(item)
+            self.items[key] = item
+
+
+class HeatmapWorker(QThread):
+    # Runs compute_heatmap_parallel off the GUI thread
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, executor, shape, resolution, sources, options, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.shape = shape
+        self.resolution = resolution
+        self.sources = sources
+        self.options = options
+        self.cancel_requested = False
+        
+    def cancel(self):
+        self.cancel_requested = True
+        
+    def run(self):
+        try:
+            grid = compute_heatmap_parallel(
+                self.executor, self.shape, self.resolution, *self.sources,
+                progress=lambda done, total: self.progress.emit(int(done * 100 / total)),
+                cancelled=lambda: self.cancel_requested, **self.options
+            )
+        except HeatmapCancelled:
+            self.failed.emit("Heatmap generation cancelled")
+            return
+        except Exception as e:
+            self.failed.emit(f"Heatmap generation failed: {str(e)}")
+            return
+        self.result_ready.emit(grid)
+
+
+class BuildingHeatmapWorker(QThread):
+    # Runs compute_building_heatmap off the GUI thread, with the same signals
+    # and cancel() as HeatmapWorker
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, building, shape, resolution, sources, options, parent=None):
+        super().__init__(parent)
+        self.building = building
+        self.shape = shape
+        self.resolution = resolution
+        self.sources = sources
+        self.options = options
+        self.cancel_requested = False
+        
+    def cancel(self):
+        self.cancel_requested = True
+        
+    def run(self):
+        try:
+            stack = compute_building_heatmap(
+                self.building, self.shape, self.resolution, *self.sources,
+                progress=lambda done, total: self.progress.emit(int(done * 100 / total)),
+                cancelled=lambda: self.cancel_requested, **self.options
+            )
+        except HeatmapCancelled:
+            self.failed.emit("Heatmap generation cancelled")
+            return
+        except Exception as e:
+            self.failed.emit(f"Heatmap generation failed: {str(e)}")
+            return
+        self.result_ready.emit(stack)
+
+
+class PlacementWorker(QThread):
+    # Runs plan_ap_placement off the GUI thread
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, args, options, parent=None):
+        super().__init__(parent)
+        self.args = args
+        self.options = options
+        
+    def run(self):
+        try:
+            result = plan_ap_placement(*self.args, **self.options)
+        except Exception as e:
+            self.failed.emit(f"AP placement failed: {str(e)}")
+            return
+        self.result_ready.emit(result)
+
+
+class ScanWorker(QThread):
+    # Scans every interface concurrently off the GUI thread
+    progress = pyqtSignal(int)
+    interface_error = pyqtSignal(int, str)
+    scan_failed = pyqtSignal(str)
+    results_ready = pyqtSignal(list)
+    
+    def __init__(self, wifi, band, policy, parent=None):
+        super().__init__(parent)
+        self.wifi = wifi
+        self.band = band
+        self.policy = policy
+        
+    def run(self):
+        try:
+            networks = scan_all(
+                self.wifi, self.band, self.policy,
+                progress=lambda done, total: self.progress.emit(int(done * 100 / total)),
+                on_error=self.interface_error.emit
+            )
+        except Exception as e:
+            self.scan_failed.emit(f"Network scan failed: {str(e)}")
+            return
+        self.results_ready.emit(networks)
+
+
+NETWORK_COLUMNS = [
+    ("SSID", 'ssid', "{}"), ("BSSID", 'bssid', "{}"), ("Channel", 'channel', "{}"),
+    ("RSSI (dBm)", 'rssi', "{}"), ("Security", 'security', "{}"),
+    ("Frequency", 'frequency', "{:.0f} MHz"), ("SNR", 'snr', "{}")
+]
+
+
+class NetworkTableModel(QAbstractTableModel):
+    # Rows keyed by BSSID; each scan applies only the inserted, removed and
+    # changed rows. Sorting is done here rather than in a proxy model, which
+    # would call data() from C++ for every comparison on every update
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._row_of = {}
+        self._sort_column = None
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+        
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(NETWORK_COLUMNS)
+        
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            _, field, fmt = NETWORK_COLUMNS[index.column()]
+            return fmt.format(getattr(self._rows[index.row()], field))
+        return None
+        
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return NETWORK_COLUMNS[section][0]
+        return None
+        
+    def network(self, row):
+        return self._rows[row]
+        
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        self._apply_sort()
+        self.layoutChanged.emit()
+        
+    def _apply_sort(self):
+        # Re-point persistent indexes (selection, current item) by BSSID
+        persistent = self.persistentIndexList()
+        anchors = [(self._rows[index.row()].bssid, index.column()) for index in persistent]
+        field = NETWORK_COLUMNS[self._sort_column][1]
+        self._rows.sort(
+            key=lambda network: getattr(network, field),
+            reverse=self._sort_order == Qt.SortOrder.DescendingOrder
+        )
+        self._row_of = {network.bssid: row for row, network in enumerate(self._rows)}
+        self.changePersistentIndexList(
+            persistent, [self.index(self._row_of[bssid], column) for bssid, column in anchors]
+        )
+        
+    def update_networks(self, networks):
+        incoming = {}
+        for network in networks:
+            # The same BSSID seen by several interfaces keeps its strongest reading
+            current = incoming.get(network.bssid)
+            if current is None or network.rssi > current.rssi:
+                incoming[network.bssid] = network
+                
+        # Remove vanished BSSIDs in contiguous blocks, bottom-up so row numbers stay valid
+        removed = sorted((row for bssid, row in self._row_of.items() if bssid not in incoming), reverse=True)
+        i = 0
+        while i < len(removed):
+            last = first = removed[i]
+            while i + 1 < len(removed) and removed[i + 1] == first - 1:
+                i += 1
+                first = removed[i]
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first:last + 1]
+            self.endRemoveRows()
+            i += 1
+        if removed:
+            self._row_of = {network.bssid: row for row, network in enumerate(self._rows)}
+            
+        changed = []
+        for row, network in enumerate(self._rows):
+            update = incoming[network.bssid]
+            if update != network:
+                self._rows[row] = update
+                changed.append(row)
+                
+        added = [network for bssid, network in incoming.items() if bssid not in self._row_of]
+        if added:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for row, network in enumerate(added, start=first):
+                self._rows.append(network)
+                self._row_of[network.bssid] = row
+            self.endInsertRows()
+            
+        if self._sort_column is not None and (changed or added):
+            self.layoutAboutToBeChanged.emit()
+            self._apply_sort()
+            self.layoutChanged.emit()
+        elif changed:
+            # One notification for the span of updated rows
+            self.dataChanged.emit(
+                self.index(changed[0], 0), self.index(changed[-1], len(NETWORK_COLUMNS) - 1)
+            )
+        return len(added), len(removed), len(changed)
+
+
+class GeoreferenceDialog(QDialog):
+    # Control points pairing floor plan pixels with latitude and longitude.
+    # The dialog is not modal: clicking the floor plan fills in the pixel
+    # position of the selected row
+    COLUMNS = ("X (px)", "Y (px)", "Latitude", "Longitude")
+    
+    def __init__(self, control_points, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Georeference Floor Plan")
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(
+            "Select a row and click its point on the floor plan, then enter the point's "
+            "latitude and longitude. At least three points are needed."
+        ))
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        layout.addWidget(self.table)
+        for point in control_points or [(None,) * 4] * 3:
+            self.add_row(point)
+        self.table.setCurrentCell(0, 0)
+        
+        buttons = QHBoxLayout()
+        add_button = QPushButton("Add Point")
+        add_button.clicked.connect(lambda: self.add_row())
+        buttons.addWidget(add_button)
+        remove_button = QPushButton("Remove Point")
+        remove_button.clicked.connect(lambda: self.table.removeRow(self.table.currentRow()))
+        buttons.addWidget(remove_button)
+        self.apply_button = QPushButton("Apply")
+        buttons.addWidget(self.apply_button)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        buttons.addWidget(cancel_button)
+        layout.addLayout(buttons)
+        
+    def add_row(self, point=(None,) * 4):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for column, value in enumerate(point):
+            self.table.setItem(row, column, QTableWidgetItem("" if value is None else repr(value)))
+        self.table.setCurrentCell(row, 0)
+        
+    def set_pixel(self, x, y):
+        row = self.table.currentRow()
+        if row < 0:
+            return
+        self.table.setItem(row, 0, QTableWidgetItem(f"{x:.1f}"))
+        self.table.setItem(row, 1, QTableWidgetItem(f"{y:.1f}"))
+        
+    def control_points(self):
+        # (x, y, latitude, longitude) per filled-in row; raises ValueError
+        # for rows that are incomplete or not numbers
+        points = []
+        for row in range(self.table.rowCount()):
+            texts = [self.table.item(row, column).text().strip() if self.table.item(row, column) else ""
+                     for column in range(len(self.COLUMNS))]
+            if any(texts):
+                try:
+                    points.append(tuple(float(text) for text in texts))
+                except ValueError:
+                    raise ValueError(f"Row {row + 1} is incomplete or not numeric") from None
+        return points
+
 
 class WiFiMapper(QMainWindow):
     def __init__(self):
@@ -43,8 +413,35 @@ class WiFiMapper(QMainWindow):
         
         # Initialize variables
         self.scan_data = []
-        self.heatmap_data = []
+        self.scan_history = ScanHistory()
+        self.heatmap_data = np.empty((0, 0))
+        self.heatmap_data_resolution = None
         self.floor_plan = None
+        self.building = Building()
+        self.current_floor = 0
+        self.ap_positions = self.building.floors[0].ap_positions  # BSSID -> (x, y) in floor plan pixels
+        self.floor_pyramids = {}  # Floor plan file -> FloorPlanPyramid, opened on first view
+        self.building_heatmap = None  # (floors, rows, cols); heatmap_data is a slice of it
+        self.building_heatmap_resolution = None
+        self.stacked_source = None  # Result the stacked view was last drawn from
+        self.scanner_position = None
+        self.meters_per_pixel = DEFAULT_METERS_PER_PIXEL
+        self.sim_ap_positions = []  # Simulated AP placements (x, y) in floor plan pixels
+        self.georeference = None  # GeoTransform from floor plan pixels to longitude/latitude
+        self.georeference_dialog = None
+        self.wall_index = None
+        self.wall_raster = None
+        self.wall_index_key = None
+        self.placement_worker = None
+        self.heatmap_executor = None
+        self.heatmap_worker = None
+        self.heatmap_cache = HeatmapCache()
+        self.heatmap_layers = None
+        self.survey_points = SurveyPoints()
+        self.survey_db = None  # SurveyDatabase every scan is appended to, when one is open
+        self.survey_db_scan = None  # Number of the scan in scan_data within survey_db
+        self.floor_plan_key = None
+        self.floor_plan_tiles = None
         self.current_theme = "Windows 11"
         self.current_language = "English"
         self.themes = {
@@ -65,11 +462,13 @@ class WiFiMapper(QMainWindow):
         
         # Initialize WiFi interface
         self.wifi = None
-        if pywifi:
-            try:
-                self.wifi = pywifi.PyWiFi()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to initialize pywifi: {str(e)}")
+        self.scan_worker = None
+        self.scan_policy = ScanTimingPolicy()
+        try:
+            # $WIFIMAPPER_BACKEND selects e.g. the simulated backend
+            self.wifi = open_wifi()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to initialize WiFi scanning: {str(e)}")
         
         # Initialize UI
         self.init_ui()
@@ -93,6 +492,9 @@ class WiFiMapper(QMainWindow):
         self.control_widget = QWidget()
         self.control_layout = QVBoxLayout(self.control_widget)
         
+        # Performance dock
+        self.create_performance_dock()
+        
         # Menu bar
         self.create_menu_bar()
         
@@ -112,15 +514,24 @@ class WiFiMapper(QMainWindow):
         self.heatmap_layout = QVBoxLayout(self.heatmap_tab)
         self.heatmap_widget = pg.GraphicsLayoutWidget()
         self.heatmap_layout.addWidget(self.heatmap_widget)
+        self.stack_widget = pg.GraphicsLayoutWidget()
+        self.stack_widget.hide()
+        self.heatmap_layout.addWidget(self.stack_widget)
         self.tabs.addTab(self.heatmap_tab, "Heatmap")
         
         # Network Analysis tab
         self.analysis_tab = QWidget()
         self.analysis_layout = QVBoxLayout(self.analysis_tab)
-        self.network_table = QTableWidget()
+        self.network_table = QTableView()
         self.analysis_layout.addWidget(self.network_table)
         self.tabs.addTab(self.analysis_tab, "Network Analysis")
         
+        # Signal history tab
+        self.history_tab = QWidget()
+        self.history_layout = QVBoxLayout(self.history_tab)
+        self.create_history_ui()
+        self.tabs.addTab(self.history_tab, "Signal History")
+        
         # Settings tab
         self.settings_tab = QWidget()
         self.settings_layout = QVBoxLayout(self.settings_tab)
@@ -151,6 +562,14 @@ class WiFiMapper(QMainWindow):
         load_action.triggered.connect(self.load_floor_plan)
         file_menu.addAction(load_action)
         
+        georeference_action = QAction("Georeference Floor Plan", self)
+        georeference_action.triggered.connect(self.georeference_floor_plan)
+        file_menu.addAction(georeference_action)
+        
+        open_action = QAction("Open Project", self)
+        open_action.triggered.connect(self.load_project)
+        file_menu.addAction(open_action)
+        
         save_action = QAction("Save Project", self)
         save_action.triggered.connect(self.save_project)
         file_menu.addAction(save_action)
@@ -159,6 +578,14 @@ class WiFiMapper(QMainWindow):
         export_action.triggered.connect(self.export_report)
         file_menu.addAction(export_action)
         
+        export_history_action = QAction("Export Scan History", self)
+        export_history_action.triggered.connect(self.export_history)
+        file_menu.addAction(export_history_action)
+        
+        survey_db_action = QAction("Open Survey Database", self)
+        survey_db_action.triggered.connect(self.open_survey_database)
+        file_menu.addAction(survey_db_action)
+        
         # View menu
         view_menu = menu_bar.addMenu("View")
         theme_menu = view_menu.addMenu("Themes")
@@ -168,6 +595,8 @@ class WiFiMapper(QMainWindow):
             theme_action.triggered.connect(lambda checked, t=theme: self.set_theme(t))
             theme_menu.addAction(theme_action)
         
+        view_menu.addAction(self.performance_dock.toggleViewAction())
+        
         # Language menu
         lang_menu = menu_bar.addMenu("Language")
         for lang in self.translations.keys():
@@ -244,15 +673,83 @@ class WiFiMapper(QMainWindow):
         heatmap_layout.addRow("Resolution:", self.heatmap_resolution)
         
         self.heatmap_3d = QCheckBox("3D Heatmap")
+        self.heatmap_3d.setToolTip("Show the heatmaps of all floors stacked")
+        self.heatmap_3d.toggled.connect(self.set_stacked_view)
         heatmap_layout.addRow(self.heatmap_3d)
         
+        self.heatmap_source = QComboBox()
+        self.heatmap_source.addItems(["Propagation Model", *INTERPOLATORS])
+        heatmap_layout.addRow("Heatmap Source:", self.heatmap_source)
+        
+        self.record_survey = QCheckBox("Record survey points by clicking the heatmap")
+        heatmap_layout.addRow(self.record_survey)
+        
+        self.clear_survey_button = QPushButton("Clear Survey Points")
+        self.clear_survey_button.clicked.connect(self.clear_survey)
+        heatmap_layout.addRow(self.clear_survey_button)
+        
+        self.live_heatmap = QCheckBox("Live Heatmap")
+        self.live_heatmap.setToolTip("Update the heatmap incrementally after every scan")
+        heatmap_layout.addRow(self.live_heatmap)
+        
+        self.heatmap_workers = QSpinBox()
+        self.heatmap_workers.setRange(1, max(os.cpu_count() or 1, 1))
+        self.heatmap_workers.setValue(max(os.cpu_count() or 1, 1))
+        self.heatmap_workers.valueChanged.connect(self.shutdown_heatmap_executor)
+        heatmap_layout.addRow("Worker Processes:", self.heatmap_workers)
+        
+        self.cancel_heatmap_button = QPushButton("Cancel Heatmap")
+        self.cancel_heatmap_button.setEnabled(False)
+        self.cancel_heatmap_button.clicked.connect(self.cancel_heatmap)
+        heatmap_layout.addRow(self.cancel_heatmap_button)
+        
         heatmap_group.setLayout(heatmap_layout)
         self.control_layout.addWidget(heatmap_group)
         
+        # Building floors
+        building_group = QGroupBox("Building")
+        building_layout = QFormLayout()
+        
+        self.floor_select = QComboBox()
+        self.floor_select.currentIndexChanged.connect(self.select_floor)
+        building_layout.addRow("Floor:", self.floor_select)
+        
+        self.add_floor_button = QPushButton("Add Floor")
+        self.add_floor_button.clicked.connect(self.add_floor)
+        building_layout.addRow(self.add_floor_button)
+        
+        self.remove_floor_button = QPushButton("Remove Floor")
+        self.remove_floor_button.clicked.connect(self.remove_floor)
+        building_layout.addRow(self.remove_floor_button)
+        
+        self.floor_height = QDoubleSpinBox()
+        self.floor_height.setRange(2.0, 10.0)
+        self.floor_height.setSingleStep(0.1)
+        self.floor_height.setSuffix(" m")
+        self.floor_height.setValue(FLOOR_HEIGHT_M)
+        self.floor_height.valueChanged.connect(self.set_floor_geometry)
+        building_layout.addRow("Floor Height:", self.floor_height)
+        
+        self.slab_attenuation = QDoubleSpinBox()
+        self.slab_attenuation.setRange(0.0, 60.0)
+        self.slab_attenuation.setSuffix(" dB")
+        self.slab_attenuation.setValue(FLOOR_ATTENUATION_DB)
+        self.slab_attenuation.setToolTip("Attenuation of the slab below this floor")
+        self.slab_attenuation.valueChanged.connect(self.set_floor_geometry)
+        building_layout.addRow("Slab Attenuation:", self.slab_attenuation)
+        
+        building_group.setLayout(building_layout)
+        self.control_layout.addWidget(building_group)
+        self.refresh_floor_select()
+        
         # Analysis controls
         analysis_group = QGroupBox("Analysis Controls")
         analysis_layout = QFormLayout()
         
+        self.channel_width = QComboBox()
+        self.channel_width.addItems(["20 MHz", "40 MHz", "80 MHz", "160 MHz"])
+        analysis_layout.addRow("Channel Width:", self.channel_width)
+        
         self.channel_optimize = QPushButton("Optimize Channels")
         self.channel_optimize.clicked.connect(self.optimize_channels)
         analysis_layout.addRow(self.channel_optimize)
@@ -301,9 +798,137 @@ class WiFiMapper(QMainWindow):
         self.offline_mode = QCheckBox("Offline Mode")
         network_layout.addRow(self.offline_mode)
         
+        self.scan_min_wait = QDoubleSpinBox()
+        self.scan_min_wait.setRange(0.1, 10.0)
+        self.scan_min_wait.setSingleStep(0.1)
+        self.scan_min_wait.setSuffix(" s")
+        self.scan_min_wait.setValue(self.scan_policy.min_wait)
+        self.scan_min_wait.valueChanged.connect(self.set_scan_timing)
+        network_layout.addRow("Min Scan Wait:", self.scan_min_wait)
+        
+        self.scan_max_wait = QDoubleSpinBox()
+        self.scan_max_wait.setRange(0.5, 30.0)
+        self.scan_max_wait.setSingleStep(0.5)
+        self.scan_max_wait.setSuffix(" s")
+        self.scan_max_wait.setValue(self.scan_policy.max_wait)
+        self.scan_max_wait.valueChanged.connect(self.set_scan_timing)
+        network_layout.addRow("Scan Timeout:", self.scan_max_wait)
+        
+        self.history_retention = QSpinBox()
+        self.history_retention.setRange(1, 72)
+        self.history_retention.setSuffix(" h")
+        self.history_retention.setValue(int(self.scan_history.retention // 3600))
+        self.history_retention.valueChanged.connect(self.set_history_retention)
+        network_layout.addRow("History Retention:", self.history_retention)
+        
         network_group.setLayout(network_layout)
         self.settings_layout.addWidget(network_group)
         
+        # Heatmap cache settings
+        cache_group = QGroupBox("Heatmap Cache")
+        cache_layout = QFormLayout()
+        
+        self.heatmap_cache_size = QSpinBox()
+        self.heatmap_cache_size.setRange(16, 8192)
+        self.heatmap_cache_size.setSingleStep(64)
+        self.heatmap_cache_size.setSuffix(" MB")
+        self.heatmap_cache_size.setValue(self.heatmap_cache.max_bytes // (1024 * 1024))
+        self.heatmap_cache_size.valueChanged.connect(self.set_heatmap_cache)
+        cache_layout.addRow("Memory Limit:", self.heatmap_cache_size)
+        
+        self.heatmap_cache_spill = QCheckBox("Spill Evicted Heatmaps to Disk")
+        self.heatmap_cache_spill.toggled.connect(self.set_heatmap_cache)
+        cache_layout.addRow(self.heatmap_cache_spill)
+        
+        cache_group.setLayout(cache_layout)
+        self.settings_layout.addWidget(cache_group)
+        
+    def create_performance_dock(self):
+        self.performance_dock = QDockWidget("Performance", self)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.performance_dock)
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        controls = QHBoxLayout()
+        self.metrics_enabled = QCheckBox("Collect Timings")
+        self.metrics_enabled.setChecked(METRICS.enabled)
+        self.metrics_enabled.toggled.connect(self.set_metrics_enabled)
+        controls.addWidget(self.metrics_enabled)
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.reset_metrics)
+        controls.addWidget(reset_button)
+        export_button = QPushButton("Export...")
+        export_button.clicked.connect(self.export_metrics)
+        controls.addWidget(export_button)
+        layout.addLayout(controls)
+        
+        self.metrics_table = QTableWidget(0, 6)
+        self.metrics_table.setHorizontalHeaderLabels(
+            ["Span", "Count", "Mean (ms)", "Max (ms)", "Last (ms)", "Total (s)"]
+        )
+        self.metrics_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.metrics_table)
+        self.performance_dock.setWidget(widget)
+        self.performance_dock.setVisible(METRICS.enabled)
+        
+        # Refreshed only while the dock is shown
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.update_metrics_table)
+        self.performance_dock.visibilityChanged.connect(
+            lambda visible: self.metrics_timer.start(1000) if visible else self.metrics_timer.stop()
+        )
+        
+    def set_metrics_enabled(self, enabled):
+        METRICS.enabled = enabled
+        
+    def reset_metrics(self):
+        METRICS.reset()
+        self.update_metrics_table()
+        
+    def update_metrics_table(self):
+        spans = METRICS.snapshot()
+        self.metrics_table.setRowCount(len(spans))
+        for row, item in enumerate(spans):
+            labels = ", ".join(f"{key}={value}" for key, value in item['labels'].items())
+            values = [
+                f"{item['name']} ({labels})" if labels else item['name'], str(item['count']),
+                f"{item['mean_s'] * 1000:.1f}", f"{item['max_s'] * 1000:.1f}",
+                f"{item['last_s'] * 1000:.1f}", f"{item['total_s']:.2f}"
+            ]
+            for column, value in enumerate(values):
+                self.metrics_table.setItem(row, column, QTableWidgetItem(value))
+                
+    def export_metrics(self):
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Export Metrics", "", "JSON Files (*.json);;Prometheus Text (*.prom)"
+        )
+        if not file_name:
+            return
+        try:
+            METRICS.dump(file_name)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Metrics export failed: {str(e)}")
+            return
+        self.status_bar.showMessage(f"Metrics exported to {file_name}")
+        
+    def create_history_ui(self):
+        controls = QHBoxLayout()
+        self.history_window = QComboBox()
+        self.history_windows = {"5 minutes": 300, "15 minutes": 900, "1 hour": 3600, "All": None}
+        self.history_window.addItems(self.history_windows.keys())
+        self.history_window.setCurrentText("15 minutes")
+        self.history_window.currentTextChanged.connect(self.update_history_plot)
+        controls.addWidget(QLabel("Window:"))
+        controls.addWidget(self.history_window)
+        self.history_stats = QLabel("Select networks in the Network Analysis tab")
+        controls.addWidget(self.history_stats, 1)
+        self.history_layout.addLayout(controls)
+        
+        self.history_plot = pg.PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
+        self.history_plot.setLabel('left', "RSSI", units="dBm")
+        self.history_plot.addLegend()
+        self.history_layout.addWidget(self.history_plot)
+        
     def create_simulation_ui(self):
         # Simulation controls
         sim_group = QGroupBox("Simulation Controls")
@@ -322,6 +947,13 @@ class WiFiMapper(QMainWindow):
         self.device_count.setValue(10)
         sim_layout.addRow("Device Count:", self.device_count)
         
+        self.place_aps = QCheckBox("Place APs by clicking the heatmap")
+        sim_layout.addRow(self.place_aps)
+        
+        self.clear_aps_button = QPushButton("Clear Placed APs")
+        self.clear_aps_button.clicked.connect(self.clear_sim_aps)
+        sim_layout.addRow(self.clear_aps_button)
+        
         self.simulate_button = QPushButton("Run Simulation")
         self.simulate_button.clicked.connect(self.simulate_network)
         sim_layout.addRow(self.simulate_button)
@@ -329,6 +961,41 @@ class WiFiMapper(QMainWindow):
         sim_group.setLayout(sim_layout)
         self.simulation_layout.addWidget(sim_group)
         
+        # AP placement optimizer
+        placement_group = QGroupBox("AP Placement Optimizer")
+        placement_layout = QFormLayout()
+        
+        self.coverage_threshold = QSpinBox()
+        self.coverage_threshold.setRange(-90, -40)
+        self.coverage_threshold.setValue(int(COVERAGE_THRESHOLD_DBM))
+        self.coverage_threshold.setSuffix(" dBm")
+        placement_layout.addRow("Coverage Threshold:", self.coverage_threshold)
+        
+        self.coverage_target = QSpinBox()
+        self.coverage_target.setRange(50, 100)
+        self.coverage_target.setValue(int(COVERAGE_TARGET * 100))
+        self.coverage_target.setSuffix(" % of area")
+        placement_layout.addRow("Coverage Target:", self.coverage_target)
+        
+        self.device_density = QDoubleSpinBox()
+        self.device_density.setRange(0, 100)
+        self.device_density.setValue(2.0)
+        self.device_density.setSuffix(" per 100 m²")
+        placement_layout.addRow("Device Density:", self.device_density)
+        
+        self.candidate_spacing = QDoubleSpinBox()
+        self.candidate_spacing.setRange(1, 50)
+        self.candidate_spacing.setValue(5.0)
+        self.candidate_spacing.setSuffix(" m")
+        placement_layout.addRow("Candidate Site Spacing:", self.candidate_spacing)
+        
+        self.optimize_placement_button = QPushButton("Optimize AP Placement")
+        self.optimize_placement_button.clicked.connect(self.optimize_ap_placement)
+        placement_layout.addRow(self.optimize_placement_button)
+        
+        placement_group.setLayout(placement_layout)
+        self.simulation_layout.addWidget(placement_group)
+        
         # Simulation results
         self.sim_results = QTextEdit()
         self.sim_results.setReadOnly(True)
@@ -337,6 +1004,7 @@ class WiFiMapper(QMainWindow):
     def init_heatmap(self):
         self.heatmap_plot = self.heatmap_widget.addPlot()
         self.heatmap_plot.setAspectLocked(True)
+        self.heatmap_plot.invertY(True)
         self.heatmap_image = pg.ImageItem()
         self.heatmap_plot.addItem(self.heatmap_image)
         
@@ -347,17 +1015,44 @@ class WiFiMapper(QMainWindow):
         )
         self.heatmap_widget.addItem(self.color_bar)
         
+        self.sim_ap_markers = pg.ScatterPlotItem(
+            size=12, symbol='t', pen=pg.mkPen('w'), brush=pg.mkBrush(255, 0, 0)
+        )
+        self.heatmap_plot.addItem(self.sim_ap_markers)
+        self.survey_markers = pg.ScatterPlotItem(
+            size=7, symbol='o', pen=pg.mkPen('k'), brush=pg.mkBrush(255, 255, 255)
+        )
+        self.heatmap_plot.addItem(self.survey_markers)
+        self.dead_zone_overlay = pg.ImageItem()
+        self.heatmap_plot.addItem(self.dead_zone_overlay)
+        self.dead_zone_markers = pg.ScatterPlotItem(
+            size=10, symbol='x', pen=pg.mkPen('w'), brush=pg.mkBrush(255, 0, 0)
+        )
+        self.heatmap_plot.addItem(self.dead_zone_markers)
+        self.heatmap_plot.scene().sigMouseClicked.connect(self.on_heatmap_clicked)
+        
+        self.stack_plot = self.stack_widget.addPlot()
+        self.stack_plot.setAspectLocked(True)
+        self.stack_plot.invertY(True)
+        self.stack_plot.hideAxis('left')
+        self.stack_plot.hideAxis('bottom')
+        self.stack_color_bar = pg.ColorBarItem(
+            values=(-100, 0),
+            colorMap=pg.colormap.get("viridis")
+        )
+        self.stack_widget.addItem(self.stack_color_bar)
+        
     def init_network_table(self):
-        self.network_table.setColumnCount(7)
-        self.network_table.setHorizontalHeaderLabels([
-            "SSID", "BSSID", "Channel", "RSSI (dBm)",
-            "Security", "Frequency", "SNR"
-        ])
-        self.network_table.setRowCount(0)
+        self.network_model = NetworkTableModel(self)
+        self.network_table.setModel(self.network_model)
+        self.network_table.setSortingEnabled(True)
+        self.network_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.network_table.selectionModel().selectionChanged.connect(self.update_history_plot)
         
     def apply_theme(self):
         theme = self.themes[self.current_theme]
         if self.current_theme == "Dark":
+            import qdarkstyle
             self.setStyleSheet(qdarkstyle.load_stylesheet(qt_api='pyqt6'))
         else:
             self.setStyleSheet(f"""
@@ -365,7 +1060,7 @@ class WiFiMapper(QMainWindow):
                 QPushButton {{ background-color: {theme['accent']}; color: {theme['fg']}; }}
                 QComboBox {{ background-color: {theme['bg']}; color: {theme['fg']}; }}
                 QLineEdit {{ background-color: {theme['bg']}; color: {theme['fg']}; }}
-                QTableWidget {{ background-color: {theme['bg']}; color: {theme['fg']}; }}
+                QTableView {{ background-color: {theme['bg']}; color: {theme['fg']}; }}
                 QTabWidget::pane {{ background-color: {theme['bg']}; }}
                 QDockWidget {{ background-color: {theme['bg']}; color: {theme['fg']}; }}
             """)
@@ -392,6 +1087,43 @@ class WiFiMapper(QMainWindow):
         self.current_language = language
         self.apply_language()
         
+    def set_scan_timing(self):
+        self.scan_policy.min_wait = self.scan_min_wait.value()
+        self.scan_policy.max_wait = max(self.scan_max_wait.value(), self.scan_policy.min_wait)
+        
+    def set_history_retention(self, hours):
+        self.scan_history.retention = hours * 3600
+        self.scan_history.evict()
+        
+    def set_heatmap_cache(self):
+        self.heatmap_cache.max_bytes = self.heatmap_cache_size.value() * 1024 * 1024
+        if self.heatmap_cache_spill.isChecked():
+            if not self.heatmap_cache.spill_dir:
+                self.heatmap_cache.spill_dir = tempfile.mkdtemp(prefix="wifimapper-heatmaps-")
+        else:
+            self.heatmap_cache.spill_dir = None
+        self.heatmap_cache.shrink()
+        
+    def floor_pyramid(self, file_name):
+        # Builds the tile pyramid on first use of a plan; later loads of the
+        # same file only read its manifest
+        pyramid = self.floor_pyramids.get(file_name)
+        if pyramid is None:
+            self.status_bar.showMessage(f"Preparing floor plan tiles for {file_name}...")
+            QApplication.processEvents()
+            pyramid = self.floor_pyramids[file_name] = FloorPlanPyramid(file_name)
+        return pyramid
+        
+    def set_floor_plan(self, file_name):
+        pyramid = self.floor_pyramid(file_name)
+        if self.floor_plan_tiles is not None:
+            self.floor_plan_tiles.detach()
+        self.building.floors[self.current_floor].floor_plan = file_name
+        self.floor_plan = pyramid
+        self.floor_plan_key = pyramid.digest
+        self.floor_plan_tiles = FloorPlanTiles(self.heatmap_plot, pyramid)
+        self.heatmap_layers = None
+        
     def load_floor_plan(self):
         file_name, _ = QFileDialog.getOpenFileName(
             self, "Load Floor Plan", "",
@@ -399,18 +1131,118 @@ class WiFiMapper(QMainWindow):
         )
         if file_name:
             try:
-                self.floor_plan = Image.open(file_name)
+                self.set_floor_plan(file_name)
+                self.building_heatmap = None
                 self.status_bar.showMessage(f"Floor plan loaded: {file_name}")
                 self.update_heatmap()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to load floor plan: {str(e)}")
                 
+    def georeference_floor_plan(self):
+        if self.georeference_dialog is None:
+            points = self.georeference.control_points if self.georeference is not None else []
+            self.georeference_dialog = GeoreferenceDialog(points, self)
+            self.georeference_dialog.apply_button.clicked.connect(self.apply_georeference)
+            self.georeference_dialog.finished.connect(self.on_georeference_dialog_closed)
+        self.georeference_dialog.show()
+        self.georeference_dialog.raise_()
+        
+    def apply_georeference(self):
+        try:
+            georeference = GeoTransform(self.georeference_dialog.control_points())
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Cannot georeference the floor plan: {str(e)}")
+            return
+        # The control points also fix the plan's scale
+        self.georeference = georeference
+        self.meters_per_pixel = georeference.meters_per_pixel()
+        self.georeference_dialog.accept()
+        self.status_bar.showMessage(
+            f"Floor plan georeferenced at {self.meters_per_pixel:.3f} m per pixel; "
+            f"worst control point off by {georeference.residuals_m().max():.2f} m"
+        )
+        
+    def on_georeference_dialog_closed(self):
+        self.georeference_dialog.deleteLater()
+        self.georeference_dialog = None
+        
+    def refresh_floor_select(self):
+        self.floor_select.blockSignals(True)
+        self.floor_select.clear()
+        self.floor_select.addItems([floor.name for floor in self.building.floors])
+        self.floor_select.setCurrentIndex(self.current_floor)
+        self.floor_select.blockSignals(False)
+        self.remove_floor_button.setEnabled(len(self.building) > 1)
+        floor = self.building.floors[self.current_floor]
+        for spin_box, value in ((self.floor_height, floor.height_m), (self.slab_attenuation, floor.slab_loss_db)):
+            spin_box.blockSignals(True)
+            spin_box.setValue(value)
+            spin_box.blockSignals(False)
+        # The ground floor has no slab below it
+        self.slab_attenuation.setEnabled(self.current_floor > 0)
+        
+    def add_floor(self):
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Floor Plan for New Floor", "",
+            "Images (*.png *.jpg *.jpeg *.pdf *.dwg)"
+        )
+        if not file_name:
+            return
+        try:
+            self.floor_pyramid(file_name)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load floor plan: {str(e)}")
+            return
+        self.building.add_floor(file_name)
+        self.building_heatmap = None
+        self.select_floor(len(self.building) - 1)
+        self.status_bar.showMessage(f"Added {self.building.floors[-1].name}")
+        
+    def remove_floor(self):
+        if len(self.building) < 2:
+            return
+        name = self.building.floors[self.current_floor].name
+        self.building.remove_floor(self.current_floor)
+        self.building_heatmap = None
+        self.select_floor(min(self.current_floor, len(self.building) - 1))
+        self.status_bar.showMessage(f"Removed {name}")
+        
+    def select_floor(self, index):
+        # Switching floors shows that floor's slice of the building heatmap;
+        # nothing is recomputed
+        if not 0 <= index < len(self.building):
+            return
+        self.current_floor = index
+        floor = self.building.floors[index]
+        self.ap_positions = floor.ap_positions
+        self.refresh_floor_select()
+        if floor.floor_plan:
+            self.set_floor_plan(floor.floor_plan)
+        else:
+            if self.floor_plan_tiles is not None:
+                self.floor_plan_tiles.detach()
+            self.floor_plan = self.floor_plan_key = self.floor_plan_tiles = None
+        self.heatmap_layers = None
+        self.reset_heatmap_plot()
+        if self.building_heatmap is not None:
+            self.heatmap_data = self.building_floor_heatmap(index)
+            self.show_heatmap(self.building_heatmap_resolution)
+        else:
+            self.heatmap_data = np.empty((0, 0))
+            self.clear_dead_zones()
+        
+    def set_floor_geometry(self):
+        floor = self.building.floors[self.current_floor]
+        floor.height_m = self.floor_height.value()
+        floor.slab_loss_db = self.slab_attenuation.value()
+        self.status_bar.showMessage("Regenerate the heatmap to apply the new floor geometry")
+        
     def scan_networks(self):
         if self.offline_mode.isChecked():
             QMessageBox.information(self, "Offline Mode", "Scanning disabled in offline mode")
             return
             
-        if not pywifi or not self.wifi:
+        if not self.wifi:
             QMessageBox.critical(
                 self, "Error",
                 "WiFi scanning unavailable: pywifi not installed or failed to initialize. "
@@ -419,121 +1251,350 @@ class WiFiMapper(QMainWindow):
             self.scan_progress.setValue(0)
             return
             
-        try:
-            self.scan_data = []
-            self.scan_progress.setValue(0)
-            interfaces = self.wifi.interfaces()
-            if not interfaces:
-                QMessageBox.critical(self, "Error", "No wireless interfaces found")
-                self.scan_progress.setValue(0)
-                return
-                
-            total_interfaces = len(interfaces)
-            progress_step = 100 / total_interfaces if total_interfaces > 0 else 100
-            
-            for i, iface in enumerate(interfaces):
-                try:
-                    iface.scan()
-                    time.sleep(2)  # Allow time for scan to complete
-                    profiles = iface.scan_results()
-                    for profile in profiles:
-                        frequency = profile.freq / 1000000  # Convert Hz to MHz
-                        if self.band_select.currentText() == "2.4 GHz" and not (2400 <= frequency <= 2500):
-                            continue
-                        if self.band_select.currentText() == "5 GHz" and not (5000 <= frequency <= 5900):
-                            continue
-                        if self.band_select.currentText() == "6 GHz" and not (5900 <= frequency <= 7100):
-                            continue
-                            
-                        snr = profile.signal - profile.noise if hasattr(profile, 'noise') and profile.noise else 0
-                        security = profile.auth if hasattr(profile, 'auth') else "Open"
-                        self.scan_data.append({
-                            'ssid': profile.ssid or "Hidden",
-                            'bssid': profile.bssid,
-                            'channel': profile.channel if hasattr(profile, 'channel') else 0,
-                            'rssi': profile.signal,
-                            'security': security,
-                            'frequency': f"{frequency} MHz",
-                            'snr': snr
-                        })
-                    self.scan_progress.setValue(int((i + 1) * progress_step))
-                except Exception as e:
-                    self.status_bar.showMessage(f"Error scanning interface {i}: {str(e)}")
-                    continue
+        if self.scan_worker is not None:
+            # Previous scan still running; never overlap scans
+            return
             
-            self.update_network_table()
-            self.status_bar.showMessage("Network scan completed")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Network scan failed: {str(e)}")
-            self.scan_progress.setValue(0)
+        self.scan_progress.setValue(0)
+        self.scan_worker = ScanWorker(
+            self.wifi, self.band_select.currentText(), self.scan_policy, self
+        )
+        self.scan_worker.progress.connect(self.scan_progress.setValue)
+        self.scan_worker.interface_error.connect(self.on_interface_error)
+        self.scan_worker.scan_failed.connect(self.on_scan_failed)
+        self.scan_worker.results_ready.connect(self.on_scan_results)
+        self.scan_worker.finished.connect(self.on_scan_finished)
+        self.scan_worker.start()
+        
+    def on_interface_error(self, index, message):
+        self.status_bar.showMessage(f"Error scanning interface {index}: {message}")
+        
+    def on_scan_failed(self, message):
+        QMessageBox.critical(self, "Error", message)
+        self.scan_progress.setValue(0)
+        
+    def on_scan_results(self, networks):
+        self.scan_data = networks
+        self.scan_history.append_scan(networks)
+        if self.survey_db is not None:
+            self.survey_db_scan = self.survey_db.append_scan(networks)
+        self.update_network_table()
+        self.update_history_plot()
+        if self.live_heatmap.isChecked() and self.floor_plan:
+            self.update_live_heatmap()
+        latencies = ", ".join(
+            f"{name}: {elapsed:.1f} s" for name, elapsed in sorted(self.scan_policy.latency.items())
+        )
+        message = f"Network scan completed ({latencies})" if latencies else "Network scan completed"
+        error = self.survey_db.take_error() if self.survey_db is not None else None
+        if error is not None:
+            message = f"Survey database write failed: {str(error)}"
+        self.status_bar.showMessage(message)
+        
+    def on_scan_finished(self):
+        self.scan_worker.deleteLater()
+        self.scan_worker = None
             
     def update_network_table(self):
-        self.network_table.setRowCount(len(self.scan_data))
-        for i, network in enumerate(self.scan_data):
-            self.network_table.setItem(i, 0, QTableWidgetItem(network['ssid']))
-            self.network_table.setItem(i, 1, QTableWidgetItem(network['bssid']))
-            self.network_table.setItem(i, 2, QTableWidgetItem(str(network['channel'])))
-            self.network_table.setItem(i, 3, QTableWidgetItem(str(network['rssi'])))
-            self.network_table.setItem(i, 4, QTableWidgetItem(network['security']))
-            self.network_table.setItem(i, 5, QTableWidgetItem(network['frequency']))
-            self.network_table.setItem(i, 6, QTableWidgetItem(str(network['snr'])))
-        self.network_table.resizeColumnsToContents()
+        with span("update_network_table"):
+            was_empty = self.network_model.rowCount() == 0
+            added, _, _ = self.network_model.update_networks(self.scan_data)
+            if was_empty and added:
+                # Size columns once; later ticks keep the user's column widths
+                self.network_table.resizeColumnsToContents()
+        
+    def update_history_plot(self):
+        rows = sorted({index.row() for index in self.network_table.selectionModel().selectedRows()})
+        bssids = [self.network_model.network(row).bssid for row in rows]
+        window = self.history_windows[self.history_window.currentText()]
+        self.history_plot.clear()
+        
+        summaries = []
+        for i, bssid in enumerate(bssids):
+            samples = self.scan_history.samples(bssid, window)
+            if samples is None or not len(samples['rssi']):
+                continue
+            self.history_plot.plot(
+                samples['timestamp'], samples['rssi'],
+                pen=pg.intColor(i, hues=max(len(bssids), 1)), symbol='o', symbolSize=4,
+                name=self.scan_history.ssids.get(bssid, bssid)
+            )
+            stats = self.scan_history.stats(bssid, window)
+            summaries.append(
+                f"{self.scan_history.ssids.get(bssid, bssid)}: min {stats['min']:.0f} / "
+                f"mean {stats['mean']:.1f} / p90 {stats['p90']:.0f} dBm"
+            )
+        self.history_stats.setText(
+            "; ".join(summaries) if summaries else "Select networks in the Network Analysis tab"
+        )
+        
+    def show_heatmap(self, resolution):
+        with span("render_heatmap"):
+            if self.building_heatmap is not None and not np.may_share_memory(self.heatmap_data, self.building_heatmap):
+                # A single-floor result replaced this floor's view
+                self.building_heatmap = None
+            rows, cols = self.heatmap_data.shape
+            self.heatmap_data_resolution = resolution
+            self.clear_dead_zones()
+            self.heatmap_image.setImage(self.heatmap_data)
+            self.heatmap_image.setRect(QRectF(0, 0, cols * resolution, rows * resolution))
+            self.color_bar.setImageItem(self.heatmap_image)
+            if self.heatmap_3d.isChecked():
+                self.show_stacked_heatmap()
+        
+    def set_stacked_view(self, stacked):
+        self.heatmap_widget.setVisible(not stacked)
+        self.stack_widget.setVisible(stacked)
+        if stacked:
+            self.show_stacked_heatmap()
+        
+    def show_stacked_heatmap(self):
+        # Layers are only drawn while the stacked view is shown, and only
+        # again once there is a new result
+        source = self.building_heatmap if self.building_heatmap is not None else self.heatmap_data
+        if source is self.stacked_source:
+            return
+        self.stacked_source = source
+        self.stack_plot.clear()
+        if not source.size:
+            return
+        stack = source if source.ndim == 3 else source[None]
+        names = ([floor.name for floor in self.building.floors] if source.ndim == 3
+                 else [self.building.floors[self.current_floor].name])
+        resolution = self.heatmap_data_resolution
+        _, rows, cols = stack.shape
+        depth = rows * resolution
+        layers = []
+        for index, grid in enumerate(stack):
+            top = -index * depth * (STACK_SQUASH + STACK_GAP)
+            layer = pg.ImageItem(grid)
+            # Pixel (col, row) -> (x, y): back rows shifted right, depth flattened
+            layer.setTransform(QTransform(
+                resolution, 0, -STACK_SHEAR * resolution, STACK_SQUASH * resolution,
+                STACK_SHEAR * depth, top
+            ))
+            self.stack_plot.addItem(layer)
+            label = pg.TextItem(names[index], anchor=(1, 0.5))
+            label.setPos(0, top + depth * STACK_SQUASH / 2)
+            self.stack_plot.addItem(label)
+            layers.append(layer)
+        self.stack_color_bar.setImageItem(layers)
+        self.stack_plot.autoRange()
         
     def generate_heatmap(self):
         if not self.floor_plan:
             QMessageBox.warning(self, "Warning", "Please load a floor plan first")
             return
+        if self.heatmap_worker is not None:
+            self.status_bar.showMessage("Heatmap generation already in progress")
+            return
             
-        resolution = self.heatmap_resolution.value()
-        width, height = self.floor_plan.size
-        self.heatmap_data = np.zeros((height // resolution, width // resolution))
-        
-        # Generate heatmap based on scan data
-        for network in self.scan_data:
-            for i in range(height // resolution):
-                for j in range(width // resolution):
-                    # Simplified RSSI-based heatmap with path loss
-                    distance = np.random.uniform(1, 50)
-                    freq_mhz = float(network['frequency'].split()[0])
-                    path_loss = 20 * math.log10(distance) + 20 * math.log10(freq_mhz)
-                    self.heatmap_data[i, j] += network['rssi'] - path_loss
-                    
-        self.heatmap_data = np.clip(self.heatmap_data, -100, -30)
-        self.heatmap_image.setImage(self.heatmap_data)
-        self.color_bar.setImageItem(self.heatmap_image)
-        
-        if self.heatmap_3d.isChecked():
-            self.heatmap_plot.enableAutoRange()
-            self.heatmap_plot.setZValue(1)
-        
-    def update_heatmap(self):
+        with span("generate_heatmap"):
+            resolution = self.heatmap_resolution.value()
+            width, height = self.floor_plan.size
+            shape = (height // resolution, width // resolution)
+            interpolate = INTERPOLATORS.get(self.heatmap_source.currentText())
+            if interpolate is not None:
+                self.generate_survey_heatmap(interpolate, shape, resolution)
+                return
+            if len(self.building) > 1:
+                self.generate_building_heatmap(resolution)
+                return
+            sources = self.heatmap_sources(width, height)
+            options = {'meters_per_pixel': self.meters_per_pixel}
+            key = heatmap_cache_key(self.floor_plan_key, resolution, self.band_select.currentText(),
+                                    sources, self.meters_per_pixel)
+            cached = self.heatmap_cache.get(key)
+            if cached is not None:
+                self.on_heatmap_ready(cached, resolution)
+                return
+            
+            workers = self.heatmap_workers.value()
+            if workers > 1 and shape[0] * shape[1] * len(sources[0]) >= PARALLEL_MIN_EVALUATIONS:
+                if self.heatmap_executor is None:
+                    self.heatmap_executor = heatmap_executor(workers)
+                self.scan_progress.setValue(0)
+                self.heatmap_worker = HeatmapWorker(
+                    self.heatmap_executor, shape, resolution, sources, options, self
+                )
+                self.heatmap_worker.progress.connect(self.scan_progress.setValue)
+                self.heatmap_worker.result_ready.connect(
+                    lambda grid: self.on_heatmap_ready(self.cache_heatmap(key, grid), resolution)
+                )
+                self.heatmap_worker.failed.connect(self.status_bar.showMessage)
+                self.heatmap_worker.finished.connect(self.on_heatmap_worker_finished)
+                self.cancel_heatmap_button.setEnabled(True)
+                self.heatmap_worker.start()
+                return
+            
+            grid = compute_heatmap(shape, resolution, *sources, **options)
+            self.on_heatmap_ready(self.cache_heatmap(key, grid), resolution)
+        
+    def generate_survey_heatmap(self, interpolate, shape, resolution):
+        # A single selected network is mapped on its own; otherwise the
+        # strongest reading at each survey point is used
+        rows = {index.row() for index in self.network_table.selectionModel().selectedRows()}
+        bssid = self.network_model.network(rows.pop()).bssid if len(rows) == 1 else None
+        xs, ys, rssi = self.survey_points.samples(bssid)
+        if not len(rssi):
+            QMessageBox.warning(self, "Warning", "Record survey points first")
+            return
+        grid = interpolate(shape, resolution, xs, ys, rssi)
+        self.on_heatmap_ready(np.clip(grid, -100, -30), resolution)
+        
+    def generate_building_heatmap(self, resolution):
+        # Every floor in one batched pass, on a worker thread, over a grid
+        # covering the largest plan; each floor is shown cropped to its own
+        sizes = [self.floor_pyramid(floor.floor_plan).size for floor in self.building.floors if floor.floor_plan]
+        width, height = max(w for w, _ in sizes), max(h for _, h in sizes)
+        shape = (height // resolution, width // resolution)
+        sources = building_sources(self.building, self.scan_data, width, height, self.current_floor,
+                                   self.scanner_position, self.meters_per_pixel)
+        digest = self.building.digest()
+        key = heatmap_cache_key(digest, resolution, self.band_select.currentText(),
+                                sources, self.meters_per_pixel)
+        stack = self.heatmap_cache.get(key)
+        if stack is not None:
+            self.on_building_heatmap_ready(digest, stack, resolution)
+            return
+            
+        self.scan_progress.setValue(0)
+        # The worker gets its own copy, as floors can be edited meanwhile
+        self.heatmap_worker = BuildingHeatmapWorker(
+            Building.from_dict(self.building.to_dict()), shape, resolution, sources,
+            {'meters_per_pixel': self.meters_per_pixel}, self
+        )
+        self.heatmap_worker.progress.connect(self.scan_progress.setValue)
+        self.heatmap_worker.result_ready.connect(
+            lambda stack: self.on_building_heatmap_ready(digest, self.cache_heatmap(key, stack), resolution)
+        )
+        self.heatmap_worker.failed.connect(self.status_bar.showMessage)
+        self.heatmap_worker.finished.connect(self.on_heatmap_worker_finished)
+        self.cancel_heatmap_button.setEnabled(True)
+        self.heatmap_worker.start()
+        
+    def on_building_heatmap_ready(self, digest, stack, resolution):
+        if digest != self.building.digest():
+            self.status_bar.showMessage("Floors changed while the heatmap was generated; generate it again")
+            return
+        self.building_heatmap = stack
+        self.building_heatmap_resolution = resolution
+        self.on_heatmap_ready(self.building_floor_heatmap(self.current_floor), resolution)
+        
+    def building_floor_heatmap(self, index):
+        # The shared stack covers the largest plan; a floor's grid is cropped
+        # to its own plan
+        grid = self.building_heatmap[index]
+        floor = self.building.floors[index]
+        if not floor.floor_plan:
+            return grid
+        width, height = self.floor_pyramid(floor.floor_plan).size
+        resolution = self.building_heatmap_resolution
+        return grid[:height // resolution, :width // resolution]
+        
+    def cache_heatmap(self, key, grid):
+        grid = np.clip(grid, -100, -30)
+        self.heatmap_cache.put(key, grid)
+        return grid
+        
+    def on_heatmap_ready(self, grid, resolution):
+        self.heatmap_data = grid
+        self.show_heatmap(resolution)
+            
+    def on_heatmap_worker_finished(self):
+        self.cancel_heatmap_button.setEnabled(False)
+        self.heatmap_worker.deleteLater()
+        self.heatmap_worker = None
+        
+    def cancel_heatmap(self):
+        if self.heatmap_worker is not None:
+            self.heatmap_worker.cancel()
+            
+    def shutdown_heatmap_executor(self):
+        if self.heatmap_executor is not None and self.heatmap_worker is None:
+            self.heatmap_executor.shutdown(cancel_futures=True)
+            self.heatmap_executor = None
+            
+    def update_live_heatmap(self):
+        with span("update_live_heatmap"):
+            resolution = self.heatmap_resolution.value()
+            width, height = self.floor_plan.size
+            shape = (height // resolution, width // resolution)
+            if self.heatmap_layers is None or not self.heatmap_layers.matches(shape, resolution, self.meters_per_pixel):
+                self.heatmap_layers = HeatmapLayers(shape, resolution, self.meters_per_pixel)
+            ap_x, ap_y, tx_dbm, freq_mhz = self.heatmap_sources(width, height)
+            self.heatmap_layers.sync({
+                network.bssid: (ap_x[i], ap_y[i], tx_dbm[i], freq_mhz[i])
+                for i, network in enumerate(self.scan_data)
+            })
+            self.heatmap_data = np.clip(self.heatmap_layers.grid(), -100, -30)
+            self.show_heatmap(resolution)
+        
+    def heatmap_sources(self, width, height):
+        # Per-AP arrays for the heatmap engine
+        return calibrated_sources(self.scan_data, self.ap_positions, width, height,
+                                  self.scanner_position, self.meters_per_pixel)
+        
+    def reset_heatmap_plot(self):
+        self.heatmap_plot.clear()
+        self.heatmap_image = pg.ImageItem()
+        self.heatmap_plot.addItem(self.heatmap_image)
+        self.heatmap_plot.addItem(self.sim_ap_markers)
+        self.sim_ap_markers.setZValue(10)
+        self.heatmap_plot.addItem(self.survey_markers)
+        self.survey_markers.setZValue(10)
+        self.heatmap_plot.addItem(self.dead_zone_overlay)
+        self.dead_zone_overlay.setZValue(5)
+        self.heatmap_plot.addItem(self.dead_zone_markers)
+        self.dead_zone_markers.setZValue(10)
         if self.floor_plan:
-            self.heatmap_plot.clear()
-            self.heatmap_image = pg.ImageItem()
-            self.heatmap_plot.addItem(self.heatmap_image)
+            self.floor_plan_tiles.attach()
+            
+    def update_heatmap(self):
+        with span("update_heatmap"):
             if self.floor_plan:
-                floor_plan_array = np.array(self.floor_plan.convert('RGB'))
-                bg_image = pg.ImageItem(floor_plan_array)
-                self.heatmap_plot.addItem(bg_image)
-                bg_image.setZValue(-1)
-            self.generate_heatmap()
+                self.reset_heatmap_plot()
+                self.generate_heatmap()
             
     def optimize_channels(self):
-        channels = {1: 0, 6: 0, 11: 0}  # Common 2.4 GHz channels
-        if self.band_select.currentText() == "5 GHz":
-            channels = {36: 0, 40: 0, 44: 0, 48: 0}
-        elif self.band_select.currentText() == "6 GHz":
-            channels = {1: 0, 5: 0, 9: 0, 13: 0}
+        band = self.band_select.currentText()
+        width = int(self.channel_width.currentText().split()[0])
+        if (band, width) not in PLAN_CHANNELS:
+            QMessageBox.warning(self, "Channel Optimization",
+                                f"{width} MHz channels are not available in the {band} band")
+            return
+        if not self.sim_ap_positions:
+            optimal_channel = recommend_channel(self.scan_data, band, width, self.scan_history)
+            QMessageBox.information(
+                self, "Channel Optimization",
+                f"Recommended channel: {optimal_channel} (Least interference)"
+            )
+            return
             
-        for network in self.scan_data:
-            channel = network['channel']
-            if channel in channels:
-                channels[channel] += 1
-                
-        optimal_channel = min(channels, key=channels.get)
+        # Plan the simulated APs against each other and the scanned neighbours
+        external = external_costs(
+            np.array(PLAN_CHANNELS[(band, width)]), band, width,
+            *interferers(self.scan_data, band, self.scan_history)
+        )
+        ap_x = [x for x, _ in self.sim_ap_positions]
+        ap_y = [y for _, y in self.sim_ap_positions]
+        coupling = ap_coupling_dbm(
+            ap_x, ap_y, [AP_TX_POWER_DBM[self.ap_model.currentText()]] * len(ap_x),
+            BAND_CENTER_MHZ[band], self.meters_per_pixel
+        )
+        plan = plan_channels(coupling, band, width, external)
+        details = "\n".join(
+            f"AP {i} at ({x:.0f}, {y:.0f}): channel {channel}, "
+            + (f"interference {level:.1f} dBm" if np.isfinite(level) else "no interference")
+            for i, (x, y, channel, level) in enumerate(
+                zip(ap_x, ap_y, plan.channels, plan.interference_dbm), start=1
+            )
+            if i <= 20
+        )
+        more = f"\n... and {len(ap_x) - 20} more APs" if len(ap_x) > 20 else ""
         QMessageBox.information(
             self, "Channel Optimization",
-            f"Recommended channel: {optimal_channel} (Least congested)"
+            f"Channel plan for {len(ap_x)} APs at {width} MHz:\n{details}{more}"
         )
         
     def check_interference(self):
@@ -541,8 +1602,8 @@ class WiFiMapper(QMainWindow):
         non_wifi_interference = ["Microwave", "Bluetooth", "Cordless Phone"]
         
         for network in self.scan_data:
-            if network['rssi'] > -50:
-                interference_sources.append(f"WiFi: {network['ssid']} (RSSI: {network['rssi']} dBm)")
+            if network.rssi > -50:
+                interference_sources.append(f"WiFi: {network.ssid} (RSSI: {network.rssi} dBm)")
                 
         # Simulate non-WiFi interference detection
         if np.random.random() > 0.7:
@@ -561,18 +1622,96 @@ class WiFiMapper(QMainWindow):
             QMessageBox.warning(self, "Warning", "Generate heatmap first")
             return
             
-        dead_zones = np.where(self.heatmap_data < -80)
-        if len(dead_zones[0]) > 0:
-            QMessageBox.warning(
-                self, "Dead Zones Detected",
-                f"Found {len(dead_zones[0])} areas with weak signal (< -80 dBm)"
+        resolution = self.heatmap_data_resolution or self.heatmap_resolution.value()
+        labels, zones = find_dead_zones(self.heatmap_data, resolution, self.meters_per_pixel)
+        if not zones:
+            QMessageBox.information(self, "Dead Zones", "No dead zones detected")
+            return
+            
+        # Drawn over the heatmap; the heatmap itself is left untouched
+        rows, cols = labels.shape
+        overlay = np.zeros((rows, cols, 4), dtype=np.uint8)
+        overlay[labels > 0] = (255, 0, 0, 110)
+        self.dead_zone_overlay.setImage(overlay, levels=(0, 255))
+        self.dead_zone_overlay.setRect(QRectF(0, 0, cols * resolution, rows * resolution))
+        self.dead_zone_markers.setData(pos=[(zone.centroid_x, zone.centroid_y) for zone in zones])
+        
+        total_area = sum(zone.area_m2 for zone in zones)
+        details = "\n".join(
+            f"{i}. {zone.area_m2:.1f} m² at ({zone.centroid_x:.0f}, {zone.centroid_y:.0f}), "
+            f"worst {zone.worst_rssi:.1f} dBm"
+            for i, zone in enumerate(zones[:10], start=1)
+        )
+        more = f"\n... and {len(zones) - 10} smaller regions" if len(zones) > 10 else ""
+        QMessageBox.warning(
+            self, "Dead Zones Detected",
+            f"Found {len(zones)} regions with weak signal (< {DEAD_ZONE_DBM:.0f} dBm), "
+            f"{total_area:.1f} m² in total:\n{details}{more}"
+        )
+        
+    def clear_dead_zones(self):
+        self.dead_zone_overlay.clear()
+        self.dead_zone_markers.setData(pos=np.empty((0, 2)))
+            
+    def on_heatmap_clicked(self, event):
+        recording = self.record_survey.isChecked()
+        picking = self.georeference_dialog is not None
+        if not (self.place_aps.isChecked() or recording or picking) or not self.floor_plan:
+            return
+        point = self.heatmap_plot.vb.mapSceneToView(event.scenePos())
+        width, height = self.floor_plan.size
+        if not (0 <= point.x() < width and 0 <= point.y() < height):
+            return
+        if picking:
+            self.georeference_dialog.set_pixel(point.x(), point.y())
+        elif recording:
+            if not self.scan_data:
+                self.status_bar.showMessage("Scan networks before recording a survey point")
+                return
+            self.survey_points.add(point.x(), point.y(), self.scan_data)
+            if self.survey_db is not None:
+                if self.survey_db_scan is None:
+                    # The shown scan came from a project, not from a scan
+                    self.survey_db_scan = self.survey_db.append_scan(self.scan_data)
+                self.survey_db.add_point(point.x(), point.y(), self.current_floor, self.survey_db_scan)
+            self.update_survey_markers()
+            self.status_bar.showMessage(
+                f"Survey point {len(self.survey_points)} recorded at ({point.x():.0f}, {point.y():.0f})"
             )
-            # Highlight dead zones on heatmap
-            self.heatmap_data[dead_zones] = -100
-            self.update_heatmap()
         else:
-            QMessageBox.information(self, "Dead Zones", "No dead zones detected")
+            self.sim_ap_positions.append((point.x(), point.y()))
+            self.update_sim_ap_markers()
+            
+    def clear_survey(self):
+        self.survey_points.clear()
+        self.update_survey_markers()
+        
+    def update_survey_markers(self):
+        self.survey_markers.setData(
+            pos=np.asarray(self.survey_points.positions, dtype=np.float64).reshape(-1, 2)
+        )
             
+    def clear_sim_aps(self):
+        self.sim_ap_positions = []
+        self.update_sim_ap_markers()
+        
+    def update_sim_ap_markers(self):
+        self.sim_ap_markers.setData(
+            [x for x, _ in self.sim_ap_positions], [y for _, y in self.sim_ap_positions]
+        )
+        
+    def current_wall_index(self, resolution, wall_material):
+        # Rebuilt only when the floor plan, resolution or material changes
+        key = (id(self.floor_plan), resolution, wall_material)
+        if self.wall_index_key != key:
+            raster = wall_raster_from_blocks(
+                self.floor_plan.block_min_gray(resolution), WALL_ATTENUATION_DB[wall_material]
+            )
+            self.wall_index = WallCrossingIndex(raster)
+            self.wall_raster = raster
+            self.wall_index_key = key
+        return self.wall_index
+        
     def simulate_network(self):
         if not self.floor_plan:
             QMessageBox.warning(self, "Warning", "Please load a floor plan first")
@@ -583,31 +1722,116 @@ class WiFiMapper(QMainWindow):
         wall_material = self.wall_material.currentText()
         device_count = self.device_count.value()
         
-        # Simplified simulation model
-        attenuation = {
-            "Concrete": 15,
-            "Brick": 12,
-            "Drywall": 8,
-            "Glass": 5
-        }
+        width, height = self.floor_plan.size
+        if not self.sim_ap_positions:
+            self.sim_ap_positions = [(width / 2, height / 2)]
+            self.update_sim_ap_markers()
+        resolution = self.heatmap_resolution.value()
+        shape = (height // resolution, width // resolution)
+        ap_x = [x for x, _ in self.sim_ap_positions]
+        ap_y = [y for _, y in self.sim_ap_positions]
+        freq_mhz = BAND_CENTER_MHZ.get(self.band_select.currentText(), 2437.0)
+        
+        start = time.perf_counter()
+        self.heatmap_data = predict_coverage(
+            shape, resolution, ap_x, ap_y,
+            [AP_TX_POWER_DBM[ap_model]] * len(ap_x), [freq_mhz] * len(ap_x),
+            wall_index=self.current_wall_index(resolution, wall_material),
+            meters_per_pixel=self.meters_per_pixel
+        )
+        elapsed = time.perf_counter() - start
+        self.heatmap_data = np.clip(self.heatmap_data, -100, -30)
+        self.show_heatmap(resolution)
         
+        covered = np.mean(self.heatmap_data >= -67) * 100
         sim_results = f"""
         Network Simulation Results
         =========================
-        Access Point: {ap_model}
+        Access Point: {ap_model} x {len(ap_x)}
         Wall Material: {wall_material}
         Device Count: {device_count}
-        Attenuation: {attenuation[wall_material]} dB/m
+        Attenuation: {WALL_ATTENUATION_DB[wall_material]} dB per wall
+        
+        Predicted Coverage:
+        - Area at or above -67 dBm: {covered:.1f}%
+        - Median Signal: {np.median(self.heatmap_data):.1f} dBm
+        - Weakest Signal: {self.heatmap_data.min():.1f} dBm
+        - Computed in {elapsed * 1000:.0f} ms ({shape[0]}x{shape[1]} grid)
         
         Estimated Performance:
-        - Max Range: {100 / attenuation[wall_material]:.1f} meters
         - Max Throughput: {self.calculate_throughput(ap_model, device_count)} Mbps
         - Latency: {np.random.uniform(1, 5):.2f} ms
-        - Capacity: {self.calculate_capacity(ap_model)} devices
+        - Capacity: {self.calculate_capacity(ap_model) * len(ap_x)} devices
         """
         
         self.sim_results.setText(sim_results)
         
+    def optimize_ap_placement(self):
+        if not self.floor_plan:
+            QMessageBox.warning(self, "Warning", "Please load a floor plan first")
+            return
+        if self.placement_worker is not None:
+            return
+            
+        # Floor cells (not walls) are both the area to cover and the candidate sites
+        width, height = self.floor_plan.size
+        resolution = placement_resolution((width, height), self.heatmap_resolution.value())
+        wall_index = self.current_wall_index(resolution, self.wall_material.currentText())
+        area_mask = self.wall_raster == 0
+        ap_model = self.ap_model.currentText()
+        area_m2 = np.count_nonzero(area_mask) * (resolution * self.meters_per_pixel) ** 2
+        devices = self.device_density.value() * area_m2 / 100
+        freq_mhz = BAND_CENTER_MHZ.get(self.band_select.currentText(), 2437.0)
+        
+        self.placement_worker = PlacementWorker(
+            (area_mask, resolution, AP_TX_POWER_DBM[ap_model], freq_mhz, wall_index),
+            {
+                'threshold_dbm': self.coverage_threshold.value(),
+                'target': self.coverage_target.value() / 100,
+                'devices': devices, 'ap_capacity': AP_CLIENT_CAPACITY[ap_model],
+                'spacing_m': self.candidate_spacing.value(),
+                'meters_per_pixel': self.meters_per_pixel
+            },
+            self
+        )
+        self.placement_worker.result_ready.connect(
+            lambda result: self.on_placement_ready(result, area_m2, devices)
+        )
+        self.placement_worker.failed.connect(self.on_placement_failed)
+        self.placement_worker.finished.connect(self.on_placement_worker_finished)
+        self.optimize_placement_button.setEnabled(False)
+        self.status_bar.showMessage("Optimizing AP placement...")
+        self.placement_worker.start()
+        
+    def on_placement_ready(self, result, area_m2, devices):
+        if not result.positions:
+            QMessageBox.warning(self, "AP Placement", "No candidate sites on the floor plan")
+            return
+        self.sim_ap_positions = list(result.positions)
+        self.update_sim_ap_markers()
+        self.simulate_network()
+        target = self.coverage_target.value()
+        self.sim_results.append(f"""
+        AP Placement
+        ============
+        Access Points: {len(result.positions)} (greedy start: {result.greedy_aps}, device load alone: {result.capacity_aps})
+        Floor Area: {area_m2:.0f} m², {devices:.0f} devices
+        Area at or above {self.coverage_threshold.value()} dBm from the best AP: {result.coverage * 100:.1f}% (target {target}%)
+        Candidate Sites: {result.candidates}, searched in {result.elapsed:.1f} s
+        """)
+        if result.coverage * 100 < target:
+            self.status_bar.showMessage("Coverage target not reachable with the candidate sites")
+        else:
+            self.status_bar.showMessage(f"Placed {len(result.positions)} APs")
+            
+    def on_placement_failed(self, message):
+        QMessageBox.critical(self, "Error", message)
+        
+    def on_placement_worker_finished(self):
+        self.optimize_placement_button.setEnabled(True)
+        self.placement_worker.deleteLater()
+        self.placement_worker = None
+        
     def calculate_throughput(self, ap_model, device_count):
         # Simplified throughput calculation
         base_throughputs = {
@@ -621,94 +1845,209 @@ class WiFiMapper(QMainWindow):
         
     def calculate_capacity(self, ap_model):
         # Simplified capacity calculation
-        capacities = {
-            "Generic AP": 20,
-            "TP-Link AX6000": 100,
-            "Netgear Orbi": 80,
-            "Cisco Meraki": 50
+        return AP_CLIENT_CAPACITY.get(ap_model, 20)
+        
+    def project_settings(self):
+        return {
+            'theme': self.current_theme,
+            'language': self.current_language,
+            'wifi6': self.wifi6_support.isChecked(),
+            'wpa3': self.wpa3_support.isChecked(),
+            'offline': self.offline_mode.isChecked(),
+            'floor_plan': self.floor_plan.file_name if self.floor_plan else "",
+            'building': self.building.to_dict(),
+            'floor': self.current_floor,
+            'heatmap_resolution': self.heatmap_resolution.value(),
+            'band': self.band_select.currentText(),
+            'meters_per_pixel': self.meters_per_pixel,
+            'georeference': self.georeference.to_dict() if self.georeference is not None else None
         }
-        return capacities.get(ap_model, 20)
         
     def save_project(self):
         file_name, _ = QFileDialog.getSaveFileName(
             self, "Save Project", "", "WiFiMapper Project (*.wmp)"
         )
         if file_name:
-            project_data = {
-                'scan_data': self.scan_data,
-                'heatmap_data': self.heatmap_data.tolist() if self.heatmap_data.size else [],
-                'settings': {
-                    'theme': self.current_theme,
-                    'language': self.current_language,
-                    'wifi6': self.wifi6_support.isChecked(),
-                    'wpa3': self.wpa3_support.isChecked(),
-                    'offline': self.offline_mode.isChecked(),
-                    'floor_plan': self.floor_plan.filename if self.floor_plan else ""
-                }
-            }
-            with open(file_name, 'w') as f:
-                json.dump(project_data, f)
-            self.status_bar.showMessage(f"Project saved to {file_name}")
+            try:
+                save_project_file(
+                    file_name, self.scan_data, self.heatmap_data, self.scan_history,
+                    self.project_settings(), self.ap_positions
+                )
+                self.status_bar.showMessage(f"Project saved to {file_name}")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to save project: {str(e)}")
+                
+    def load_project(self):
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Open Project", "", "WiFiMapper Project (*.wmp)"
+        )
+        if not file_name:
+            return
+        try:
+            project = load_project_file(file_name)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to open project: {str(e)}")
+            return
             
+        settings = project['settings']
+        self.theme_select.setCurrentText(settings.get('theme', self.current_theme))
+        self.language_select.setCurrentText(settings.get('language', self.current_language))
+        self.wifi6_support.setChecked(settings.get('wifi6', False))
+        self.wpa3_support.setChecked(settings.get('wpa3', False))
+        self.offline_mode.setChecked(settings.get('offline', False))
+        self.heatmap_resolution.setValue(settings.get('heatmap_resolution', self.heatmap_resolution.value()))
+        if settings.get('band'):
+            self.band_select.setCurrentText(settings['band'])
+        self.meters_per_pixel = settings.get('meters_per_pixel', DEFAULT_METERS_PER_PIXEL)
+        georeference = settings.get('georeference')
+        self.georeference = GeoTransform.from_dict(georeference) if georeference else None
+        
+        self.scan_data = project['scan_data']
+        self.survey_db_scan = None
+        self.scan_history = project['history']
+        self.scan_history.retention = self.history_retention.value() * 3600
+        if settings.get('building'):
+            self.building = Building.from_dict(settings['building'])
+            self.current_floor = min(settings.get('floor', 0), len(self.building) - 1)
+        else:
+            # Single-floor project
+            self.building = Building([Floor("Floor 1", settings.get('floor_plan', ""))])
+            self.current_floor = 0
+        self.building.floors[self.current_floor].ap_positions = project['ap_positions']
+        self.ap_positions = project['ap_positions']
+        self.building_heatmap = None
+        self.refresh_floor_select()
+        self.update_network_table()
+        
+        floor_plan = self.building.floors[self.current_floor].floor_plan
+        if floor_plan and os.path.exists(floor_plan):
+            self.set_floor_plan(floor_plan)
+        self.reset_heatmap_plot()
+        # A memory-mapped heatmap would keep the project file open (and
+        # locked on Windows) for as long as it is shown
+        self.heatmap_data = np.array(project['heatmap'])
+        if self.heatmap_data.size:
+            self.show_heatmap(settings.get('heatmap_resolution', self.heatmap_resolution.value()))
+        self.status_bar.showMessage(f"Project loaded from {file_name}")
+        
     def export_report(self):
         file_name, _ = QFileDialog.getSaveFileName(
             self, "Export Report", "",
             "PDF Files (*.pdf);;CSV Files (*.csv);;KMZ Files (*.kmz)"
         )
         if file_name:
-            if file_name.endswith('.pdf'):
-                self.generate_pdf_report(file_name)
-            elif file_name.endswith('.csv'):
-                self.generate_csv_report(file_name)
-            elif file_name.endswith('.kmz'):
-                self.generate_kmz_report(file_name)
+            try:
+                if file_name.endswith('.pdf'):
+                    self.generate_pdf_report(file_name)
+                elif file_name.endswith('.csv'):
+                    self.generate_csv_report(file_name)
+                elif file_name.endswith('.kmz'):
+                    if not self.generate_kmz_report(file_name):
+                        return
+            except ImportError as e:
+                QMessageBox.critical(self, "Error", f"Report export requires the {e.name} library")
+                return
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Report export failed: {str(e)}")
+                return
             self.status_bar.showMessage(f"Report exported to {file_name}")
             
-    def generate_pdf_report(self, file_name):
-        c = canvas.Canvas(file_name, pagesize=letter)
-        c.setFont("Helvetica", 12)
+    def export_history(self):
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Export Scan History", "",
+            "CSV Files (*.csv);;Parquet Files (*.parquet);;Feather Files (*.feather)"
+        )
+        if not file_name:
+            return
+        exporter = HISTORY_EXPORTERS.get(os.path.splitext(file_name)[1].lower())
+        if exporter is None:
+            QMessageBox.warning(self, "Warning", "Unsupported history export format")
+            return
+        try:
+            start = time.perf_counter()
+            rows = exporter(self.scan_history, file_name)
+            elapsed = max(time.perf_counter() - start, 1e-9)
+        except ImportError:
+            QMessageBox.critical(self, "Error", "Parquet and Feather export require the pyarrow library")
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"History export failed: {str(e)}")
+            return
+        self.status_bar.showMessage(
+            f"Exported {rows} samples to {file_name} in {elapsed:.2f} s ({rows / elapsed:,.0f} rows/s)"
+        )
         
-        c.drawString(100, 750, "WiFiMapper Network Analysis Report")
-        c.drawString(100, 730, f"Generated: {datetime.datetime.now()}")
+    def open_survey_database(self):
+        # Every scan and survey point is stored from now on; the network
+        # table, history and survey points resume from what is stored
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Open Survey Database", "", "Survey Database (*.sqlite)",
+            options=QFileDialog.Option.DontConfirmOverwrite
+        )
+        if not file_name:
+            return
+        database = None
+        try:
+            database = SurveyDatabase(file_name)
+            scan_data = database.latest_scan()
+            history = database.history(self.scan_history.retention, self.scan_history.capacity)
+            survey_points = database.survey_points(self.current_floor)
+            summary = database.summary()
+        except Exception as e:
+            if database is not None:
+                database.close()
+            QMessageBox.critical(self, "Error", f"Failed to open survey database: {str(e)}")
+            return
+        self.close_survey_database()
+        self.survey_db = database
+        if scan_data:
+            self.scan_data = scan_data
+            self.survey_db_scan = database.last_scan
+            self.update_network_table()
+        if len(history):
+            self.scan_history = history
+            self.update_history_plot()
+        if len(survey_points):
+            self.survey_points = survey_points
+            self.update_survey_markers()
+        self.status_bar.showMessage(
+            f"Recording scans to {file_name} ({summary['scans']} scans, {summary['samples']} samples, "
+            f"{summary['points']} survey points stored)"
+        )
         
-        y = 700
-        for network in self.scan_data:
-            c.drawString(100, y, f"SSID: {network['ssid']}")
-            c.drawString(100, y-20, f"RSSI: {network['rssi']} dBm")
-            c.drawString(100, y-40, f"Channel: {network['channel']}")
-            c.drawString(100, y-60, f"SNR: {network['snr']} dB")
-            y -= 80
-            
-        if self.heatmap_data.size:
-            c.drawString(100, y, "Heatmap Statistics:")
-            c.drawString(100, y-20, f"Average RSSI: {np.mean(self.heatmap_data):.1f} dBm")
-            c.drawString(100, y-40, f"Min RSSI: {np.min(self.heatmap_data):.1f} dBm")
-            c.drawString(100, y-60, f"Max RSSI: {np.max(self.heatmap_data):.1f} dBm")
-            
-        c.save()
+    def close_survey_database(self):
+        if self.survey_db is None:
+            return
+        try:
+            self.survey_db.close()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Survey database write failed: {str(e)}")
+        self.survey_db = None
+        self.survey_db_scan = None
+        
+    def generate_pdf_report(self, file_name):
+        # A building report covers every floor of the shared result
+        if self.building_heatmap is not None:
+            write_pdf_report(file_name, self.scan_data,
+                             [self.building_floor_heatmap(index) for index in range(len(self.building))],
+                             [floor.name for floor in self.building.floors])
+        else:
+            write_pdf_report(file_name, self.scan_data, self.heatmap_data)
         
     def generate_csv_report(self, file_name):
-        with open(file_name, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["SSID", "BSSID", "Channel", "RSSI", "Security", "Frequency", "SNR"])
-            for network in self.scan_data:
-                writer.writerow([
-                    network['ssid'], network['bssid'], network['channel'],
-                    network['rssi'], network['security'], network['frequency'],
-                    network['snr']
-                ])
-                
+        write_csv_report(file_name, self.scan_data)
+        
     def generate_kmz_report(self, file_name):
-        try:
-            import simplekml
-            kml = simplekml.Kml()
-            for i, network in enumerate(self.scan_data):
-                pnt = kml.newpoint(name=network['ssid'])
-                pnt.coords = [(np.random.uniform(-180, 180), np.random.uniform(-90, 90))]
-                pnt.description = f"RSSI: {network['rssi']} dBm\nChannel: {network['channel']}\nSNR: {network['snr']} dB"
-            kml.save(file_name)
-        except ImportError:
-            QMessageBox.critical(self, "Error", "KMZ export requires simplekml library")
+        if self.georeference is None:
+            QMessageBox.warning(self, "Warning", "Georeference the floor plan first (File menu)")
+            return False
+        # Networks are placed where their APs were positioned or, failing
+        # that, at the survey point with their strongest reading
+        write_kmz_report(
+            file_name, self.scan_data, self.heatmap_data, self.georeference, self.heatmap_data_resolution,
+            network_positions(self.scan_data, self.ap_positions, self.survey_points)
+        )
+        return True
             
     def show_about(self):
         QMessageBox.information(
@@ -723,6 +2062,16 @@ class WiFiMapper(QMainWindow):
         )
         if reply == QMessageBox.StandardButton.Yes:
             self.scan_timer.stop()
+            if self.scan_worker is not None:
+                self.scan_worker.wait()
+            if self.placement_worker is not None:
+                self.placement_worker.wait()
+            if self.heatmap_worker is not None:
+                self.heatmap_worker.cancel()
+                self.heatmap_worker.wait()
+            if self.heatmap_executor is not None:
+                self.heatmap_executor.shutdown(cancel_futures=True)
+            self.close_survey_database()
             event.accept()
         else:
             event.ignore()
@@ -0,0 +1,62 @@
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.placement import (
+    candidate_sites, greedy_placement, optimise_placement, site_coverage
+)
+from wifimapper_core.propagation import WallCrossingIndex
+
+
+def office_walls(rows, cols, room_cells, door_cells, loss_db):
+    # Grid of rooms, each wall with a door gap
+    raster = np.zeros((rows, cols), dtype=np.float32)
+    raster[::room_cells, :] = loss_db
+    raster[:, ::room_cells] = loss_db
+    for start in range(room_cells // 2, max(rows, cols), room_cells):
+        raster[::room_cells, start:start + door_cells] = 0
+        raster[start:start + door_cells, ::room_cells] = 0
+    return raster
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AP placement optimiser on a synthetic office floor")
+    parser.add_argument("--floor", type=float, nargs=2, default=[100.0, 75.0], help="metres")
+    parser.add_argument("--cell", type=float, default=0.5, help="evaluation cell size (m)")
+    parser.add_argument("--spacing", type=float, nargs="+", default=[8.0, 5.0, 3.0], help="candidate spacing (m)")
+    parser.add_argument("--budget", type=float, default=3.0, help="annealing time budget (s)")
+    args = parser.parse_args()
+
+    rows, cols = int(args.floor[1] / args.cell), int(args.floor[0] / args.cell)
+    raster = office_walls(rows, cols, int(10 / args.cell), int(1 / args.cell), 12)
+    start = time.perf_counter()
+    wall_index = WallCrossingIndex(raster)
+    print(f"{rows}x{cols} cells, wall index {time.perf_counter() - start:.2f} s")
+    area_mask = raster == 0
+    meters_per_pixel, resolution = args.cell, 1
+    for spacing in args.spacing:
+        site_rows, site_cols = candidate_sites(area_mask, round(spacing / args.cell))
+        start = time.perf_counter()
+        coverage = site_coverage(area_mask, resolution, site_rows, site_cols, 20.0, 5500.0,
+                                 wall_index=wall_index, meters_per_pixel=meters_per_pixel)
+        rasters = time.perf_counter() - start
+        needed = math.ceil(0.95 * coverage.area_cells)
+        start = time.perf_counter()
+        greedy, _ = greedy_placement(coverage, needed, area_mask.size)
+        greedy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        plan, covered, _ = optimise_placement(coverage, site_rows, site_cols, area_mask.size,
+                                              time_budget=args.budget)
+        search = time.perf_counter() - start
+        print(f"{len(site_rows):5d} sites: rasters {rasters:5.2f} s  greedy {greedy_time:5.3f} s "
+              f"({len(greedy)} APs)  greedy+annealing {search:5.2f} s ({len(plan)} APs, "
+              f"{covered / coverage.area_cells * 100:.1f}% covered)")
+
+
+if __name__ == '__main__':
+    main()
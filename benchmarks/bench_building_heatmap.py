@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.building import Building, building_power_mw
+from wifimapper_core.heatmap import DEFAULT_METERS_PER_PIXEL, PATH_LOSS_EXPONENT, reference_loss_db
+
+
+def make_building(floors, aps_per_floor, width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    building = Building()
+    for _ in range(floors - 1):
+        building.add_floor()
+    count = floors * aps_per_floor
+    ap_x = rng.uniform(0, width, count).astype(np.float32)
+    ap_y = rng.uniform(0, height, count).astype(np.float32)
+    ap_floor = np.repeat(np.arange(floors), aps_per_floor)
+    tx_dbm = np.full(count, 20.0, dtype=np.float32)
+    freq_mhz = np.full(count, 2437.0, dtype=np.float32)
+    return building, (ap_x, ap_y, ap_floor, tx_dbm, freq_mhz)
+
+
+def per_floor(building, shape, resolution, ap_x, ap_y, ap_floor, tx_dbm, freq_mhz,
+              meters_per_pixel=DEFAULT_METERS_PER_PIXEL, exponent=PATH_LOSS_EXPONENT):
+    # One single-floor pass per floor, each redoing the horizontal distances
+    rows, cols = shape
+    elevations = building.elevations()
+    slab_loss = building.slab_loss_matrix()
+    p0 = np.power(10.0, (tx_dbm - reference_loss_db(freq_mhz)) / 10)
+    xs = (np.arange(cols, dtype=np.float32) + 0.5) * resolution * meters_per_pixel
+    ys = (np.arange(rows, dtype=np.float32) + 0.5) * resolution * meters_per_pixel
+    result = np.zeros((len(building), rows, cols), dtype=np.float32)
+    for floor in range(len(building)):
+        gain = (p0 * np.power(10.0, -slab_loss[floor, ap_floor] / 10)).astype(np.float32)
+        dz2 = np.square(elevations[ap_floor] - elevations[floor])
+        for i in range(len(ap_x)):
+            d2 = (np.square(xs[None, :] - ap_x[i] * meters_per_pixel)
+                  + np.square(ys[:, None] - ap_y[i] * meters_per_pixel) + dz2[i])
+            result[floor] += gain[i] * np.power(np.maximum(d2, 1.0), np.float32(-exponent / 2))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-floor heatmap: batched 3D pass vs per-floor loop")
+    parser.add_argument("--floors", type=int, nargs="+", default=[6, 12, 20])
+    parser.add_argument("--aps-per-floor", type=int, default=8)
+    parser.add_argument("--plan", default="2000x1500", help="floor plan size in pixels")
+    parser.add_argument("--resolution", type=int, default=10)
+    args = parser.parse_args()
+
+    width, height = map(int, args.plan.split("x"))
+    shape = (height // args.resolution, width // args.resolution)
+    for floors in args.floors:
+        building, sources = make_building(floors, args.aps_per_floor, width, height)
+        start = time.perf_counter()
+        looped = per_floor(building, shape, args.resolution, *sources)
+        loop_time = time.perf_counter() - start
+        start = time.perf_counter()
+        batched = building_power_mw(building, shape, args.resolution, *sources)
+        batch_time = time.perf_counter() - start
+        error = np.max(np.abs(10 * np.log10(batched) - 10 * np.log10(looped)))
+        print(f"{floors:3d} floors x {args.aps_per_floor} APs, {shape[0]}x{shape[1]} grid: "
+              f"per-floor loop {loop_time:6.2f} s, batched {batch_time:6.2f} s "
+              f"({loop_time / batch_time:4.1f}x, max difference {error:.1e} dB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.channels import (
+    PLAN_CHANNELS, ap_coupling_dbm, channel_center_mhz, external_costs, plan_channels, plan_cost
+)
+from wifimapper_core.heatmap import DEFAULT_METERS_PER_PIXEL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Channel planning on synthetic dense deployments")
+    parser.add_argument("--aps", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--foreign", type=int, default=300, help="neighbouring networks heard")
+    parser.add_argument("--building", type=float, nargs=2, default=[200.0, 100.0], help="metres")
+    parser.add_argument("--budget", type=float, default=2.0, help="local search time budget (s)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for band, width in (("2.4 GHz", 20), ("5 GHz", 20), ("5 GHz", 80)):
+        candidates = PLAN_CHANNELS[(band, width)]
+        scanned = rng.choice(PLAN_CHANNELS[(band, 20)], args.foreign)
+        external = external_costs(
+            np.asarray(candidates), band, width, channel_center_mhz(scanned, band),
+            np.full(args.foreign, 20.0), rng.uniform(-90, -50, args.foreign)
+        )
+        for count in args.aps:
+            x = rng.uniform(0, args.building[0], count) / DEFAULT_METERS_PER_PIXEL
+            y = rng.uniform(0, args.building[1], count) / DEFAULT_METERS_PER_PIXEL
+            coupling = ap_coupling_dbm(x, y, np.full(count, 20.0), channel_center_mhz(candidates[0], band))
+
+            # Baselines: every AP on the least interfered channel (the old
+            # single recommendation) and plain round-robin reuse
+            single = plan_cost(coupling, band, [candidates[int(np.argmin(external))]] * count, width, external)
+            cyclic = plan_cost(coupling, band, [candidates[i % len(candidates)] for i in range(count)],
+                               width, external)
+            start = time.perf_counter()
+            plan = plan_channels(coupling, band, width, external, time_budget=args.budget)
+            elapsed = time.perf_counter() - start
+            print(f"{band} {width:3d} MHz {count:4d} APs: {elapsed:5.2f} s  cost "
+                  f"single {single:12.4g}  round-robin {cyclic:12.4g}  "
+                  f"greedy {plan.greedy_cost:12.4g}  planned {plan.cost:12.4g}  ({plan.sweeps} sweeps)")
+
+
+if __name__ == '__main__':
+    main()
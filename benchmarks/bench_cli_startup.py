@@ -0,0 +1,54 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from wifimapper_core.history import ScanHistory
+from wifimapper_core.models import ScanRecord
+from wifimapper_core.project import save_project_file
+
+
+def wall_time(command, runs):
+    env = dict(os.environ, PYTHONPATH=ROOT, QT_QPA_PLATFORM="offscreen")
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start-up time of the headless CLI vs the GUI module")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project = os.path.join(tmp, "survey.wmp")
+        networks = [ScanRecord(f"Net-{i}", f"00:11:22:33:44:{i:02x}", 6, -50 - i, "WPA2", 2437.0, "2.4 GHz", 30)
+                    for i in range(20)]
+        history = ScanHistory()
+        history.append_scan(networks)
+        save_project_file(project, networks, np.empty((0, 0), dtype=np.float32), history, {})
+
+        python = [sys.executable]
+        cases = [
+            ("python -c pass", python + ["-c", "pass"]),
+            ("wifimapper --help", python + ["-m", "wifimapper_core", "--help"]),
+            ("wifimapper info", python + ["-m", "wifimapper_core", "info", project]),
+            ("wifimapper channels", python + ["-m", "wifimapper_core", "channels", project]),
+            ("import WiFiMapper (GUI)", python + ["-c", "import WiFiMapper"]),
+        ]
+        for name, command in cases:
+            print(f"{name:26s}: {wall_time(command, args.runs) * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core import deadzones
+from wifimapper_core.deadzones import find_dead_zones
+
+
+def smooth_heatmap(rng, rows, cols, aps):
+    ys, xs = np.mgrid[0:rows, 0:cols]
+    power = np.zeros((rows, cols))
+    for x, y in zip(rng.uniform(0, cols, aps), rng.uniform(0, rows, aps)):
+        power += 10 ** ((-30 - 30 * np.log10(1 + np.hypot(xs - x, ys - y))) / 10)
+    return 10 * np.log10(power)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dead-zone region labelling throughput")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000], help="grid side (cells)")
+    parser.add_argument("--aps", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    labelers = [("fallback", None)]
+    if deadzones.label_function() is not None:
+        labelers.insert(0, ("scipy", deadzones.label_function()))
+    for side in args.sizes:
+        grids = {
+            "smooth": smooth_heatmap(rng, side, side, args.aps),
+            "noise": rng.uniform(-100, -40, (side, side)),
+        }
+        for kind, grid in grids.items():
+            line = f"{side}x{side} {kind:6s}"
+            for name, label in labelers:
+                deadzones._LABEL = label
+                start = time.perf_counter()
+                _, zones = find_dead_zones(grid, 10)
+                line += f"  {name} {time.perf_counter() - start:6.3f} s ({len(zones)} zones)"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PIL import Image, ImageDraw
+from PyQt6.QtWidgets import QApplication
+import pyqtgraph as pg
+
+from WiFiMapper import FloorPlanTiles
+from wifimapper_core.tiles import FloorPlanPyramid
+
+
+def make_plan(file_name, width, height, seed=0):
+    # White plan with a dense grid of thin walls, like a CAD export
+    rng = np.random.default_rng(seed)
+    plan = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(plan)
+    for x in range(0, width, 400):
+        draw.line([(x, 0), (x, height)], fill=(40, 40, 40), width=2)
+    for y in range(0, height, 300):
+        draw.line([(0, y), (width, y)], fill=(40, 40, 40), width=2)
+    for _ in range(2000):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        draw.rectangle([x, y, x + 150, y + 80], outline=(120, 60, 60), width=1)
+    plan.save(file_name, compress_level=1)
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Floor plan tile pyramid: build, reopen and pan/zoom")
+    parser.add_argument("--width", type=int, default=20000)
+    parser.add_argument("--height", type=int, default=15000)
+    parser.add_argument("--views", type=int, default=200, help="random pan/zoom steps")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "plan.png")
+        start = time.perf_counter()
+        make_plan(source, args.width, args.height)
+        print(f"plan {args.width}x{args.height} written in {time.perf_counter() - start:.1f} s "
+              f"(full RGB array would be {args.width * args.height * 3 / 2 ** 20:,.0f} MiB)")
+
+        cache = os.path.join(tmp, "tiles")
+        start = time.perf_counter()
+        FloorPlanPyramid(source, cache_root=cache)
+        print(f"pyramid build (first load)  : {time.perf_counter() - start:7.2f} s")
+        start = time.perf_counter()
+        pyramid = FloorPlanPyramid(source, cache_root=cache)
+        print(f"reopen from disk cache      : {time.perf_counter() - start:7.2f} s "
+              f"(digest of the source file included), {len(pyramid.levels)} levels")
+
+        widget = pg.PlotWidget()
+        widget.resize(1600, 1000)
+        widget.show()
+        plot = widget.getPlotItem()
+        plot.setAspectLocked(True)
+        plot.invertY(True)
+        tiles = FloorPlanTiles(plot, pyramid)
+        rng = np.random.default_rng(1)
+        timings = []
+        shown = []
+        for step in range(args.views):
+            # Alternate whole-plan views with zoomed-in pans
+            span = args.width if step % 10 == 0 else rng.uniform(800, 6000)
+            x = rng.uniform(0, max(args.width - span, 1))
+            y = rng.uniform(0, max(args.height - span * 0.6, 1))
+            start = time.perf_counter()
+            plot.vb.setRange(xRange=(x, x + span), yRange=(y, y + span * 0.6), padding=0)
+            app.processEvents()
+            timings.append(time.perf_counter() - start)
+            shown.append(len(tiles.items))
+        cached = sum(tile.nbytes for tile in tiles.cache.values())
+        print(f"pan/zoom step               : median {np.median(timings) * 1000:6.1f} ms, "
+              f"p95 {np.percentile(timings, 95) * 1000:6.1f} ms, max {max(shown)} tiles on screen")
+        print(f"decoded tiles in memory     : {cached / 2 ** 20:7.1f} MiB ({len(tiles.cache)} tiles)")
+        print(f"peak RSS (includes build)   : {peak_rss_mb():7.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
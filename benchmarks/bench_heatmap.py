@@ -0,0 +1,76 @@
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.heatmap import compute_heatmap, default_ap_position
+
+
+def legacy_heatmap(networks, rows, cols):
+    # The per-cell loop that generate_heatmap used before the vectorised engine
+    heatmap = np.zeros((rows, cols))
+    for network in networks:
+        for i in range(rows):
+            for j in range(cols):
+                distance = np.random.uniform(1, 50)
+                freq_mhz = float(network['frequency'].split()[0])
+                path_loss = 20 * math.log10(distance) + 20 * math.log10(freq_mhz)
+                heatmap[i, j] += network['rssi'] - path_loss
+    return heatmap
+
+
+def make_networks(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'bssid': f"00:11:22:{i // 65536:02x}:{i // 256 % 256:02x}:{i % 256:02x}",
+            'rssi': int(rng.integers(-90, -30)),
+            'frequency': f"{rng.choice([2412.0, 2437.0, 2462.0, 5180.0, 5500.0])} MHz",
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heatmap engine throughput (AP x cell evaluations per second)")
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--resolution", type=int, default=10)
+    parser.add_argument("--aps", type=int, default=80)
+    parser.add_argument("--legacy-rows", type=int, default=2,
+                        help="rows evaluated with the legacy loop (extrapolated to the full grid)")
+    args = parser.parse_args()
+
+    rows, cols = args.height // args.resolution, args.width // args.resolution
+    networks = make_networks(args.aps)
+    evaluations = rows * cols * len(networks)
+    print(f"grid {rows}x{cols}, {len(networks)} APs, {evaluations:,} AP-cell evaluations")
+
+    start = time.perf_counter()
+    legacy_heatmap(networks, args.legacy_rows, cols)
+    legacy_elapsed = time.perf_counter() - start
+    legacy_rate = args.legacy_rows * cols * len(networks) / legacy_elapsed
+    print(f"legacy loop : {legacy_rate:14,.0f} evals/s  (full grid ~{evaluations / legacy_rate:8.1f} s)")
+
+    positions = [default_ap_position(n['bssid'], args.width, args.height) for n in networks]
+    ap_x = np.array([p[0] for p in positions])
+    ap_y = np.array([p[1] for p in positions])
+    tx_dbm = np.array([n['rssi'] for n in networks], dtype=float) + 40
+    freq_mhz = np.array([float(n['frequency'].split()[0]) for n in networks])
+
+    compute_heatmap((rows, cols), args.resolution, ap_x, ap_y, tx_dbm, freq_mhz)  # warm-up
+    runs = 5
+    start = time.perf_counter()
+    for _ in range(runs):
+        compute_heatmap((rows, cols), args.resolution, ap_x, ap_y, tx_dbm, freq_mhz)
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"vectorised  : {evaluations / elapsed:14,.0f} evals/s  (full grid  {elapsed:8.3f} s)")
+    print(f"speed-up    : {legacy_elapsed / (args.legacy_rows * cols * len(networks)) * evaluations / elapsed:,.0f}x")
+
+
+if __name__ == '__main__':
+    main()
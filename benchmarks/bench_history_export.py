@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import resource
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.exporters import HISTORY_EXPORTERS
+from wifimapper_core.history import ScanHistory
+
+
+def synthetic_history(bssids, samples, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"02:00:00:{i // 65536:02x}:{i // 256 % 256:02x}:{i % 256:02x}" for i in range(bssids)]
+    codes = np.repeat(np.arange(bssids, dtype=np.int32), samples)
+    timestamps = np.tile(1.7e9 + 5.0 * np.arange(samples), bssids)
+    columns = {
+        'bssid': codes,
+        'timestamp': timestamps,
+        'rssi': rng.integers(-95, -30, size=len(codes)).astype(np.float32),
+        'snr': rng.integers(0, 50, size=len(codes)).astype(np.float32),
+        'channel': rng.choice(np.array([1, 6, 11, 36, 44], dtype=np.int16), size=len(codes))
+    }
+    return ScanHistory.from_columns(
+        names, [f"Net-{i}" for i in range(bssids)], columns, retention=10 ** 9, capacity=samples
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming scan history export throughput")
+    parser.add_argument("--bssids", type=int, default=2000)
+    parser.add_argument("--samples", type=int, default=2500, help="samples per BSSID")
+    parser.add_argument("--formats", nargs="+", default=list(HISTORY_EXPORTERS))
+    args = parser.parse_args()
+
+    history = synthetic_history(args.bssids, args.samples)
+    print(f"{len(history):,} samples across {args.bssids} BSSIDs, "
+          f"process RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    with tempfile.TemporaryDirectory() as tmp:
+        for extension in args.formats:
+            file_name = os.path.join(tmp, "history" + extension)
+            before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start = time.perf_counter()
+            rows = HISTORY_EXPORTERS[extension](history, file_name)
+            elapsed = time.perf_counter() - start
+            growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+            print(f"{extension:9s} {rows / elapsed:12,.0f} rows/s  {elapsed:7.2f} s  "
+                  f"{os.path.getsize(file_name) / 2 ** 20:8.1f} MiB  peak RSS growth {growth / 1024:6.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.heatmap import DEFAULT_METERS_PER_PIXEL, HeatmapLayers, compute_heatmap
+
+
+def run(args, width, height, meters_per_pixel):
+    rng = np.random.default_rng(0)
+    shape = (height // args.resolution, width // args.resolution)
+    ap_x = rng.uniform(0, width, args.aps)
+    ap_y = rng.uniform(0, height, args.aps)
+    tx_dbm = rng.uniform(-5, 5, args.aps)
+    freq_mhz = rng.choice([2437.0, 5500.0], args.aps)
+    options = dict(meters_per_pixel=meters_per_pixel)
+
+    def sources():
+        return {i: (ap_x[i], ap_y[i], tx_dbm[i], freq_mhz[i]) for i in range(args.aps)}
+
+    start = time.perf_counter()
+    full = compute_heatmap(shape, args.resolution, ap_x, ap_y, tx_dbm, freq_mhz, **options)
+    print(f"full recompute        : {time.perf_counter() - start:7.3f} s")
+
+    layers = HeatmapLayers(shape, args.resolution, meters_per_pixel)
+    start = time.perf_counter()
+    layers.sync(sources())
+    print(f"initial layer build   : {time.perf_counter() - start:7.3f} s")
+    windows = [layers.extent(source) for source in layers.sources.values()]
+    coverage = np.mean([(r1 - r0) * (c1 - c0) for r0, r1, c0, c1 in windows]) / (shape[0] * shape[1])
+    print(f"cutoff {layers.cutoff_dbm:.1f} dBm, AP windows cover {coverage:.0%} of the grid on average")
+
+    for changed in args.changed:
+        timings = []
+        for _ in range(args.scans):
+            # A scan where a few BSSIDs moved by a dB or two
+            picked = rng.choice(args.aps, changed, replace=False)
+            tx_dbm[picked] += rng.uniform(-2, 2, changed)
+            start = time.perf_counter()
+            layers.sync(sources())
+            grid = layers.grid()
+            timings.append(time.perf_counter() - start)
+        full = compute_heatmap(shape, args.resolution, ap_x, ap_y, tx_dbm, freq_mhz, **options)
+        error = np.abs(np.clip(grid, -100, -30) - np.clip(full, -100, -30)).max()
+        print(f"{changed:3d} AP(s) changed     : {np.median(timings):7.3f} s  (max error {error:.4f} dB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental per-AP heatmap refresh vs full recompute")
+    parser.add_argument("--width", type=int, default=10000, help="floor plan width (px)")
+    parser.add_argument("--height", type=int, default=10000, help="floor plan height (px)")
+    parser.add_argument("--resolution", type=int, default=5)
+    parser.add_argument("--aps", type=int, default=200)
+    parser.add_argument("--changed", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--scans", type=int, default=5)
+    parser.add_argument("--campus-size", type=int, default=4000,
+                        help="side (px) of a second, site-wide plan at 1 m/px where AP windows are smaller than the grid")
+    args = parser.parse_args()
+
+    print(f"building: {args.width}x{args.height} px at {DEFAULT_METERS_PER_PIXEL} m/px, {args.aps} APs")
+    run(args, args.width, args.height, DEFAULT_METERS_PER_PIXEL)
+    if args.campus_size:
+        print(f"\ncampus: {args.campus_size}x{args.campus_size} px at 1 m/px, {args.aps} APs")
+        run(args, args.campus_size, args.campus_size, 1.0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.metrics import METRICS, span, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call overhead of metrics spans")
+    parser.add_argument("--calls", type=int, default=1000000)
+    args = parser.parse_args()
+
+    def plain():
+        pass
+
+    decorated = timed("bench_decorated")(plain)
+
+    def with_span():
+        with span("bench_span", kind="context"):
+            pass
+
+    for enabled in (False, True):
+        METRICS.enabled = enabled
+        METRICS.reset()
+        for name, func in (("bare call", plain), ("span()", with_span), ("@timed", decorated)):
+            start = time.perf_counter()
+            for _ in range(args.calls):
+                func()
+            per_call = (time.perf_counter() - start) / args.calls * 1e9
+            print(f"{'enabled ' if enabled else 'disabled'} {name:10s} {per_call:7.0f} ns/call")
+
+
+if __name__ == '__main__':
+    main()
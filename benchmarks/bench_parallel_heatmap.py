@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.heatmap import compute_heatmap, compute_heatmap_parallel, heatmap_executor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiled multi-process heatmap scaling")
+    parser.add_argument("--width", type=int, default=10000, help="floor plan width (px)")
+    parser.add_argument("--height", type=int, default=10000, help="floor plan height (px)")
+    parser.add_argument("--resolution", type=int, default=5)
+    parser.add_argument("--aps", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--tile-size", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    shape = (args.height // args.resolution, args.width // args.resolution)
+    sources = (
+        rng.uniform(0, args.width, args.aps), rng.uniform(0, args.height, args.aps),
+        rng.uniform(10, 23, args.aps), rng.choice([2437.0, 5500.0], args.aps)
+    )
+    evaluations = shape[0] * shape[1] * args.aps
+    print(f"grid {shape[0]}x{shape[1]}, {args.aps} APs, {evaluations:,} evaluations, "
+          f"{os.cpu_count()} CPUs available")
+
+    start = time.perf_counter()
+    reference = compute_heatmap(shape, args.resolution, *sources)
+    single = time.perf_counter() - start
+    print(f"in-process      : {single:7.2f} s")
+
+    for workers in args.workers:
+        with heatmap_executor(workers) as executor:
+            # Warm the pool so process start-up is not counted
+            list(executor.map(abs, range(workers)))
+            start = time.perf_counter()
+            grid = compute_heatmap_parallel(executor, shape, args.resolution, *sources,
+                                            tile_size=args.tile_size)
+            elapsed = time.perf_counter() - start
+        assert np.allclose(grid, reference, atol=1e-3)
+        print(f"{workers} worker(s)     : {elapsed:7.2f} s  speed-up {single / elapsed:4.2f}x")
+
+
+if __name__ == '__main__':
+    main()
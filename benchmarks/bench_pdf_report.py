@@ -0,0 +1,128 @@
+import argparse
+import datetime
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.reports import write_pdf_report
+from wifimapper_core.scanner import ScanTimingPolicy, scan_all
+from wifimapper_core.simulated import SimulatedWiFi
+
+
+def smooth_stack(floors, rows, cols, aps=12, seed=0):
+    # Log-distance heatmaps, so images compress like real ones
+    rng = np.random.default_rng(seed)
+    ys, xs = np.mgrid[0:rows, 0:cols].astype(np.float32)
+    stack = np.empty((floors, rows, cols), dtype=np.float32)
+    for floor in range(floors):
+        power = np.zeros((rows, cols), dtype=np.float32)
+        for x, y in zip(rng.uniform(0, cols, aps), rng.uniform(0, rows, aps)):
+            power += 10 ** ((-30 - 30 * np.log10(1 + np.hypot(xs - x, ys - y) / 4)) / 10)
+        stack[floor] = np.clip(10 * np.log10(power), -100, -30)
+    return stack
+
+
+def write_legacy_pdf(file_name, networks, heatmap):
+    # write_pdf_report before pagination: one page, text past ~9 networks is lost
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    c = canvas.Canvas(file_name, pagesize=letter)
+    c.setFont("Helvetica", 12)
+    c.drawString(100, 750, "WiFiMapper Network Analysis Report")
+    c.drawString(100, 730, f"Generated: {datetime.datetime.now()}")
+    y = 700
+    for network in networks:
+        c.drawString(100, y, f"SSID: {network.ssid}")
+        c.drawString(100, y-20, f"RSSI: {network.rssi} dBm")
+        c.drawString(100, y-40, f"Channel: {network.channel}")
+        c.drawString(100, y-60, f"SNR: {network.snr} dB")
+        y -= 80
+    c.drawString(100, y, "Heatmap Statistics:")
+    c.drawString(100, y-20, f"Average RSSI: {np.mean(heatmap):.1f} dBm")
+    c.save()
+
+
+def measure(func, *args):
+    # Seconds, then peak traced allocations beyond the inputs in a second
+    # run (tracing slows the run down)
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def page_count(file_name):
+    with open(file_name, 'rb') as f:
+        return len(re.findall(rb"/Type /Page[^s]", f.read()))
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def rss_mb():
+    # Current resident set size, from /proc where there is one
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2 ** 20
+    except OSError:
+        return peak_rss_mb()
+
+
+def simulated_networks(count):
+    wifi = SimulatedWiFi(1, bssids=count, scan_latency=0.0)
+    return scan_all(wifi, "", ScanTimingPolicy(min_wait=0.0, poll_interval=0.0, stable_polls=1))
+
+
+def run_case(file_name, count, floors, rows, cols):
+    # Runs in a fresh process, so its peak RSS belongs to this case alone
+    networks = simulated_networks(count)
+    stack = smooth_stack(floors, rows, cols)
+    # A small report first, so imports and font caches are not measured
+    write_pdf_report(file_name, networks[:1], stack[:1, :8, :8])
+    before = rss_mb()
+    elapsed, peak = measure(write_pdf_report, file_name, networks, stack)
+    return elapsed, peak, before, peak_rss_mb(), page_count(file_name), os.path.getsize(file_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF report generation time, pages and memory")
+    parser.add_argument("--networks", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--floors", type=int, nargs="+", default=[1, 20])
+    parser.add_argument("--grid", default="300x400", help="heatmap cells per floor")
+    args = parser.parse_args()
+
+    rows, cols = map(int, args.grid.split("x"))
+    with tempfile.TemporaryDirectory() as tmp:
+        file_name = os.path.join(tmp, "report.pdf")
+        for count in args.networks:
+            for floors in args.floors:
+                with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+                    elapsed, peak, before, after, pages, size = pool.submit(
+                        run_case, file_name, count, floors, rows, cols
+                    ).result()
+                print(f"{count:5d} networks, {floors:2d} floors of {rows}x{cols}: {elapsed:6.2f} s, "
+                      f"{pages:3d} pages, {size / 2 ** 20:6.2f} MiB, traced peak {peak / 2 ** 20:6.1f} MiB, "
+                      f"peak RSS {after:5.0f} MiB (+{after - before:.0f} while writing)")
+            networks = simulated_networks(count)
+            stack = smooth_stack(1, rows, cols)
+            write_pdf_report(file_name, [], None)
+            elapsed, _ = measure(write_legacy_pdf, file_name, networks, stack[0])
+            print(f"{count:5d} networks, legacy single page: {elapsed:6.2f} s, {page_count(file_name):3d} page")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.history import ScanHistory
+from wifimapper_core.models import ScanRecord
+from wifimapper_core.project import load_project_file, save_project_file
+
+
+def make_project(rows, cols, bssids, samples, seed=0):
+    rng = np.random.default_rng(seed)
+    heatmap = rng.uniform(-100, -30, size=(rows, cols)).astype(np.float32)
+    scan_data = [
+        ScanRecord(f"Net-{i}", f"02:00:00:00:{i // 256:02x}:{i % 256:02x}", 6, -60, "WPA2", 2437.0, "2.4 GHz", 20)
+        for i in range(bssids)
+    ]
+    history = ScanHistory(retention=10 ** 9, capacity=samples)
+    for t in range(samples):
+        history.append_scan(
+            [record._replace(rssi=int(rng.integers(-90, -40))) for record in scan_data],
+            timestamp=1.7e9 + 5 * t
+        )
+    return scan_data, heatmap, history
+
+
+def save_json(file_name, scan_data, heatmap):
+    # Version 1 format written by save_project before the binary container
+    with open(file_name, 'w') as f:
+        json.dump({
+            'scan_data': [dict(r._asdict(), frequency=f"{r.frequency} MHz") for r in scan_data],
+            'heatmap_data': heatmap.tolist(),
+            'settings': {}
+        }, f)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project save/load time and size: JSON (v1) vs zip/npy (v2)")
+    parser.add_argument("--grids", nargs="+", default=["300x400", "1500x2000"])
+    parser.add_argument("--bssids", type=int, default=100)
+    parser.add_argument("--samples", type=int, default=1000, help="history samples per BSSID (v2 only)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for grid in args.grids:
+            rows, cols = map(int, grid.split("x"))
+            scan_data, heatmap, history = make_project(rows, cols, args.bssids, args.samples)
+            v1 = os.path.join(tmp, "v1.wmp")
+            v2 = os.path.join(tmp, "v2.wmp")
+
+            _, v1_save = timed(save_json, v1, scan_data, heatmap)
+            _, v1_load = timed(load_project_file, v1)
+            _, v2_save = timed(save_project_file, v2, scan_data, heatmap, history, {})
+            project, v2_load = timed(load_project_file, v2)
+            _, v2_touch = timed(lambda: float(project['heatmap'][rows // 2].mean()))
+
+            print(f"--- heatmap {rows}x{cols}, {args.bssids} BSSIDs "
+                  f"(v2 also stores {len(history):,} history samples)")
+            print(f"JSON v1 : save {v1_save:7.3f} s  load {v1_load:7.3f} s  size {os.path.getsize(v1) / 2 ** 20:8.2f} MiB")
+            print(f"zip  v2 : save {v2_save:7.3f} s  load {v2_load:7.3f} s  size {os.path.getsize(v2) / 2 ** 20:8.2f} MiB"
+                  f"  (first heatmap row read via mmap {v2_touch * 1000:.2f} ms)")
+            del project
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.models import ScanRecord, records_to_array, parse_frequency_mhz
+
+FREQUENCIES = [2412.0, 2437.0, 2462.0, 5180.0, 5500.0, 5745.0]
+
+
+def build_dicts(count):
+    return [
+        {
+            'ssid': f"Net-{i % 500}", 'bssid': f"02:00:00:00:{i // 256 % 256:02x}:{i % 256:02x}",
+            'channel': i % 11 + 1, 'rssi': -30 - i % 60, 'security': "WPA2",
+            'frequency': f"{FREQUENCIES[i % 6]} MHz", 'snr': i % 40
+        }
+        for i in range(count)
+    ]
+
+
+def build_records(count):
+    return [
+        ScanRecord(
+            f"Net-{i % 500}", f"02:00:00:00:{i // 256 % 256:02x}:{i % 256:02x}",
+            i % 11 + 1, -30 - i % 60, "WPA2", FREQUENCIES[i % 6],
+            "2.4 GHz" if i % 6 < 3 else "5 GHz", i % 40
+        )
+        for i in range(count)
+    ]
+
+
+def query_dicts(networks):
+    # Mean 2.4 GHz RSSI, the way the dict code had to do it
+    values = [n['rssi'] for n in networks if parse_frequency_mhz(n['frequency']) < 2500]
+    return sum(values) / len(values)
+
+
+def query_records(records):
+    values = [r.rssi for r in records if r.frequency < 2500]
+    return sum(values) / len(values)
+
+
+def query_array(array):
+    return array['rssi'][array['frequency'] < 2500].mean()
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, size, elapsed
+
+
+def timed(query, data, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        query(data)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and throughput: dict vs ScanRecord vs structured array")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10000, 1000000])
+    args = parser.parse_args()
+
+    for count in args.counts:
+        print(f"--- {count:,} records")
+        dicts, dict_bytes, dict_build = measure(lambda: build_dicts(count))
+        records, record_bytes, record_build = measure(lambda: build_records(count))
+        del dicts
+        array, array_bytes, array_build = measure(lambda: records_to_array(records))
+        dicts = build_dicts(count)
+        rows = [
+            ("dict", dict_bytes, dict_build, timed(query_dicts, dicts)),
+            ("ScanRecord", record_bytes, record_build, timed(query_records, records)),
+            ("structured array", array_bytes, array_build, timed(query_array, array)),
+        ]
+        for name, size, build, query in rows:
+            print(f"{name:17s} {size / count:7.0f} B/record  build {count / build:12,.0f} rec/s  "
+                  f"query {count / query:14,.0f} rec/s")
+        del dicts, records, array
+
+
+if __name__ == '__main__':
+    main()
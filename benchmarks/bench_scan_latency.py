@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PyQt6.QtCore import QElapsedTimer, QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+
+import WiFiMapper
+from wifimapper_core.scanner import scan_interface
+from wifimapper_core.simulated import SimulatedWiFi
+
+
+def measure(app, window, blocking, tick_ms=10):
+    # Record gaps between ticks of a fast timer while one scan runs;
+    # anything well above tick_ms is time the event loop was blocked
+    gaps = []
+    clock = QElapsedTimer()
+    clock.start()
+    last = [clock.elapsed()]
+
+    def tick():
+        now = clock.elapsed()
+        gaps.append(now - last[0])
+        last[0] = now
+
+    ticker = QTimer()
+    ticker.timeout.connect(tick)
+    ticker.start(tick_ms)
+    loop = QEventLoop()
+    if blocking:
+        def run_blocking():
+            for iface in window.wifi.interfaces():
+                scan_interface(iface, window.band_select.currentText())
+            loop.quit()
+        QTimer.singleShot(50, run_blocking)
+    else:
+        def start():
+            window.scan_networks()
+            window.scan_worker.finished.connect(loop.quit)
+        QTimer.singleShot(50, start)
+    loop.exec()
+    # Let one more tick land after the scan
+    QTimer.singleShot(3 * tick_ms, loop.quit)
+    loop.exec()
+    ticker.stop()
+    return np.array(gaps[1:], dtype=float)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI event loop latency during a scan")
+    parser.add_argument("--interfaces", type=int, default=2)
+    parser.add_argument("--networks", type=int, default=60)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = WiFiMapper.WiFiMapper()
+    window.scan_timer.stop()
+    window.band_select.setCurrentIndex(-1)  # No band filter
+    window.wifi = SimulatedWiFi(args.interfaces, bssids=args.networks)
+
+    for label, blocking in (("blocking (GUI thread)", True), ("ScanWorker", False)):
+        start = time.perf_counter()
+        gaps = measure(app, window, blocking)
+        elapsed = time.perf_counter() - start
+        print(f"{label:22s} wall {elapsed:5.2f} s  "
+              f"max gap {gaps.max():7.1f} ms  p99 gap {np.percentile(gaps, 99):7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
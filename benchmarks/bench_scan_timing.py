@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wifimapper_core.scanner import ScanTimingPolicy
+from wifimapper_core.simulated import SimulatedInterface
+
+
+def fixed_sleep_scan(iface):
+    # Behaviour before ScanTimingPolicy: trigger, sleep 2 s, read
+    iface.scan()
+    time.sleep(2)
+    return iface.scan_results()
+
+
+def is_fresh(iface, profiles):
+    # True when the results come from the scan just triggered, not the cache
+    latest = [(p.bssid, p.signal) for p in iface.scan_results()] if not iface.scanning() else None
+    return latest is not None and [(p.bssid, p.signal) for p in profiles] == latest
+
+
+def run(scan, iface, samples):
+    fresh = 0
+    start = time.perf_counter()
+    for _ in range(samples):
+        fresh += is_fresh(iface, scan(iface))
+    return (time.perf_counter() - start) / samples, fresh / samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time per survey sample: fixed sleep vs adaptive polling")
+    parser.add_argument("--samples", type=int, default=3, help="scans per driver latency")
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0.4, 1.0, 2.0, 3.5])
+    args = parser.parse_args()
+
+    print(f"{'driver':>7} {'status':>7} {'results':>9} | {'fixed 2 s':>17} | {'adaptive':>17} | learned")
+    # A stationary scanner at a quiet site gets the same results every scan
+    # (jitter 0), already cached before the first one, so only the scanning
+    # state or the learned duration can end the wait
+    for reports_status, jitter in ((True, 3), (False, 3), (True, 0), (False, 0)):
+        for latency in args.latencies:
+            options = dict(scan_latency=latency, reports_status=reports_status, jitter=jitter)
+            fixed, fixed_fresh = run(fixed_sleep_scan, SimulatedInterface(**options), args.samples)
+            policy = ScanTimingPolicy()
+            iface = SimulatedInterface(**options)
+            if not jitter:
+                iface.scan()
+                time.sleep(latency)
+            adaptive, adaptive_fresh = run(policy.wait_for_results, iface, args.samples)
+            typical = policy.typical.get(iface.name())
+            print(f"{latency:6.1f}s {str(reports_status):>7} {'changing' if jitter else 'unchanged':>9} | "
+                  f"{fixed:5.2f} s {fixed_fresh:4.0%} fresh | "
+                  f"{adaptive:5.2f} s {adaptive_fresh:4.0%} fresh | "
+                  + (f"{typical:.2f} s" if typical is not None else "-"))
+
+
+if __name__ == '__main__':
+    main()
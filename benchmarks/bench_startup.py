@@ -0,0 +1,63 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter: time from interpreter start-up to the first
+# painted main window
+FIRST_WINDOW = """
+import time
+start = time.perf_counter()
+import sys
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import WiFiMapper
+imported = time.perf_counter()
+window = WiFiMapper.WiFiMapper()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+print(imported - start, shown - start)
+"""
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_once(env):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", FIRST_WINDOW],
+        env=env, cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    imported, shown = map(float, result.stdout.split()[-2:])
+    # Cumulative time of each module imported directly by WiFiMapper (or by
+    # the script itself)
+    modules = {}
+    for match in IMPORT_LINE.finditer(result.stderr):
+        if len(match.group(3)) <= 3 and match.group(4) != "WiFiMapper":
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    return imported, shown, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI start-up: import time and time to first window")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="slowest direct imports to list")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    runs = [run_once(env) for _ in range(args.runs)]
+    print(f"import WiFiMapper       : {statistics.median(r[0] for r in runs) * 1000:7.1f} ms")
+    print(f"time to first window    : {statistics.median(r[1] for r in runs) * 1000:7.1f} ms")
+    print("slowest direct imports (median cumulative, -X importtime):")
+    names = set().union(*(r[2] for r in runs))
+    medians = {name: statistics.median(r[2].get(name, 0.0) for r in runs) for name in names}
+    for name, elapsed in sorted(medians.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:28s} {elapsed:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
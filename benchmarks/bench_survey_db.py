@@ -0,0 +1,116 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core.models import ScanRecord, band_of
+from wifimapper_core.surveydb import SurveyDatabase
+
+CHANNELS = (1, 6, 11, 36, 40, 44, 48, 149)
+
+
+def survey_scans(scans, bssids, distinct=100, seed=0):
+    # `scans` scans 5 s apart, ending now, every BSSID heard in each. The
+    # scans cycle through `distinct` pre-built ones so that building them is
+    # not part of the timings
+    rng = np.random.default_rng(seed)
+    channels = rng.choice(CHANNELS, bssids)
+    base = rng.integers(-90, -40, bssids)
+    pool = []
+    for _ in range(min(distinct, scans)):
+        rssi = np.clip(base + rng.integers(-6, 7, bssids), -100, -20)
+        networks = []
+        for i in range(bssids):
+            frequency = 2407 + 5 * channels[i] if channels[i] < 15 else 5000 + 5 * channels[i]
+            networks.append(ScanRecord(f"Net-{i}", f"02:00:00:{i >> 16 & 255:02x}:{i >> 8 & 255:02x}:{i & 255:02x}",
+                                       int(channels[i]), int(rssi[i]), "WPA2", float(frequency), band_of(frequency),
+                                       int(rssi[i]) + 95))
+        pool.append(networks)
+    start = time.time() - 5 * scans
+    return [(start + 5 * scan, pool[scan % len(pool)]) for scan in range(scans)]
+
+
+def insert_per_scan(file_name, scans, bssids):
+    # One transaction per scan and one INSERT per sample, rollback journal
+    scans = survey_scans(scans, bssids)
+    start = time.perf_counter()
+    connection = sqlite3.connect(file_name)
+    connection.execute("CREATE TABLE samples (bssid TEXT, ssid TEXT, timestamp REAL, rssi INTEGER, "
+                       "snr INTEGER, channel INTEGER, x REAL, y REAL)")
+    for timestamp, networks in scans:
+        with connection:
+            for network in networks:
+                connection.execute("INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, NULL, NULL)",
+                                   (network.bssid, network.ssid, timestamp, network.rssi, network.snr,
+                                    network.channel))
+    connection.close()
+    return time.perf_counter() - start
+
+
+def fill(file_name, scans, bssids):
+    # A survey point every 20th scan
+    scans = survey_scans(scans, bssids)
+    start = time.perf_counter()
+    db = SurveyDatabase(file_name)
+    queued = []
+    for scan, (timestamp, networks) in enumerate(scans):
+        before = time.perf_counter()
+        db.append_scan(networks, timestamp)
+        if scan % 20 == 0:
+            db.add_point(scan % 400 * 5, scan // 400 * 5)
+        queued.append(time.perf_counter() - before)
+    db.flush()
+    return db, time.perf_counter() - start, np.array(queued)
+
+
+def time_queries(db, label, repeat=3):
+    bssid = db.latest_scan()[0].bssid
+    queries = {
+        "latest scan": db.latest_scan,
+        "strongest BSSID per survey point": db.strongest_per_point,
+        "RSSI percentiles per channel, last hour": lambda: db.channel_percentiles(3600),
+        "one BSSID, last hour": lambda: db.samples(bssid, 3600)
+    }
+    for name, query in queries.items():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query()
+            best = min(best, time.perf_counter() - start)
+        print(f"  {label:16s} {name:42s} {best * 1000:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Survey database: insert throughput and query latency")
+    parser.add_argument("--scans", type=int, default=10000)
+    parser.add_argument("--bssids", type=int, default=100)
+    parser.add_argument("--baseline-scans", type=int, default=500, help="scans for the per-scan insert baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        elapsed = insert_per_scan(os.path.join(tmp, "baseline.sqlite"), args.baseline_scans, args.bssids)
+        print(f"per-scan transactions: {args.baseline_scans * args.bssids / elapsed:10,.0f} samples/s")
+
+        file_name = os.path.join(tmp, "survey.sqlite")
+        db, elapsed, queued = fill(file_name, args.scans, args.bssids)
+        samples = args.scans * args.bssids
+        print(f"batched WAL writer:    {samples / elapsed:10,.0f} samples/s "
+              f"({samples:,} samples, {os.path.getsize(file_name) / 2 ** 20:.0f} MiB, "
+              f"append_scan median {np.median(queued) * 1e6:.0f} us, max {queued.max() * 1000:.1f} ms)")
+        time_queries(db, "indexed")
+        db.close()
+
+        db = SurveyDatabase(file_name)
+        for index in ("samples_network_time", "samples_time", "samples_scan_rssi", "points_position"):
+            db.connection.execute(f"DROP INDEX {index}")
+        time_queries(db, "without indexes", repeat=1)
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
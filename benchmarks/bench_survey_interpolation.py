@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifimapper_core import interpolation
+from wifimapper_core.interpolation import SurveyPoints, interpolate_idw, interpolate_kriging
+from wifimapper_core.models import ScanRecord
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Survey point interpolation throughput")
+    parser.add_argument("--width", type=int, default=6000, help="floor plan width (px)")
+    parser.add_argument("--height", type=int, default=4000, help="floor plan height (px)")
+    parser.add_argument("--resolution", type=int, default=10)
+    parser.add_argument("--points", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--no-kriging", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    shape = (args.height // args.resolution, args.width // args.resolution)
+    print(f"grid {shape[0]}x{shape[1]}, KD-tree: {'scipy cKDTree' if interpolation.kd_tree_class() else 'unavailable'}")
+    for count in args.points:
+        survey = SurveyPoints()
+        xs = rng.uniform(0, args.width, count)
+        ys = rng.uniform(0, args.height, count)
+        rssi = -40 - 20 * np.log10(1 + np.hypot(xs - args.width / 3, ys - args.height / 2) / 100)
+        rssi += rng.normal(0, 3, count)
+        for x, y, value in zip(xs, ys, rssi):
+            survey.add(x, y, [ScanRecord("", "00:11:22:33:44:55", 6, int(value), "", 2437.0, "2.4 GHz", 0)])
+
+        start = time.perf_counter()
+        samples = survey.samples("00:11:22:33:44:55")
+        extract = time.perf_counter() - start
+        start = time.perf_counter()
+        interpolate_idw(shape, args.resolution, *samples)
+        idw = time.perf_counter() - start
+        line = f"{count:7d} points: samples {extract:6.3f} s  IDW {idw:6.3f} s"
+        if not args.no_kriging:
+            start = time.perf_counter()
+            interpolate_kriging(shape, args.resolution, *samples)
+            line += f"  kriging {time.perf_counter() - start:6.3f} s"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
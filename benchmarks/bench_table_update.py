@@ -0,0 +1,85 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+
+from WiFiMapper import NETWORK_COLUMNS, NetworkTableModel
+from wifimapper_core.models import ScanRecord
+
+
+def make_network(i, rng):
+    return ScanRecord(
+        f"Net-{i}", f"02:00:00:{i // 65536:02x}:{i // 256 % 256:02x}:{i % 256:02x}",
+        rng.choice([1, 6, 11, 36, 40, 44]), rng.randint(-90, -35),
+        "WPA2", 2437.0, "2.4 GHz", rng.randint(5, 50)
+    )
+
+
+def scans(bssids, churn, ticks, seed=0):
+    # Each tick: `churn` of the BSSIDs drop out or appear, and a third of the rest change RSSI
+    rng = random.Random(seed)
+    live = {i: make_network(i, rng) for i in range(bssids)}
+    next_id = bssids
+    for _ in range(ticks):
+        for i in rng.sample(sorted(live), int(len(live) * churn)):
+            del live[i]
+        for _ in range(bssids - len(live)):
+            live[next_id] = make_network(next_id, rng)
+            next_id += 1
+        for i in rng.sample(sorted(live), len(live) // 3):
+            live[i] = live[i]._replace(rssi=live[i].rssi + rng.choice([-2, -1, 1, 2]))
+        yield list(live.values())
+
+
+def rebuild_widget(table, networks):
+    # update_network_table before the model/view table
+    table.setRowCount(len(networks))
+    for i, network in enumerate(networks):
+        for column, (_, field, _) in enumerate(NETWORK_COLUMNS):
+            table.setItem(i, column, QTableWidgetItem(str(getattr(network, field))))
+    table.resizeColumnsToContents()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-scan network table update cost")
+    parser.add_argument("--bssids", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--churn", type=float, default=0.05)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    for count in args.bssids:
+        widget = QTableWidget()
+        widget.setColumnCount(len(NETWORK_COLUMNS))
+        widget.show()
+        ticks = list(scans(count, args.churn, args.ticks))
+        start = time.perf_counter()
+        for networks in ticks:
+            rebuild_widget(widget, networks)
+            app.processEvents()
+        legacy = (time.perf_counter() - start) / args.ticks
+
+        model = NetworkTableModel()
+        view = QTableView()
+        view.setModel(model)
+        view.setSortingEnabled(True)
+        view.sortByColumn(3, Qt.SortOrder.DescendingOrder)
+        view.show()
+        start = time.perf_counter()
+        for networks in ticks:
+            model.update_networks(networks)
+            app.processEvents()
+        incremental = (time.perf_counter() - start) / args.ticks
+        print(f"{count:5d} BSSIDs: QTableWidget rebuild {legacy * 1000:7.1f} ms/tick, "
+              f"NetworkTableModel {incremental * 1000:6.1f} ms/tick ({legacy / incremental:4.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
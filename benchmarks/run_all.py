@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from wifimapper_core.georef import GeoTransform
+from wifimapper_core.heatmap import calibrated_sources, compute_heatmap
+from wifimapper_core.history import ScanHistory
+from wifimapper_core.project import load_project_file, save_project_file
+from wifimapper_core.reports import write_csv_report, write_kmz_report, write_pdf_report
+from wifimapper_core.scanner import ScanTimingPolicy, scan_all
+from wifimapper_core.simulated import SimulatedWiFi
+from wifimapper_core.surveydb import SurveyDatabase
+
+# Reproducible suite over the simulated scanner backend. Each case reports
+# the best of --repeat runs; results are appended to a JSON-lines history
+# and compared with the previous run on the same machine
+DEFAULT_HISTORY = os.path.join(ROOT, "benchmarks", "results", "history.jsonl")
+FAST_POLICY = dict(min_wait=0.0, poll_interval=0.0, stable_polls=1)  # Simulated scans complete instantly
+
+
+def best_of(repeat, func):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def simulated_scans(interfaces, bssids, churn, count, seed=0):
+    wifi = SimulatedWiFi(interfaces, seed=seed, bssids=bssids, churn=churn, scan_latency=0.0)
+    policy = ScanTimingPolicy(**FAST_POLICY)
+    return [scan_all(wifi, "", policy) for _ in range(count)]
+
+
+def bench_scanning(args):
+    bssids = 100 if args.quick else 500
+    wifi = SimulatedWiFi(2, bssids=bssids, churn=0.05, scan_latency=0.0)
+    policy = ScanTimingPolicy(**FAST_POLICY)
+    return {f"scan_all 2x{bssids} BSSIDs": best_of(args.repeat, lambda: scan_all(wifi, "", policy))}
+
+
+def bench_table(args):
+    from PyQt6.QtWidgets import QApplication
+    from WiFiMapper import NetworkTableModel
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    bssids = 200 if args.quick else 1000
+    scans = simulated_scans(1, bssids, 0.05, 20)
+    results = {}
+    model = NetworkTableModel()
+    model.update_networks(scans[0])
+
+    def update():
+        for networks in scans[1:]:
+            model.update_networks(networks)
+    results[f"table update {bssids} rows (per scan)"] = best_of(args.repeat, update) / (len(scans) - 1)
+    app.processEvents()
+    return results
+
+
+def bench_heatmap(args):
+    networks = simulated_scans(1, 50, 0.0, 1)[0]
+    grids = [(75, 100), (300, 400)] if args.quick else [(75, 100), (300, 400), (900, 1200)]
+    results = {}
+    for rows, cols in grids:
+        resolution = 10
+        sources = calibrated_sources(networks, {}, cols * resolution, rows * resolution)
+        results[f"heatmap {rows}x{cols} {len(networks)} APs"] = best_of(
+            args.repeat, lambda: compute_heatmap((rows, cols), resolution, *sources)
+        )
+    return results
+
+
+def bench_project(args):
+    bssids, scans = (100, 50) if args.quick else (300, 500)
+    history = ScanHistory(retention=10 ** 9)
+    for t, networks in enumerate(simulated_scans(1, bssids, 0.02, scans)):
+        history.append_scan(networks, timestamp=1.7e9 + 5 * t)
+    heatmap = np.random.default_rng(0).uniform(-100, -30, (300, 400)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        file_name = os.path.join(tmp, "bench.wmp")
+        label = f"{len(history)} samples"
+        save = best_of(args.repeat, lambda: save_project_file(file_name, networks, heatmap, history, {}))
+        load = best_of(args.repeat, lambda: load_project_file(file_name))
+    return {f"project save ({label})": save, f"project load ({label})": load}
+
+
+def bench_reports(args):
+    networks = simulated_scans(1, 200 if args.quick else 1000, 0.0, 1)[0]
+    heatmap = np.random.default_rng(0).uniform(-100, -30, (300, 400)).astype(np.float32)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        kmz = {
+            'heatmap': heatmap,
+            # 0.05 m per pixel, anchored at 51.5 N 0.12 W
+            'transform': GeoTransform([(0, 0, 51.5, -0.12), (2000, 0, 51.5, -0.11856),
+                                       (0, 1500, 51.49933, -0.12)]),
+            'resolution': 5,
+            'positions': {network.bssid: (i * 7 % 2000, i * 13 % 1500) for i, network in enumerate(networks)}
+        }
+        for extension, writer, options in (("csv", write_csv_report, {}),
+                                           ("pdf", write_pdf_report, {'heatmap': heatmap}),
+                                           ("kmz", write_kmz_report, kmz)):
+            file_name = os.path.join(tmp, f"report.{extension}")
+            try:
+                results[f"report {extension} {len(networks)} networks"] = best_of(
+                    args.repeat, lambda: writer(file_name, networks, **options)
+                )
+            except ImportError as e:
+                print(f"  skipped {extension} report: {e.name} not installed")
+    return results
+
+
+def bench_survey_db(args):
+    bssids, scans = (100, 200) if args.quick else (200, 2000)
+    pool = simulated_scans(1, bssids, 0.02, 20)
+    now = time.time()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        file_name = os.path.join(tmp, "survey.sqlite")
+
+        def fill():
+            if os.path.exists(file_name):
+                os.remove(file_name)
+            db = SurveyDatabase(file_name)
+            for scan in range(scans):
+                db.append_scan(pool[scan % len(pool)], timestamp=now - 5 * (scans - scan))
+                if scan % 20 == 0:
+                    db.add_point(scan % 400, scan // 400)
+            db.close()
+        results[f"survey db insert {scans} scans"] = best_of(args.repeat, fill)
+        db = SurveyDatabase(file_name)
+        results["survey db strongest per point"] = best_of(args.repeat, db.strongest_per_point)
+        results["survey db channel percentiles 1h"] = best_of(
+            args.repeat, lambda: db.channel_percentiles(3600, now=now)
+        )
+        db.close()
+    return results
+
+
+CASES = {
+    "scanning": bench_scanning,
+    "table": bench_table,
+    "heatmap": bench_heatmap,
+    "project": bench_project,
+    "reports": bench_reports,
+    "survey_db": bench_survey_db
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_run(history_file, quick):
+    # Latest earlier run from this machine with the same suite size
+    if not os.path.exists(history_file):
+        return None
+    previous = None
+    with open(history_file) as f:
+        for line in f:
+            run = json.loads(line)
+            if run.get('machine') == platform.node() and run.get('quick') == quick:
+                previous = run
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WiFiMapper benchmark suite (simulated scanner backend)")
+    parser.add_argument("--only", nargs="+", choices=list(CASES), help="run only these cases")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs for a fast check")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is kept)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines results history")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    args = parser.parse_args()
+
+    previous = previous_run(args.history, args.quick)
+    baseline = previous['results'] if previous else {}
+    if previous:
+        print(f"Comparing with {previous.get('commit') or 'unknown commit'} "
+              f"({time.strftime('%Y-%m-%d %H:%M', time.localtime(previous['timestamp']))})")
+    results = {}
+    for name in args.only or CASES:
+        try:
+            measured = CASES[name](args)
+        except ImportError as e:
+            print(f"  skipped {name}: {e.name} not installed")
+            continue
+        for metric, seconds in measured.items():
+            line = f"{metric:45s} {seconds * 1000:10.2f} ms"
+            if metric in baseline:
+                line += f"  ({(seconds / baseline[metric] - 1) * 100:+6.1f}%)"
+            print(line, flush=True)
+        results.update(measured)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'a') as f:
+            f.write(json.dumps({
+                'timestamp': time.time(), 'commit': git_commit(), 'machine': platform.node(),
+                'platform': platform.platform(), 'python': platform.python_version(),
+                'numpy': np.__version__, 'cpus': os.cpu_count(), 'quick': args.quick,
+                'results': results
+            }) + "\n")
+        print(f"Results appended to {args.history}")
+
+
+if __name__ == '__main__':
+    main()
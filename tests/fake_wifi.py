@@ -0,0 +1,80 @@
+import time
+
+from wifimapper_core.models import ScanRecord
+
+IFACE_DISCONNECTED = 0
+IFACE_SCANNING = 1
+
+
+def make_networks(count, rssi=-50):
+    # Scan results of `count` BSSIDs on channel 6, each 1 dB weaker than the last
+    return [
+        ScanRecord(f"Net-{i}", f"02:00:00:00:00:{i:02x}", 6, rssi - i, "WPA2", 2437.0, "2.4 GHz", 40 - i)
+        for i in range(count)
+    ]
+
+
+class FakeProfile:
+    def __init__(self, ssid, bssid, freq_mhz, signal, noise=-95, auth="WPA2"):
+        self.ssid = ssid
+        self.bssid = bssid
+        self.freq = int(freq_mhz * 1000000)  # pywifi reports Hz
+        self.signal = signal
+        self.noise = noise
+        self.auth = auth
+
+
+class FakeInterface:
+    # pywifi interface whose scan takes scan_latency seconds; until then
+    # scan_results() returns the previous scan's results. Every other scan
+    # reads `jitter` dB weaker, so with jitter 0 all scans look the same
+    def __init__(self, name="wlan0", frequencies=(2437, 5180), scan_latency=0.0, fail=False,
+                 reports_status=False, jitter=0):
+        self._name = name
+        self.frequencies = frequencies
+        self.scan_latency = scan_latency
+        self.fail = fail
+        self.reports_status = reports_status
+        self.jitter = jitter
+        self.scan_calls = 0
+        self._scan_started = None
+        self._cached = []
+        self._pending = []
+        
+    def name(self):
+        return self._name
+        
+    def scanning(self):
+        return (self._scan_started is not None
+                and time.monotonic() - self._scan_started < self.scan_latency)
+                
+    def status(self):
+        if not self.reports_status:
+            raise NotImplementedError("driver does not report interface state")
+        return IFACE_SCANNING if self.scanning() else IFACE_DISCONNECTED
+        
+    def scan(self):
+        if self.fail:
+            raise OSError(f"{self._name} is down")
+        if self._scan_started is not None and not self.scanning():
+            self._cached = self._pending
+        self.scan_calls += 1
+        self._scan_started = time.monotonic()
+        offset = self.jitter * (self.scan_calls % 2)
+        self._pending = [
+            FakeProfile(f"{self._name}-{i}", f"02:00:00:00:{len(self._name):02x}:{i:02x}", freq, -40 - i - offset)
+            for i, freq in enumerate(self.frequencies)
+        ]
+        
+    def scan_results(self):
+        if self._scan_started is None or self.scanning():
+            return list(self._cached)
+        return list(self._pending)
+
+
+class FakeWiFi:
+    def __init__(self, interfaces):
+        self._interfaces = interfaces
+        
+    def interfaces(self):
+        return self._interfaces
@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+import pytest
+
+from fake_wifi import make_networks
+from wifimapper_core.building import (
+    BUILDING_CUTOFF_DBM, Building, Floor, building_sources, compute_building_heatmap, reachable_floors
+)
+from wifimapper_core.heatmap import (
+    HEATMAP_DISPLAY_MIN_DBM, PATH_LOSS_EXPONENT, HeatmapCancelled, compute_heatmap, reference_loss_db
+)
+
+SHAPE = (20, 30)
+RESOLUTION = 10
+METERS_PER_PIXEL = 0.1
+
+
+def three_floors():
+    return Building([Floor("Ground"), Floor("First", height_m=4.0, slab_loss_db=12.0),
+                     Floor("Second", slab_loss_db=18.0)])
+
+
+def test_single_floor_matches_flat_heatmap():
+    rng = np.random.default_rng(0)
+    ap_x, ap_y = rng.uniform(0, 300, 5), rng.uniform(0, 200, 5)
+    tx_dbm, freq_mhz = rng.uniform(0, 20, 5), np.full(5, 2437.0)
+    grids = compute_building_heatmap(Building(), SHAPE, RESOLUTION, ap_x, ap_y, np.zeros(5, dtype=np.intp),
+                                     tx_dbm, freq_mhz, meters_per_pixel=METERS_PER_PIXEL)
+    flat = compute_heatmap(SHAPE, RESOLUTION, ap_x, ap_y, tx_dbm, freq_mhz, meters_per_pixel=METERS_PER_PIXEL)
+    assert grids.shape == (1,) + SHAPE
+    np.testing.assert_allclose(grids[0], flat, atol=1e-3)
+
+
+def test_signal_crosses_slabs_in_3d():
+    building = three_floors()
+    grids = compute_building_heatmap(building, SHAPE, RESOLUTION, [5.0], [5.0], [0], [20.0], [2437.0],
+                                     meters_per_pixel=METERS_PER_PIXEL)
+    # Cell (10, 20) is 20 m across and 10 m down from the AP
+    horizontal = math.hypot(20.5 * RESOLUTION * METERS_PER_PIXEL - 0.5, 10.5 * RESOLUTION * METERS_PER_PIXEL - 0.5)
+    for floor, (height, slabs) in enumerate([(0.0, 0.0), (3.5, 12.0), (7.5, 30.0)]):
+        distance = math.hypot(horizontal, height)
+        expected = (20.0 - reference_loss_db(2437.0) - 10 * PATH_LOSS_EXPONENT * math.log10(distance)
+                    - slabs)
+        assert grids[floor, 10, 20] == pytest.approx(expected, abs=1e-3)
+
+
+def test_batches_spanning_floors_match_one_pair_at_a_time():
+    rng = np.random.default_rng(1)
+    ap_x, ap_y = rng.uniform(0, 300, 7), rng.uniform(0, 200, 7)
+    ap_floor = rng.integers(0, 3, 7)
+    tx_dbm, freq_mhz = rng.uniform(0, 20, 7), np.full(7, 2437.0)
+    cells = SHAPE[0] * SHAPE[1]
+    single, batched, whole = (
+        compute_building_heatmap(three_floors(), SHAPE, RESOLUTION, ap_x, ap_y, ap_floor, tx_dbm, freq_mhz,
+                                 meters_per_pixel=METERS_PER_PIXEL, batch_cells=batch_cells)
+        for batch_cells in (cells, 5 * cells, 100 * cells)
+    )
+    np.testing.assert_allclose(batched, single, atol=1e-3)
+    np.testing.assert_allclose(whole, single, atol=1e-3)
+
+
+def test_progress_and_cancellation_between_batches():
+    cells = SHAPE[0] * SHAPE[1]
+    calls = []
+    compute_building_heatmap(three_floors(), SHAPE, RESOLUTION, [5.0, 250.0], [5.0, 150.0], [0, 2],
+                             [20.0, 20.0], [2437.0, 2437.0], meters_per_pixel=METERS_PER_PIXEL,
+                             batch_cells=2 * cells, progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(2, 6), (4, 6), (6, 6)]
+    with pytest.raises(HeatmapCancelled):
+        compute_building_heatmap(three_floors(), SHAPE, RESOLUTION, [5.0], [5.0], [0], [20.0], [2437.0],
+                                 cancelled=lambda: True)
+
+
+def test_reachable_floors_use_a_fixed_cutoff():
+    assert BUILDING_CUTOFF_DBM == HEATMAP_DISPLAY_MIN_DBM - 30.0
+    building = Building([Floor(f"Floor {i}", slab_loss_db=50.0) for i in range(6)])
+    p0 = np.array([10 ** ((20.0 - reference_loss_db(2437.0)) / 10)])
+    lo, hi = reachable_floors(building, np.array([2]), p0)
+    assert (lo[0], hi[0]) == (1, 4)
+    # The range does not depend on how many APs there are
+    many_lo, many_hi = reachable_floors(building, np.full(200, 2), np.repeat(p0, 200))
+    assert (many_lo == 1).all() and (many_hi == 4).all()
+
+
+def test_sources_calibrate_through_slabs():
+    building = three_floors()
+    network = make_networks(1)[0]
+    building.floors[1].ap_positions[network.bssid] = (100.0, 100.0)
+    ap_x, ap_y, ap_floor, tx_dbm, freq_mhz = building_sources(
+        building, [network], 300, 200, scanner_floor=0, scanner_position=(100.0, 100.0),
+        meters_per_pixel=METERS_PER_PIXEL
+    )
+    assert ap_floor.tolist() == [1]
+    expected = (network.rssi + reference_loss_db(2437.0) + 10 * PATH_LOSS_EXPONENT * math.log10(3.5) + 12.0)
+    assert tx_dbm[0] == pytest.approx(expected, abs=1e-3)
+
+
+def test_building_round_trip():
+    building = three_floors()
+    building.floors[2].ap_positions["02:00:00:00:00:01"] = (1.0, 2.0)
+    again = Building.from_dict(building.to_dict())
+    assert again.to_dict() == building.to_dict()
+    assert again.digest() == building.digest()
+    np.testing.assert_allclose(again.elevations(), [0.0, 3.5, 7.5])
+    np.testing.assert_allclose(again.slab_loss_matrix()[0], [0.0, 12.0, 30.0])
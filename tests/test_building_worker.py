@@ -0,0 +1,35 @@
+import numpy as np
+
+from wifimapper_core.building import Building, Floor, compute_building_heatmap
+from WiFiMapper import BuildingHeatmapWorker
+
+SHAPE = (20, 30)
+SOURCES = ([5.0, 250.0], [5.0, 150.0], [0, 1], [20.0, 15.0], [2437.0, 5180.0])
+OPTIONS = {'meters_per_pixel': 0.1}
+
+
+def run_worker(worker):
+    # Runs the worker on this thread and collects what it emits
+    emitted = {'progress': [], 'failed': [], 'results': []}
+    worker.progress.connect(emitted['progress'].append)
+    worker.failed.connect(emitted['failed'].append)
+    worker.result_ready.connect(emitted['results'].append)
+    worker.run()
+    return emitted
+
+
+def test_worker_emits_the_building_stack():
+    building = Building([Floor("Ground"), Floor("First")])
+    emitted = run_worker(BuildingHeatmapWorker(building, SHAPE, 10, SOURCES, OPTIONS))
+    [stack] = emitted['results']
+    np.testing.assert_array_equal(stack, compute_building_heatmap(building, SHAPE, 10, *SOURCES, **OPTIONS))
+    assert emitted['progress'][-1] == 100
+    assert emitted['failed'] == []
+
+
+def test_cancelled_worker_emits_no_result():
+    worker = BuildingHeatmapWorker(Building([Floor("Ground"), Floor("First")]), SHAPE, 10, SOURCES, OPTIONS)
+    worker.cancel()
+    emitted = run_worker(worker)
+    assert emitted['failed'] == ["Heatmap generation cancelled"]
+    assert emitted['results'] == []
@@ -0,0 +1,59 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from fake_wifi import make_networks
+from wifimapper_core.channels import (
+    ap_coupling_dbm, plan_channels, plan_cost, recommend_channel, spectral_overlap
+)
+
+
+def random_coupling(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return ap_coupling_dbm(rng.uniform(0, 2000, count), rng.uniform(0, 1500, count),
+                           np.full(count, 20.0), np.full(count, 2437.0))
+
+
+def test_spectral_overlap():
+    assert spectral_overlap(2412.0, 20, 2412.0, 20) == 1.0
+    assert spectral_overlap(2412.0, 20, 2437.0, 20) == 0.0
+    assert spectral_overlap(2412.0, 20, 2422.0, 20) == pytest.approx(0.5)
+    assert spectral_overlap(5190.0, 40, 5180.0, 20) == pytest.approx(0.5)
+
+
+def test_close_aps_get_separate_channels():
+    coupling = ap_coupling_dbm([0, 50, 100], [0, 0, 0], [20] * 3, [2437.0] * 3)
+    plan = plan_channels(coupling, "2.4 GHz", time_budget=0.5)
+    assert sorted(plan.channels) == [1, 6, 11]
+    assert plan.cost == pytest.approx(plan_cost(coupling, "2.4 GHz", plan.channels))
+
+
+def test_search_lowers_the_cost():
+    coupling = random_coupling(60)
+    plan = plan_channels(coupling, "2.4 GHz", time_budget=1.0)
+    assert plan.cost <= plan.greedy_cost
+    assert plan.cost < plan_cost(coupling, "2.4 GHz", [6] * 60)
+    assert plan.cost == pytest.approx(plan_cost(coupling, "2.4 GHz", plan.channels))
+    assert len(plan.interference_dbm) == 60
+
+
+def test_small_plan_is_optimal():
+    coupling = random_coupling(6, seed=3)
+    best = min(plan_cost(coupling, "2.4 GHz", channels)
+               for channels in itertools.product((1, 6, 11), repeat=6))
+    assert plan_channels(coupling, "2.4 GHz", time_budget=1.0).cost == pytest.approx(best)
+
+
+def test_external_interference_steers_the_plan():
+    coupling = ap_coupling_dbm([0], [0], [20], [2437.0])
+    plan = plan_channels(coupling, "2.4 GHz", external=[100.0, 0.0, 100.0], time_budget=0.1)
+    assert plan.channels == [6]
+
+
+def test_recommend_channel_avoids_busy_channels():
+    networks = [network._replace(channel=channel, frequency=2407.0 + 5 * channel)
+                for network, channel in zip(make_networks(6), (1, 1, 6, 6, 6, 11))]
+    assert recommend_channel(networks, "2.4 GHz") == 11
+    assert recommend_channel(networks[:5], "2.4 GHz") == 11
+    assert recommend_channel([], "5 GHz") == 36
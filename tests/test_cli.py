@@ -0,0 +1,98 @@
+import zipfile
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from fake_wifi import FakeInterface, FakeWiFi, make_networks
+from wifimapper_core import cli, scanner
+from wifimapper_core.history import ScanHistory
+from wifimapper_core.project import load_project_file, save_project_file
+
+
+@pytest.fixture
+def project(tmp_path):
+    # A saved survey with a floor plan and a stored heatmap
+    networks = make_networks(5)
+    floor_plan = tmp_path / "plan.png"
+    Image.new('RGB', (200, 100), 'white').save(floor_plan)
+    history = ScanHistory()
+    history.append_scan(networks, timestamp=1000.0)
+    file_name = str(tmp_path / "survey.wmp")
+    save_project_file(file_name, networks, np.full((10, 20), -60, dtype=np.float32), history,
+                      {'band': "2.4 GHz", 'floor_plan': str(floor_plan), 'heatmap_resolution': 10})
+    return file_name
+
+
+def test_scan_saves_project_and_history(tmp_path, monkeypatch, capsys):
+    wifi = FakeWiFi([FakeInterface("wlan0", reports_status=True)])
+    monkeypatch.setattr(scanner, 'open_wifi', lambda spec=None: wifi)
+    file_name = str(tmp_path / "scan.wmp")
+    history_file = str(tmp_path / "scan.csv")
+    assert cli.main(["scan", "--count", "2", "--interval", "0",
+                     "--project", file_name, "--history", history_file]) == 0
+
+    out = capsys.readouterr().out
+    assert "scan 2: 1 networks, strongest wlan0-0 (-40 dBm)" in out
+    project = load_project_file(file_name)
+    assert [network.ssid for network in project['scan_data']] == ["wlan0-0"]
+    assert len(project['history']) == 2
+    assert "Exported 2 samples" in out
+
+
+def test_scan_without_pywifi(monkeypatch, capsys):
+    monkeypatch.setattr(scanner, 'open_wifi', lambda spec=None: None)
+    assert cli.main(["scan"]) == 1
+    assert "pywifi not installed" in capsys.readouterr().err
+
+
+def test_scan_with_simulated_backend(capsys):
+    assert cli.main(["scan", "--band", "5 GHz", "--backend", "simulated:bssids=30,scan_latency=0.05"]) == 0
+    assert "scan 1: 14 networks" in capsys.readouterr().out
+    assert cli.main(["scan", "--backend", "bluetooth"]) == 1
+    assert "Unknown scanner backend: bluetooth" in capsys.readouterr().err
+
+
+def test_info(project, capsys):
+    assert cli.main(["info", project]) == 0
+    out = capsys.readouterr().out
+    assert "Networks: 5" in out
+    assert "History: 5 BSSIDs, 5 samples" in out
+    assert "Heatmap: 10x20" in out
+
+
+def test_heatmap_renders_computed_and_stored(project, tmp_path):
+    for args in ([], ["--stored"]):
+        output = tmp_path / "heatmap.png"
+        assert cli.main(["heatmap", project, "-o", str(output), *args]) == 0
+        assert Image.open(output).size == (200, 100)
+        output.unlink()
+
+
+def test_report_and_history_export(project, tmp_path, capsys):
+    assert cli.main(["report", project, "-o", str(tmp_path / "report.csv")]) == 0
+    assert (tmp_path / "report.csv").read_text().count("Net-") == 5
+    assert cli.main(["report", project, "-o", str(tmp_path / "report.txt")]) == 1
+    assert "Unsupported report format" in capsys.readouterr().err
+    assert cli.main(["export-history", project, str(tmp_path / "history.parquet")]) == 0
+    assert (tmp_path / "history.parquet").exists()
+
+
+def test_pdf_and_kmz_reports_carry_the_heatmap(project, tmp_path, capsys):
+    pytest.importorskip("reportlab")
+    assert cli.main(["report", project, "-o", str(tmp_path / "report.pdf")]) == 0
+    assert b"/Subtype /Image" in (tmp_path / "report.pdf").read_bytes()
+    assert cli.main(["report", project, "-o", str(tmp_path / "site.kmz")]) == 1
+    assert "georeferenced" in capsys.readouterr().err
+    points = ["--control-point", "0", "0", "51.5", "-0.12", "--control-point", "200", "0", "51.5", "-0.1197",
+              "--control-point", "0", "100", "51.4999", "-0.12"]
+    assert cli.main(["report", project, "-o", str(tmp_path / "site.kmz")] + points) == 0
+    with zipfile.ZipFile(tmp_path / "site.kmz") as kmz:
+        assert "tiles/0/0/0.png" in kmz.namelist()
+
+
+def test_channels(project, capsys):
+    assert cli.main(["channels", project]) == 0
+    out = capsys.readouterr().out
+    assert "Channel 6: 5 networks" in out
+    assert "Recommended channel: 1" in out
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from scipy import ndimage
+
+from wifimapper_core.deadzones import _label_runs, find_dead_zones
+
+
+@pytest.mark.parametrize('density', [0.2, 0.45, 0.6, 0.9])
+def test_label_runs_matches_scipy(density):
+    mask = np.random.default_rng(int(density * 100)).random((120, 90)) < density
+    labels, count = _label_runs(mask)
+    expected, expected_count = ndimage.label(mask)
+    assert count == expected_count
+    np.testing.assert_array_equal(labels, expected)
+
+
+def test_label_runs_joins_u_shapes_and_edges():
+    mask = np.array([
+        [1, 0, 1, 0, 1],
+        [1, 0, 1, 0, 1],
+        [1, 1, 1, 0, 1],
+        [0, 0, 0, 0, 1],
+        [1, 1, 1, 1, 1],
+    ], dtype=bool)
+    labels, count = _label_runs(mask)
+    assert count == 2
+    assert labels[0, 0] == labels[0, 2] != labels[0, 4] == labels[4, 0]
+    assert _label_runs(np.zeros((3, 3), dtype=bool))[1] == 0
+
+
+def test_dead_zones_largest_first_with_stats():
+    heatmap = np.full((20, 30), -50.0, dtype=np.float32)
+    heatmap[2:4, 2:5] = -85    # 6 cells
+    heatmap[10:15, 20:30] = -90  # 50 cells on the right edge
+    heatmap[12, 25] = -99
+    labels, zones = find_dead_zones(heatmap, resolution=10, meters_per_pixel=0.1)
+    assert [zone.cells for zone in zones] == [50, 6]
+    large = zones[0]
+    assert large.area_m2 == pytest.approx(50.0)
+    assert (large.centroid_x, large.centroid_y) == pytest.approx((250.0, 125.0))
+    assert large.worst_rssi == -99
+    assert (labels == large.label).sum() == 50
+
+    _, zones = find_dead_zones(heatmap, resolution=10, min_cells=10)
+    assert [zone.cells for zone in zones] == [50]
+    assert find_dead_zones(np.full((5, 5), -40.0), resolution=10)[1] == []
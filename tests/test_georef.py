@@ -0,0 +1,82 @@
+import re
+import zipfile
+
+import numpy as np
+import pytest
+
+from fake_wifi import make_networks
+from wifimapper_core.georef import EARTH_RADIUS_M, GeoTransform
+from wifimapper_core.reports import SuperOverlay, superoverlay_levels, write_kmz_report
+
+# 0.05 m per pixel, anchored at 51.5 N 0.12 W
+CONTROL_POINTS = [(0, 0, 51.5, -0.12), (2000, 0, 51.5, -0.11856), (0, 1500, 51.49933, -0.12)]
+
+
+def rotated_points(angle, meters_per_pixel=0.1, origin=(47.0, 8.0)):
+    # Control points of a plan rotated by `angle` radians, with exact lat/lon
+    latitude0, longitude0 = origin
+    points = []
+    for x, y in [(0, 0), (800, 0), (0, 600), (800, 600), (400, 300)]:
+        east = (x * np.cos(angle) + y * np.sin(angle)) * meters_per_pixel
+        north = (x * np.sin(angle) - y * np.cos(angle)) * meters_per_pixel
+        latitude = latitude0 + np.degrees(north / EARTH_RADIUS_M)
+        longitude = longitude0 + np.degrees(east / (EARTH_RADIUS_M * np.cos(np.radians(latitude0))))
+        points.append((x, y, latitude, longitude))
+    return points
+
+
+def test_affine_fit_recovers_rotated_plan():
+    transform = GeoTransform(rotated_points(np.radians(30)))
+    assert transform.residuals_m().max() < 0.01
+    assert transform.meters_per_pixel() == pytest.approx(0.1, rel=1e-3)
+    longitude, latitude = transform.to_geo([123.0, 700.0], [45.0, 512.0])
+    x, y = transform.to_pixels(longitude, latitude)
+    np.testing.assert_allclose(x, [123.0, 700.0], atol=1e-6)
+    np.testing.assert_allclose(y, [45.0, 512.0], atol=1e-6)
+
+
+def test_round_trip_and_invalid_points():
+    transform = GeoTransform.from_dict(GeoTransform(CONTROL_POINTS).to_dict())
+    assert transform.control_points == [tuple(map(float, point)) for point in CONTROL_POINTS]
+    with pytest.raises(ValueError):
+        GeoTransform(CONTROL_POINTS[:2])
+    with pytest.raises(ValueError):
+        GeoTransform([(0, 0, 51.5, -0.12), (10, 10, 51.4, -0.11), (20, 20, 51.3, -0.10)])
+
+
+def test_superoverlay_levels_halve_to_one_tile():
+    assert superoverlay_levels((1500, 2000), 256) == [(250, 188), (500, 375), (1000, 750), (2000, 1500)]
+    assert superoverlay_levels((100, 80), 256) == [(80, 100)]
+
+
+def test_kmz_is_a_superoverlay_pyramid(tmp_path):
+    transform = GeoTransform(CONTROL_POINTS)
+    networks = make_networks(3)
+    positions = {networks[0].bssid: (100, 200), networks[2].bssid: (1500, 900)}
+    heatmap = np.linspace(-100, -30, 150 * 200, dtype=np.float32).reshape(150, 200)
+    file_name = tmp_path / "site.kmz"
+    write_kmz_report(str(file_name), networks, heatmap, transform=transform, resolution=10,
+                     positions=positions, tile_size=64)
+    overlay = SuperOverlay(heatmap.shape, 10, transform, 64)
+    with zipfile.ZipFile(file_name) as kmz:
+        names = kmz.namelist()
+        doc = kmz.read("doc.kml").decode()
+        root = kmz.read("tiles/0/0/0.kml").decode()
+        leaf = kmz.read(f"tiles/{len(overlay.levels) - 1}/0/0.kml").decode()
+    assert names[0] == "doc.kml"
+    # Only networks with a known position become placemarks
+    assert doc.count("<Placemark>") == 2 and "Net-1" not in doc
+    assert "tiles/0/0/0.kml" in doc
+    tiles = sum(columns * rows for columns, rows in map(overlay.tile_grid, range(len(overlay.levels))))
+    assert sum(name.endswith(".png") for name in names) == tiles
+    assert root.count("<NetworkLink>") == 4 and "gx:LatLonQuad" in root
+    assert "<NetworkLink>" not in leaf and "<maxLodPixels>-1</maxLodPixels>" in leaf
+    # The placemark lands where the transform puts its plan position
+    longitude, latitude = transform.to_geo(100, 200)
+    coordinates = re.search(r"<coordinates>([^<]+),0</coordinates>", doc).group(1)
+    assert [float(value) for value in coordinates.split(",")] == pytest.approx([longitude, latitude])
+
+
+def test_kmz_needs_a_georeference(tmp_path):
+    with pytest.raises(ValueError):
+        write_kmz_report(str(tmp_path / "site.kmz"), make_networks(1))
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+
+from wifimapper_core.heatmap import (
+    NOISE_FLOOR_MW, PATH_LOSS_EXPONENT, compute_heatmap, default_ap_position
+)
+from wifimapper_core.models import parse_frequency_mhz
+
+
+def reference_heatmap(shape, resolution, ap_x, ap_y, tx_dbm, freq_mhz, meters_per_pixel):
+    # The path loss model one cell and one AP at a time
+    rows, cols = shape
+    grid = np.empty(shape)
+    for row in range(rows):
+        for col in range(cols):
+            x = (col + 0.5) * resolution * meters_per_pixel
+            y = (row + 0.5) * resolution * meters_per_pixel
+            total_mw = 0.0
+            for i in range(len(ap_x)):
+                distance = max(math.hypot(x - ap_x[i] * meters_per_pixel, y - ap_y[i] * meters_per_pixel), 1.0)
+                loss_db = 20 * math.log10(freq_mhz[i]) - 27.55 + 10 * PATH_LOSS_EXPONENT * math.log10(distance)
+                total_mw += 10 ** ((tx_dbm[i] - loss_db) / 10)
+            grid[row, col] = 10 * math.log10(max(total_mw, NOISE_FLOOR_MW))
+    return grid
+
+
+def sources(count=6, width=400, height=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(0, width, count), rng.uniform(0, height, count),
+            rng.uniform(-5, 20, count), rng.choice([2437.0, 5180.0], count))
+
+
+def test_matches_per_cell_model():
+    ap_x, ap_y, tx_dbm, freq_mhz = sources()
+    grid = compute_heatmap((30, 40), 10, ap_x, ap_y, tx_dbm, freq_mhz, meters_per_pixel=0.1)
+    expected = reference_heatmap((30, 40), 10, ap_x, ap_y, tx_dbm, freq_mhz, 0.1)
+    assert grid.dtype == np.float32
+    np.testing.assert_allclose(grid, expected, atol=1e-3)
+
+
+def test_batch_size_does_not_change_result():
+    ap_x, ap_y, tx_dbm, freq_mhz = sources(count=20)
+    whole = compute_heatmap((30, 40), 10, ap_x, ap_y, tx_dbm, freq_mhz)
+    one_at_a_time = compute_heatmap((30, 40), 10, ap_x, ap_y, tx_dbm, freq_mhz, batch_cells=1)
+    np.testing.assert_allclose(one_at_a_time, whole, atol=1e-4)
+
+
+def test_no_aps_gives_noise_floor():
+    grid = compute_heatmap((3, 4), 10, [], [], [], [])
+    np.testing.assert_allclose(grid, 10 * np.log10(NOISE_FLOOR_MW))
+
+
+def test_default_ap_position_is_stable_and_on_the_plan():
+    x, y = default_ap_position("02:00:00:00:00:01", 400, 300)
+    assert (x, y) == default_ap_position("02:00:00:00:00:01", 400, 300)
+    assert 0 <= x < 400 and 0 <= y < 300
+    assert (x, y) != default_ap_position("02:00:00:00:00:02", 400, 300)
+
+
+def test_parse_frequency():
+    assert parse_frequency_mhz("2437.0 MHz") == 2437.0
+    assert parse_frequency_mhz(5180) == 5180.0
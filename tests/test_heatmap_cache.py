@@ -0,0 +1,61 @@
+import numpy as np
+
+from wifimapper_core.heatmap import HeatmapCache, heatmap_cache_key
+
+SOURCES = ([10.0], [20.0], [20.0], [2437.0])
+
+
+def grid(value, side=10):
+    return np.full((side, side), value, dtype=np.float32)
+
+
+def test_hit_returns_read_only_grid():
+    cache = HeatmapCache()
+    cache.put('a', grid(-50))
+    cached = cache.get('a')
+    np.testing.assert_array_equal(cached, grid(-50))
+    assert not cached.flags.writeable
+    assert cache.get('b') is None
+
+
+def test_put_leaves_the_callers_array_alone():
+    cache = HeatmapCache()
+    original = grid(-50)
+    cache.put('a', original)
+    assert original.flags.writeable
+    original[:] = -90
+    np.testing.assert_array_equal(cache.get('a'), grid(-50))
+
+
+def test_evicts_least_recently_used():
+    cache = HeatmapCache(max_bytes=2 * grid(0).nbytes)
+    cache.put('a', grid(-50))
+    cache.put('b', grid(-60))
+    cache.get('a')
+    cache.put('c', grid(-70))
+    assert list(cache.entries) == ['a', 'c']
+    assert cache.get('b') is None
+    assert cache.nbytes == 2 * grid(0).nbytes
+
+
+def test_evicted_grids_spill_and_reload(tmp_path):
+    cache = HeatmapCache(max_bytes=grid(0).nbytes, spill_dir=str(tmp_path))
+    cache.put('a', grid(-50))
+    cache.put('b', grid(-60))
+    assert list(cache.entries) == ['b']
+    assert (tmp_path / "a.npy").exists()
+
+    np.testing.assert_array_equal(cache.get('a'), grid(-50))
+    assert list(cache.entries) == ['a']
+    assert (tmp_path / "b.npy").exists()
+
+
+def test_key_covers_every_input():
+    plan = "plan-digest"
+    key = heatmap_cache_key(plan, 5, "All Bands", SOURCES, 0.05)
+    assert key == heatmap_cache_key(plan, 5, "All Bands", SOURCES, 0.05)
+    assert key != heatmap_cache_key("other-plan", 5, "All Bands", SOURCES, 0.05)
+    assert key != heatmap_cache_key(plan, 10, "All Bands", SOURCES, 0.05)
+    assert key != heatmap_cache_key(plan, 5, "5 GHz", SOURCES, 0.05)
+    assert key != heatmap_cache_key(plan, 5, "All Bands", ([11.0],) + SOURCES[1:], 0.05)
+    assert key != heatmap_cache_key(plan, 5, "All Bands", SOURCES, 0.1)
@@ -0,0 +1,72 @@
+import numpy as np
+
+from wifimapper_core.heatmap import HeatmapLayers, compute_heatmap, layer_cutoff_dbm
+
+RESOLUTION = 5
+
+
+def random_sources(count, width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        f"ap{i}": (rng.uniform(0, width), rng.uniform(0, height), rng.uniform(-5, 5),
+                   rng.choice([2437.0, 5500.0]))
+        for i in range(count)
+    }
+
+
+def full_recompute(shape, sources, meters_per_pixel, resolution=RESOLUTION):
+    ap_x, ap_y, tx_dbm, freq_mhz = zip(*sources.values())
+    return compute_heatmap(shape, resolution, ap_x, ap_y, tx_dbm, freq_mhz,
+                           meters_per_pixel=meters_per_pixel)
+
+
+def displayed(grid):
+    return np.clip(grid, -100, -30)
+
+
+def test_incremental_updates_match_full_recompute():
+    shape, meters_per_pixel = (120, 160), 0.05
+    sources = random_sources(30, 800, 600)
+    layers = HeatmapLayers(shape, RESOLUTION, meters_per_pixel)
+    assert layers.sync(sources) == 30
+
+    sources['ap3'] = (100.0, 100.0, 3.0, 5500.0)
+    sources['new'] = (700.0, 50.0, 0.0, 2437.0)
+    del sources['ap7']
+    assert layers.sync(sources) == 3
+    error = np.abs(displayed(layers.grid()) - displayed(full_recompute(shape, sources, meters_per_pixel)))
+    assert error.max() < 0.4
+
+
+def test_windows_are_smaller_than_a_site_wide_grid():
+    # A 4 km site at 1 m/px is wider than any AP reaches above the cutoff
+    shape, meters_per_pixel = (200, 200), 1.0
+    sources = random_sources(40, 4000, 4000)
+    layers = HeatmapLayers(shape, 20, meters_per_pixel)
+    layers.sync(sources)
+    areas = [(r1 - r0) * (c1 - c0) for r0, r1, c0, c1 in map(layers.extent, layers.sources.values())]
+    assert np.mean(areas) < shape[0] * shape[1] / 4
+
+    error = np.abs(displayed(layers.grid()) - displayed(full_recompute(shape, sources, meters_per_pixel, 20)))
+    assert error.max() < 0.4
+
+
+def test_cutoff_follows_ap_count_with_hysteresis():
+    layers = HeatmapLayers((40, 40), RESOLUTION)
+    sources = random_sources(9, 200, 200)
+    layers.sync(sources)
+    assert layers.capacity == 16
+    assert layers.cutoff_dbm == layer_cutoff_dbm(16)
+
+    del sources['ap0']
+    layers.sync(sources)
+    assert layers.capacity == 16
+    layers.sync({key: sources[key] for key in list(sources)[:3]})
+    assert layers.capacity == 4
+
+
+def test_removing_every_source_clears_the_grid():
+    layers = HeatmapLayers((40, 40), RESOLUTION, cutoff_dbm=-130.0)
+    layers.sync(random_sources(5, 200, 200))
+    layers.sync({})
+    assert not layers.total_mw.any()
@@ -0,0 +1,45 @@
+import numpy as np
+
+from fake_wifi import make_networks
+from wifimapper_core.history import ScanHistory
+
+
+def test_ring_keeps_newest_samples():
+    networks = make_networks(20)
+    history = ScanHistory(capacity=4)
+    for scan in range(10):
+        history.append_scan(networks, timestamp=float(scan))
+    samples = history.samples(networks[0].bssid)
+    np.testing.assert_array_equal(samples['timestamp'], [6.0, 7.0, 8.0, 9.0])
+    assert len(history) == 4 * len(networks)
+
+
+def test_ring_grows_before_evicting():
+    network = make_networks(1)
+    history = ScanHistory(capacity=100)
+    for scan in range(70):
+        history.append_scan(network, timestamp=float(scan))
+    samples = history.samples(network[0].bssid)
+    np.testing.assert_array_equal(samples['timestamp'], np.arange(70.0))
+
+
+def test_retention_evicts_old_samples_and_bssids():
+    networks = make_networks(20)
+    history = ScanHistory(retention=60)
+    history.append_scan(networks, timestamp=0.0)
+    history.append_scan(networks[:5], timestamp=30.0)
+    history.append_scan(networks[:5], timestamp=100.0)
+    # Everything before t=40 is gone, and with it the BSSIDs not heard since
+    assert sorted(history.bssids()) == sorted(network.bssid for network in networks[:5])
+    np.testing.assert_array_equal(history.samples(networks[0].bssid)['timestamp'], [100.0])
+    assert history.samples(networks[10].bssid) is None
+
+
+def test_window_stats():
+    network = make_networks(1)
+    history = ScanHistory()
+    for scan in range(10):
+        history.append_scan([network[0]._replace(rssi=-60 - scan)], timestamp=float(scan))
+    stats = history.stats(network[0].bssid, window=4.5, now=9.0)
+    assert stats['count'] == 5
+    assert (stats['min'], stats['max'], stats['p50']) == (-69.0, -65.0, -67.0)
@@ -0,0 +1,50 @@
+import csv
+
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from fake_wifi import make_networks
+from wifimapper_core.exporters import HISTORY_EXPORTERS, _export_history_csv_module
+from wifimapper_core.history import ScanHistory
+
+
+def make_history(scans=5):
+    networks = make_networks(6)
+    history = ScanHistory()
+    for scan in range(scans):
+        history.append_scan(networks, timestamp=1700000000.0 + scan)
+    return history
+
+
+def read_csv(file_name):
+    with open(file_name, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_exports_write_every_sample(tmp_path):
+    history = make_history()
+    for suffix, exporter in HISTORY_EXPORTERS.items():
+        file_name = str(tmp_path / f"history{suffix}")
+        assert exporter(history, file_name, chunk_size=7) == 30
+
+    parquet = pq.read_table(str(tmp_path / "history.parquet"))
+    assert parquet.num_rows == 30
+    assert parquet.column_names == ['timestamp', 'ssid', 'bssid', 'channel', 'rssi', 'snr']
+    assert feather.read_table(str(tmp_path / "history.feather")).equals(parquet)
+
+    rows = read_csv(tmp_path / "history.csv")
+    assert len(rows) == 30
+    assert sorted({row['bssid'] for row in rows}) == history.bssids()
+
+
+def test_csv_module_fallback_matches_arrow(tmp_path):
+    history = make_history()
+    arrow_file = str(tmp_path / "arrow.csv")
+    fallback_file = str(tmp_path / "fallback.csv")
+    HISTORY_EXPORTERS['.csv'](history, arrow_file)
+    assert _export_history_csv_module(history, fallback_file, 4) == 30
+
+    arrow, fallback = read_csv(arrow_file), read_csv(fallback_file)
+    for name in ('ssid', 'bssid', 'channel'):
+        assert [row[name] for row in fallback] == [row[name] for row in arrow]
+    assert [float(row['rssi']) for row in fallback] == [float(row['rssi']) for row in arrow]
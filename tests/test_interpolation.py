@@ -0,0 +1,56 @@
+import numpy as np
+
+from fake_wifi import make_networks
+from wifimapper_core.interpolation import (
+    SurveyPoints, _nearest_brute_force, interpolate_idw, interpolate_kriging, nearest_neighbours
+)
+
+SHAPE = (30, 40)
+RESOLUTION = 10
+
+
+def survey_cells(count=25, seed=0):
+    # Survey points on cell centres, with a smooth signal plus noise
+    rng = np.random.default_rng(seed)
+    cells = rng.choice(SHAPE[0] * SHAPE[1], count, replace=False)
+    rows, cols = np.divmod(cells, SHAPE[1])
+    xs = (cols + 0.5) * RESOLUTION
+    ys = (rows + 0.5) * RESOLUTION
+    values = -40 - 0.1 * np.hypot(xs - 200, ys - 150) + rng.normal(0, 2, count)
+    return rows, cols, xs, ys, values
+
+
+def test_idw_is_exact_at_survey_points():
+    rows, cols, xs, ys, values = survey_cells()
+    grid = interpolate_idw(SHAPE, RESOLUTION, xs, ys, values)
+    np.testing.assert_allclose(grid[rows, cols], values, atol=1e-3)
+    assert values.min() - 1e-3 <= grid.min() and grid.max() <= values.max() + 1e-3
+
+
+def test_kriging_is_exact_at_survey_points():
+    rows, cols, xs, ys, values = survey_cells()
+    grid = interpolate_kriging(SHAPE, RESOLUTION, xs, ys, values)
+    np.testing.assert_allclose(grid[rows, cols], values, atol=0.05)
+    assert np.isfinite(grid).all()
+
+
+def test_brute_force_neighbours_match_tree():
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0, 100, (50, 2))
+    queries = rng.uniform(0, 100, (200, 2))
+    distances, idx = nearest_neighbours(points, 6)(queries)
+    brute_distances, brute_idx = _nearest_brute_force(points, queries, 6)
+    order = np.argsort(brute_distances, axis=1)
+    np.testing.assert_allclose(np.take_along_axis(brute_distances, order, axis=1), distances)
+    np.testing.assert_array_equal(np.take_along_axis(brute_idx, order, axis=1), idx)
+
+
+def test_survey_samples_per_bssid_and_strongest():
+    networks = make_networks(3)
+    survey = SurveyPoints()
+    survey.add(10, 20, networks)
+    survey.add(30, 40, networks[1:])
+    xs, ys, rssi = survey.samples(networks[0].bssid)
+    assert (xs.tolist(), ys.tolist(), rssi.tolist()) == ([10], [20], [networks[0].rssi])
+    xs, ys, rssi = survey.samples()
+    assert (xs.tolist(), rssi.tolist()) == ([10, 30], [networks[0].rssi, networks[1].rssi])
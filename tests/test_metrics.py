@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from fake_wifi import make_networks
+from wifimapper_core import cli, metrics
+from wifimapper_core.heatmap import compute_heatmap
+from wifimapper_core.history import ScanHistory
+from wifimapper_core.metrics import METRICS, MetricsRegistry
+from wifimapper_core.project import save_project_file
+
+SOURCES = ([10.0], [20.0], [20.0], [2437.0])
+
+
+@pytest.fixture
+def collecting(monkeypatch):
+    monkeypatch.setattr(METRICS, 'enabled', True)
+    METRICS.reset()
+    yield METRICS
+    METRICS.reset()
+
+
+def test_disabled_spans_record_nothing():
+    registry = MetricsRegistry()
+    with registry.span("scan"):
+        pass
+    assert registry.span("scan") is registry.span("export")
+    assert registry.snapshot() == []
+
+
+def test_instrumented_calls_record_when_enabled(collecting):
+    compute_heatmap((10, 10), 5, *SOURCES)
+    compute_heatmap((10, 10), 5, *SOURCES)
+    with metrics.span("scan", interfaces=2):
+        pass
+    spans = {span['name']: span for span in collecting.snapshot()}
+    assert spans['heatmap_compute']['labels'] == {'mode': "serial"}
+    assert spans['heatmap_compute']['count'] == 2
+    assert sum(spans['heatmap_compute']['buckets']) == 2
+    assert spans['scan']['labels'] == {'interfaces': 2}
+
+
+def test_prometheus_buckets_are_cumulative():
+    registry = MetricsRegistry(enabled=True)
+    for seconds in (0.002, 0.02, 0.2, 60.0):
+        registry.record(("export_history", (('format', "csv"),)), seconds)
+    lines = registry.to_prometheus().splitlines()
+    assert 'wifimapper_span_seconds_bucket{span="export_history",format="csv",le="0.0025"} 1' in lines
+    assert 'wifimapper_span_seconds_bucket{span="export_history",format="csv",le="0.25"} 3' in lines
+    assert 'wifimapper_span_seconds_bucket{span="export_history",format="csv",le="+Inf"} 4' in lines
+    assert 'wifimapper_span_seconds_count{span="export_history",format="csv"} 4' in lines
+
+    span = json.loads(registry.to_json())['spans'][0]
+    assert span['buckets']['0.25'] == 3
+    assert span['max_s'] == 60.0
+
+
+def test_cli_dumps_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(METRICS, 'enabled', False)
+    METRICS.reset()
+    history = ScanHistory()
+    history.append_scan(make_networks(3), timestamp=1000.0)
+    project = str(tmp_path / "survey.wmp")
+    save_project_file(project, [], None, history, {})
+    output = tmp_path / "metrics.prom"
+    assert cli.main(["--metrics", str(output), "export-history", project, str(tmp_path / "history.csv")]) == 0
+    METRICS.reset()
+    assert 'wifimapper_span_seconds_count{span="export_history",format="csv"} 1' in output.read_text()
@@ -0,0 +1,63 @@
+from PyQt6.QtCore import QPersistentModelIndex
+
+from fake_wifi import make_networks
+from WiFiMapper import NETWORK_COLUMNS, NetworkTableModel
+
+
+def rows(model):
+    return [model.network(row) for row in range(model.rowCount())]
+
+
+def changed_rssi(network, delta):
+    return network._replace(rssi=network.rssi + delta)
+
+
+def test_update_applies_only_the_diff():
+    networks = make_networks(11)
+    model = NetworkTableModel()
+    removed, inserted, changed = [], [], []
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row())))
+
+    assert model.update_networks(networks[:10]) == (10, 0, 0)
+    assert inserted == [(0, 9)]
+
+    # Rows 2 and 3 vanish, row 5 changes and one BSSID is new
+    update = [network for row, network in enumerate(networks[:10]) if row not in (2, 3)]
+    update[3] = changed_rssi(update[3], 4)
+    assert model.update_networks(update + [networks[10]]) == (1, 2, 1)
+    assert removed == [(2, 3)]
+    assert inserted[-1] == (8, 8)
+    assert changed == [(3, 3)]
+    assert rows(model) == update + [networks[10]]
+
+    # An unchanged scan emits nothing
+    assert model.update_networks(update + [networks[10]]) == (0, 0, 0)
+    assert changed == [(3, 3)]
+
+
+def test_duplicate_bssid_keeps_strongest():
+    network = make_networks(1)[0]
+    model = NetworkTableModel()
+    model.update_networks([changed_rssi(network, -10), network])
+    assert rows(model) == [network]
+
+
+def test_sorted_model_stays_sorted_and_keeps_selection():
+    networks = make_networks(15)
+    model = NetworkTableModel()
+    rssi_column = [field for _, field, _ in NETWORK_COLUMNS].index('rssi')
+    model.sort(rssi_column)
+    model.update_networks(networks[:10])
+    selected = model.index(0, 0)
+    bssid = model.network(selected.row()).bssid
+    anchor = QPersistentModelIndex(selected)
+
+    update = networks[5:15]
+    update[0] = changed_rssi(update[0], -30)
+    model.update_networks(update)
+    rssi = [network.rssi for network in rows(model)]
+    assert rssi == sorted(rssi)
+    assert {network.bssid for network in rows(model)} == {network.bssid for network in update}
+    assert model.network(anchor.row()).bssid == bssid
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from wifimapper_core.heatmap import (
+    HeatmapCancelled, compute_heatmap, compute_heatmap_parallel, heatmap_executor, heatmap_tiles
+)
+
+SHAPE = (70, 90)
+SOURCES = ([40.0, 300.0, 410.0], [30.0, 200.0, 330.0], [20.0, 17.0, 23.0], [2437.0, 5180.0, 5500.0])
+
+
+@pytest.fixture(scope='module')
+def executor():
+    executor = heatmap_executor(2)
+    yield executor
+    executor.shutdown()
+
+
+def test_tiles_cover_the_grid_once():
+    covered = np.zeros(SHAPE, dtype=int)
+    for r0, r1, c0, c1 in heatmap_tiles(SHAPE, 32):
+        covered[r0:r1, c0:c1] += 1
+    assert (covered == 1).all()
+
+
+def test_offset_tile_matches_full_grid():
+    full = compute_heatmap(SHAPE, 5, *SOURCES)
+    tile = compute_heatmap((20, 30), 5, *SOURCES, row_offset=40, col_offset=50)
+    np.testing.assert_array_equal(tile, full[40:60, 50:80])
+
+
+def test_parallel_matches_serial(executor):
+    progress = []
+    grid = compute_heatmap_parallel(executor, SHAPE, 5, *SOURCES, tile_size=32,
+                                    progress=lambda done, total: progress.append((done, total)))
+    np.testing.assert_allclose(grid, compute_heatmap(SHAPE, 5, *SOURCES), atol=1e-4)
+    assert progress[-1] == (9, 9)
+
+
+def test_cancel_stops_generation(executor):
+    with pytest.raises(HeatmapCancelled):
+        compute_heatmap_parallel(executor, SHAPE, 5, *SOURCES, tile_size=8, cancelled=lambda: True)
+    # The pool is still usable after a cancelled job
+    grid = compute_heatmap_parallel(executor, (10, 10), 5, *SOURCES)
+    np.testing.assert_allclose(grid, compute_heatmap((10, 10), 5, *SOURCES), atol=1e-4)
@@ -0,0 +1,60 @@
+import numpy as np
+
+from wifimapper_core.placement import candidate_sites, placement_resolution, plan_ap_placement
+from wifimapper_core.propagation import WallCrossingIndex, predict_coverage
+
+RESOLUTION = 10
+METERS_PER_PIXEL = 0.2  # 200 x 120 m floor
+
+
+def best_server(shape, positions, wall_index=None):
+    # Strongest single AP per cell, computed independently of the planner
+    return np.max([
+        predict_coverage(shape, RESOLUTION, [x], [y], [20.0], [2437.0], wall_index=wall_index,
+                         meters_per_pixel=METERS_PER_PIXEL)
+        for x, y in positions
+    ], axis=0)
+
+
+def test_plan_meets_the_coverage_target():
+    area = np.ones((60, 100), dtype=bool)
+    result = plan_ap_placement(area, RESOLUTION, 20.0, 2437.0, meters_per_pixel=METERS_PER_PIXEL,
+                               time_budget=1.0)
+    assert result.coverage >= 0.95
+    assert len(result.positions) <= result.greedy_aps
+    signal = best_server(area.shape, result.positions)
+    assert np.mean(signal[area] >= -67) >= 0.95
+
+
+def test_walls_need_more_aps():
+    area = np.ones((60, 100), dtype=bool)
+    open_plan = plan_ap_placement(area, RESOLUTION, 20.0, 2437.0, meters_per_pixel=METERS_PER_PIXEL,
+                                  time_budget=0.5)
+    walls = np.zeros(area.shape, dtype=np.float32)
+    walls[:, 25::25] = 15
+    walls[30, :] = 15
+    wall_index = WallCrossingIndex(walls)
+    walled = plan_ap_placement(area & (walls == 0), RESOLUTION, 20.0, 2437.0, wall_index=wall_index,
+                               meters_per_pixel=METERS_PER_PIXEL, time_budget=0.5)
+    assert len(walled.positions) > len(open_plan.positions)
+    signal = best_server(area.shape, walled.positions, wall_index)
+    assert np.mean(signal[walls == 0] >= -67) >= 0.95
+
+
+def test_device_load_sets_the_minimum():
+    area = np.ones((60, 100), dtype=bool)
+    result = plan_ap_placement(area, RESOLUTION, 20.0, 2437.0, meters_per_pixel=METERS_PER_PIXEL,
+                               devices=200, ap_capacity=20, time_budget=0.5)
+    assert result.capacity_aps == 10
+    assert len(result.positions) == 10
+    assert len(set(result.positions)) == 10
+
+
+def test_candidate_sites_and_resolution():
+    area = np.zeros((10, 10), dtype=bool)
+    area[:, :5] = True
+    rows, cols = candidate_sites(area, 4)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(2, 2), (6, 2)]
+    assert placement_resolution((1000, 1000), 5, max_cells=250000) == 5
+    assert placement_resolution((10000, 10000), 5, max_cells=250000) == 20
+    assert plan_ap_placement(np.zeros((5, 5), dtype=bool), 10, 20.0, 2437.0).positions == []
@@ -0,0 +1,80 @@
+import json
+import os
+
+import numpy as np
+
+from fake_wifi import make_networks
+from wifimapper_core.history import ScanHistory
+from wifimapper_core.project import load_project_file, save_project_file
+
+
+def make_history(networks):
+    history = ScanHistory()
+    for scan in range(3):
+        history.append_scan(networks, timestamp=1000.0 + 5 * scan)
+    return history
+
+
+def test_round_trip(tmp_path):
+    networks = make_networks(20)
+    file_name = str(tmp_path / "survey.wmp")
+    heatmap = np.linspace(-100, -30, 12, dtype=np.float32).reshape(3, 4)
+    positions = {networks[0].bssid: (10.0, 20.0)}
+    save_project_file(file_name, networks, heatmap, make_history(networks), {'resolution': 5}, positions)
+
+    project = load_project_file(file_name)
+    assert project['version'] == 2
+    assert project['settings'] == {'resolution': 5}
+    assert project['scan_data'] == networks
+    assert project['ap_positions'] == positions
+    assert isinstance(project['heatmap'], np.memmap)
+    np.testing.assert_array_equal(project['heatmap'], heatmap)
+    assert len(project['history']) == 3 * len(networks)
+    assert project['history'].stats(networks[0].bssid)['count'] == 3
+
+
+def test_loads_version_1_json(tmp_path):
+    file_name = tmp_path / "legacy.wmp"
+    file_name.write_text(json.dumps({
+        'settings': {'resolution': 10},
+        'scan_data': [{
+            'ssid': "Office", 'bssid': "02:00:00:00:00:01", 'channel': 6, 'rssi': -55,
+            'security': "WPA2", 'frequency': "2437.0 MHz", 'snr': 35
+        }],
+        'heatmap_data': [[-60.0, -70.0], [-80.0, -90.0]]
+    }))
+    project = load_project_file(str(file_name))
+    assert project['version'] == 1
+    assert project['settings'] == {'resolution': 10}
+    assert project['scan_data'][0].frequency == 2437.0
+    assert project['scan_data'][0].band == "2.4 GHz"
+    np.testing.assert_array_equal(project['heatmap'], [[-60, -70], [-80, -90]])
+    assert len(project['history']) == 0
+
+
+def test_resave_over_mapped_project(tmp_path):
+    # The loaded heatmap is memory-mapped from the file it is saved back to
+    networks = make_networks(20)
+    file_name = str(tmp_path / "survey.wmp")
+    heatmap = np.full((50, 60), -70, dtype=np.float32)
+    save_project_file(file_name, networks, heatmap, make_history(networks), {})
+    project = load_project_file(file_name)
+    assert isinstance(project['heatmap'], np.memmap)
+
+    save_project_file(file_name, project['scan_data'], project['heatmap'], project['history'],
+                      project['settings'], project['ap_positions'])
+    del project
+    again = load_project_file(file_name, mmap=False)
+    np.testing.assert_array_equal(again['heatmap'], heatmap)
+    assert again['scan_data'] == networks
+    assert len(again['history']) == 3 * len(networks)
+    assert os.listdir(tmp_path) == ["survey.wmp"]
+
+
+def test_empty_project(tmp_path):
+    file_name = str(tmp_path / "empty.wmp")
+    save_project_file(file_name, [], None, None, {})
+    project = load_project_file(file_name)
+    assert project['scan_data'] == []
+    assert project['heatmap'].size == 0
+    assert len(project['history']) == 0
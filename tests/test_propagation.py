@@ -0,0 +1,50 @@
+import numpy as np
+from PIL import Image
+
+from wifimapper_core.propagation import WallCrossingIndex, predict_coverage, wall_raster_from_image
+
+
+def plan_with_wall(width=400, height=300, wall_col=200):
+    # White floor plan with a one-pixel vertical wall
+    pixels = np.full((height, width), 255, dtype=np.uint8)
+    pixels[:, wall_col] = 0
+    return Image.fromarray(pixels)
+
+
+def test_raster_keeps_one_pixel_walls():
+    raster = wall_raster_from_image(plan_with_wall(), 5, 12)
+    assert raster.shape == (60, 80)
+    assert np.flatnonzero(raster.any(axis=0)).tolist() == [40]
+    assert set(np.unique(raster)) == {0, 12}
+
+
+def test_rays_charge_each_wall_once():
+    index = WallCrossingIndex(wall_raster_from_image(plan_with_wall(), 5, 12))
+    loss = index.loss_from(30, 10)
+    assert not loss[:, :40].any()
+    assert (loss[:, 41:] == 12).all()
+
+
+def test_pooled_index_matches_away_from_walls():
+    index = WallCrossingIndex(wall_raster_from_image(plan_with_wall(), 5, 12), max_side=20)
+    assert index.factor == 4
+    loss = index.loss_from(30, 10)
+    assert loss.shape == (60, 80)
+    assert not loss[:, :36].any()
+    assert (loss[:, 44:] == 12).all()
+
+
+def test_wall_attenuates_coverage_behind_it():
+    raster = wall_raster_from_image(plan_with_wall(), 5, 12)
+    args = (raster.shape, 5, [52.0], [152.0], [20], [2437.0])
+    open_plan = predict_coverage(*args)
+    walled = predict_coverage(*args, wall_index=WallCrossingIndex(raster))
+    np.testing.assert_allclose(walled[:, :40], open_plan[:, :40], atol=1e-4)
+    np.testing.assert_allclose(open_plan[:, 41:] - walled[:, 41:], 12, atol=1e-3)
+
+
+def test_coverage_falls_with_distance():
+    coverage = predict_coverage((40, 40), 5, [102.0], [102.0], [20], [2437.0], meters_per_pixel=0.5)
+    row = coverage[20, 20:]
+    assert coverage.argmax() == np.ravel_multi_index((20, 20), coverage.shape)
+    assert (np.diff(row) < 0).all()
@@ -0,0 +1,41 @@
+from wifimapper_core.models import ScanRecord, band_of, channel_from_frequency, records_to_array
+
+
+def test_from_dict_accepts_legacy_frequency_string():
+    record = ScanRecord.from_dict({
+        'ssid': "Office", 'bssid': "02:00:00:00:00:01", 'rssi': -52,
+        'security': "WPA2", 'frequency': "5180.0 MHz", 'snr': 38
+    })
+    assert record.frequency == 5180.0
+    assert record.channel == 36
+    assert record.band == "5 GHz"
+
+
+def test_channel_and_band_from_frequency():
+    assert channel_from_frequency(2412) == 1
+    assert channel_from_frequency(2484) == 14
+    assert channel_from_frequency(5180) == 36
+    assert channel_from_frequency(5955) == 1
+    assert band_of(2437) == "2.4 GHz"
+    assert band_of(5955) == "6 GHz"
+    assert band_of(900) == ""
+
+
+def test_records_to_array_keeps_fields():
+    records = [
+        ScanRecord("Office", "02:00:00:00:00:01", 6, -48, "WPA2", 2437.0, "2.4 GHz", 42),
+        ScanRecord("Lab", "02:00:00:00:00:02", 36, -71, "Open", 5180.0, "5 GHz", 19)
+    ]
+    array = records_to_array(records)
+    assert array['ssid'].tolist() == ["Office", "Lab"]
+    assert array['bssid'].tolist() == [b"02:00:00:00:00:01", b"02:00:00:00:00:02"]
+    assert array['rssi'].tolist() == [-48, -71]
+    assert array['frequency'].tolist() == [2437.0, 5180.0]
+
+
+def test_records_store_security_as_text():
+    record = ScanRecord.from_dict({
+        'ssid': "Office", 'bssid': "02:00:00:00:00:01", 'channel': 6, 'rssi': -55,
+        'security': 4, 'frequency': 2437.0, 'snr': 35
+    })
+    assert record.security == "4"
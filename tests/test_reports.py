@@ -0,0 +1,94 @@
+import csv
+import re
+
+import numpy as np
+import pytest
+
+from fake_wifi import make_networks
+from wifimapper_core.reports import (
+    HEATMAP_LEVELS, VIRIDIS_ANCHORS, floor_statistics, heatmap_colors, network_statistics,
+    render_report_image, write_csv_report, write_pdf_report
+)
+
+
+def test_heatmap_colors_span_viridis():
+    colors = heatmap_colors(np.array([[HEATMAP_LEVELS[0] - 20, HEATMAP_LEVELS[1] + 20]]))
+    np.testing.assert_array_equal(colors[0, 0], VIRIDIS_ANCHORS[0])
+    np.testing.assert_array_equal(colors[0, 1], VIRIDIS_ANCHORS[-1])
+
+
+def test_network_statistics_counts_bands_and_channels():
+    networks = make_networks(6) + [network._replace(channel=11) for network in make_networks(2)]
+    summary = network_statistics(networks)
+    assert summary['count'] == 8
+    assert summary['bands'] == {networks[0].band: 8}
+    assert summary['busiest_channels'] == [(6, 6), (11, 2)]
+    assert network_statistics([])['rssi_quartiles'] is None
+
+
+def test_floor_statistics_per_floor():
+    stack = np.full((2, 10, 10), -50.0, dtype=np.float32)
+    stack[1, :5, :4] = -95  # 20% dead in one region
+    stack[1, 8:, 8:] = -95  # 4% dead in another
+    stats = floor_statistics(stack)
+    assert stats['dead'].tolist() == pytest.approx([0.0, 0.24])
+    assert stats['regions'].tolist() == [0, 2]
+    assert stats['largest'][1] == pytest.approx(0.2)
+    assert stats['covered'][0] == 1.0
+    assert stats['min'].tolist() == [-50.0, -95.0]
+
+
+def test_floor_statistics_of_differently_sized_floors():
+    floors = [np.full((10, 10), -50.0, dtype=np.float32), np.full((4, 6), -95.0, dtype=np.float32)]
+    stats = floor_statistics(floors)
+    assert stats['dead'].tolist() == [0.0, 1.0]
+    assert stats['regions'].tolist() == [0, 1]
+
+
+def test_report_image_is_subsampled_and_tints_dead_zones():
+    heatmap = np.full((3000, 1500), -40.0, dtype=np.float32)
+    heatmap[:, :10] = -99
+    image = render_report_image(heatmap, max_pixels=1000)
+    assert max(image.size) <= 1000
+    red, green, _ = np.asarray(image)[0, 0]
+    assert red > green
+
+
+def test_csv_report_rows(tmp_path):
+    file_name = tmp_path / "report.csv"
+    write_csv_report(str(file_name), make_networks(3))
+    with open(file_name, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:2] == ["SSID", "BSSID"]
+    assert [row[0] for row in rows[1:]] == ["Net-0", "Net-1", "Net-2"]
+
+
+def test_pdf_report_runs_onto_several_pages(tmp_path):
+    pytest.importorskip("reportlab")
+    file_name = tmp_path / "report.pdf"
+    stack = np.linspace(-100, -30, 3 * 40 * 60, dtype=np.float32).reshape(3, 40, 60)
+    write_pdf_report(str(file_name), make_networks(200), stack, ["Ground", "First", "Second"])
+    data = file_name.read_bytes()
+    write_pdf_report(str(tmp_path / "floors.pdf"), make_networks(3), [stack[0], stack[1, :20, :30]])
+    assert (tmp_path / "floors.pdf").read_bytes().count(b"/Subtype /Image") == 2
+    assert data.startswith(b"%PDF")
+    # 200 table rows at 13 pt do not fit on one letter page, nor do three heatmaps
+    assert int(re.search(rb"/Count (\d+)", data).group(1)) >= 4
+
+
+@pytest.fixture
+def int_security():
+    # ScanRecords as older projects and pywifi left them, with integer security
+    return [network._replace(security=i % 3) for i, network in enumerate(make_networks(20))]
+
+
+def test_statistics_with_integer_security(int_security):
+    assert network_statistics(int_security)['security'] == {"0": 7, "1": 7, "2": 6}
+
+
+def test_pdf_with_integer_security(tmp_path, int_security):
+    pytest.importorskip("reportlab")
+    file_name = tmp_path / "report.pdf"
+    stack = np.linspace(-100, -30, 2 * 30 * 40, dtype=np.float32).reshape(2, 30, 40)
+    write_pdf_report(str(file_name), int_security, stack, ["Ground", "First"])
+    assert file_name.read_bytes().startswith(b"%PDF")
@@ -0,0 +1,65 @@
+import time
+
+from fake_wifi import FakeInterface
+from wifimapper_core.scanner import ScanTimingPolicy, scan_fingerprint
+
+
+def fast_policy(**options):
+    # Polls often enough for fake scans of a few hundred milliseconds
+    return ScanTimingPolicy(**{'min_wait': 0.02, 'poll_interval': 0.02, 'max_poll_interval': 0.05,
+                               'max_wait': 3.0, **options})
+
+
+def fresh(iface, profiles):
+    # The results are the completed scan's, not the cached ones before it
+    return not iface.scanning() and scan_fingerprint(profiles) == scan_fingerprint(iface.scan_results())
+
+
+def test_status_reported():
+    iface = FakeInterface(scan_latency=0.2, reports_status=True)
+    policy = fast_policy()
+    for _ in range(3):
+        assert fresh(iface, policy.wait_for_results(iface))
+    assert 0.2 <= policy.typical["wlan0"] < 1.0
+    assert policy.first_poll_delay("wlan0") >= 0.8 * 0.2
+
+
+def test_no_status_changing_results():
+    iface = FakeInterface(scan_latency=0.2, jitter=2)
+    policy = fast_policy()
+    for _ in range(3):
+        assert fresh(iface, policy.wait_for_results(iface))
+    assert 0.2 <= policy.typical["wlan0"] < 1.0
+
+
+def test_no_status_unchanged_results():
+    # A quiet site: the cache already holds what every scan returns
+    iface = FakeInterface(scan_latency=0.1)
+    iface.scan()
+    time.sleep(0.1)
+    policy = fast_policy(unlearned_wait=0.3)
+    start = time.monotonic()
+    assert fresh(iface, policy.wait_for_results(iface))
+    assert time.monotonic() - start < policy.max_wait / 2
+    # Unchanged results don't teach the scan duration
+    assert "wlan0" not in policy.typical
+
+
+def test_unchanged_results_after_learned_duration():
+    iface = FakeInterface(scan_latency=0.2, jitter=2)
+    policy = fast_policy()
+    policy.wait_for_results(iface)
+    iface.jitter = 0
+    iface.scan()
+    time.sleep(0.2)
+    start = time.monotonic()
+    assert fresh(iface, policy.wait_for_results(iface))
+    assert time.monotonic() - start < 1.0
+
+
+def test_timeout_not_learned():
+    iface = FakeInterface(scan_latency=1.0, reports_status=True)
+    policy = fast_policy(max_wait=0.2)
+    policy.wait_for_results(iface)
+    assert "wlan0" not in policy.typical
+    assert policy.latency["wlan0"] >= 0.2
@@ -0,0 +1,43 @@
+import time
+
+from fake_wifi import FakeInterface, FakeWiFi
+from wifimapper_core.scanner import ScanTimingPolicy
+from WiFiMapper import ScanWorker
+
+
+def run_worker(wifi, band="All Bands"):
+    # Runs the worker's scan on this thread and collects what it emits
+    worker = ScanWorker(wifi, band, ScanTimingPolicy(min_wait=0.02, poll_interval=0.02))
+    emitted = {'progress': [], 'errors': [], 'failed': [], 'results': []}
+    worker.progress.connect(emitted['progress'].append)
+    worker.interface_error.connect(lambda index, message: emitted['errors'].append(index))
+    worker.scan_failed.connect(emitted['failed'].append)
+    worker.results_ready.connect(emitted['results'].append)
+    worker.run()
+    return emitted
+
+
+def test_scans_interfaces_concurrently():
+    wifi = FakeWiFi([FakeInterface("wlan0", scan_latency=0.5), FakeInterface("wlan1", fail=True),
+                     FakeInterface("wlan2", scan_latency=0.5), FakeInterface("wlan3", scan_latency=0.5)])
+    start = time.monotonic()
+    emitted = run_worker(wifi)
+    # Three scans of 0.5 s that overlap
+    assert time.monotonic() - start < 1.2
+    assert emitted['progress'] == [25, 50, 75, 100]
+    assert emitted['errors'] == [1]
+    [networks] = emitted['results']
+    assert len(networks) == 6
+    assert {network.ssid for network in networks} >= {"wlan0-0", "wlan2-1", "wlan3-0"}
+
+
+def test_band_filter():
+    emitted = run_worker(FakeWiFi([FakeInterface("wlan0")]), band="5 GHz")
+    [networks] = emitted['results']
+    assert [network.frequency for network in networks] == [5180.0]
+
+
+def test_no_interfaces():
+    emitted = run_worker(FakeWiFi([]))
+    assert emitted['failed'] == ["Network scan failed: No wireless interfaces found"]
+    assert emitted['results'] == []
@@ -0,0 +1,62 @@
+import pytest
+
+from wifimapper_core import scanner
+from wifimapper_core.scanner import ScanTimingPolicy, open_wifi, parse_backend_spec, scan_all
+from wifimapper_core.simulated import SimulatedInterface, SimulatedWiFi
+
+
+def scan_now(iface):
+    iface.scan()
+    return [(p.ssid, p.bssid, p.freq, p.signal) for p in iface.scan_results()]
+
+
+def test_results_depend_only_on_seed_and_scan_count():
+    first = SimulatedInterface(bssids=50, churn=0.2, scan_latency=0, seed=7)
+    second = SimulatedInterface(bssids=50, churn=0.2, scan_latency=0, seed=7)
+    assert [scan_now(first) for _ in range(5)] == [scan_now(second) for _ in range(5)]
+    assert scan_now(first) != scan_now(SimulatedInterface(bssids=50, scan_latency=0, seed=8))
+
+
+def test_churn_replaces_a_fraction_per_scan():
+    iface = SimulatedInterface(bssids=100, churn=0.1, scan_latency=0)
+    before = {bssid for _, bssid, _, _ in scan_now(iface)}
+    after = {bssid for _, bssid, _, _ in scan_now(iface)}
+    assert len(before - after) == 10
+
+
+def test_jitter_zero_repeats_results():
+    iface = SimulatedInterface(bssids=20, jitter=0, scan_latency=0)
+    assert scan_now(iface) == scan_now(iface)
+
+
+def test_cached_results_until_latency_passes():
+    iface = SimulatedInterface(bssids=5, scan_latency=60, reports_status=False)
+    iface.scan()
+    assert iface.scan_results() == []
+    with pytest.raises(NotImplementedError):
+        iface.status()
+
+
+def test_parse_backend_spec():
+    assert parse_backend_spec("pywifi") == ("pywifi", {})
+    assert parse_backend_spec("simulated:bssids=500, churn=0.1,reports_status=0") == (
+        "simulated", {'bssids': 500, 'churn': 0.1, 'reports_status': 0}
+    )
+
+
+def test_open_wifi_reads_the_environment(monkeypatch):
+    monkeypatch.setenv(scanner.SCANNER_BACKEND_ENV, "simulated:interfaces=3,bssids=4")
+    wifi = open_wifi()
+    assert isinstance(wifi, SimulatedWiFi)
+    assert [iface.name() for iface in wifi.interfaces()] == ["sim0", "sim1", "sim2"]
+    assert isinstance(open_wifi("simulated"), SimulatedWiFi)
+    with pytest.raises(ValueError):
+        open_wifi("bluetooth")
+
+
+def test_scan_all_over_simulated_interfaces():
+    wifi = open_wifi("simulated:interfaces=2,bssids=10,scan_latency=0.05")
+    policy = ScanTimingPolicy(min_wait=0.02, poll_interval=0.02, max_poll_interval=0.05, max_wait=3.0)
+    networks = scan_all(wifi, "All Bands", policy)
+    assert len(networks) == 20
+    assert len({network.bssid for network in networks}) == 20
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('numpy', 'pandas', 'reportlab', 'simplekml', 'qdarkstyle', 'PIL', 'scipy', 'pyarrow')
+
+
+def imported_after(statement):
+    # Heavy modules in sys.modules after running `statement` in a fresh interpreter
+    code = f"import sys; {statement}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                            env={**os.environ, 'QT_QPA_PLATFORM': "offscreen"}, check=True)
+    return result.stdout.split()
+
+
+def test_gui_import_defers_optional_dependencies():
+    # numpy comes in with pyqtgraph, which the main window needs anyway
+    assert imported_after("import WiFiMapper") == ['numpy']
+
+
+def test_cli_parser_loads_no_dependencies():
+    assert imported_after("from wifimapper_core.cli import build_parser; build_parser()") == []
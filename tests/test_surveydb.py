@@ -0,0 +1,130 @@
+import threading
+
+import numpy as np
+import pytest
+
+from fake_wifi import make_networks
+from wifimapper_core.surveydb import ROLLUP_SECONDS, SurveyDatabase, histogram_percentiles
+
+
+def scan_at(networks, step):
+    # RSSI cycles over 7 dB from scan to scan
+    return [network._replace(rssi=network.rssi - step % 7) for network in networks]
+
+
+def test_histogram_percentiles_match_numpy():
+    samples = np.random.default_rng(3).integers(-95, -30, 500)
+    values, counts = np.unique(samples, return_counts=True)
+    np.testing.assert_allclose(histogram_percentiles(values, counts, [0, 10, 50, 90, 100]),
+                               np.percentile(samples, [0, 10, 50, 90, 100]))
+
+
+def test_round_trip_after_reopening(tmp_path):
+    file_name = str(tmp_path / "survey.sqlite")
+    networks = make_networks(5)
+    database = SurveyDatabase(file_name, batch=4)
+    for step in range(20):
+        database.append_scan(scan_at(networks, step), timestamp=1000.0 + step)
+        if step % 5 == 0:
+            database.add_point(10 * step, 5, floor=step // 10)
+    database.close()
+
+    database = SurveyDatabase(file_name)
+    try:
+        summary = database.summary()
+        assert (summary['networks'], summary['samples'], summary['scans'], summary['points']) == (5, 100, 20, 4)
+        assert (summary['first'], summary['last']) == (1000.0, 1019.0)
+        assert sorted(database.latest_scan()) == sorted(scan_at(networks, 19))
+        samples = database.samples(networks[1].bssid)
+        np.testing.assert_array_equal(samples['timestamp'], 1000.0 + np.arange(20))
+        np.testing.assert_array_equal(samples['rssi'], [-51 - step % 7 for step in range(20)])
+        # Net-0 is the strongest at every point
+        assert [row[2] for row in database.strongest_per_point()] == [networks[0].bssid] * 4
+        assert [row[:2] for row in database.strongest_per_point(floor=1)] == [(100.0, 5.0), (150.0, 5.0)]
+        points = database.survey_points(floor=0)
+        assert points.positions == [(0.0, 5.0), (50.0, 5.0)]
+        assert len(points.sample_rssi) == 10
+        # Scan numbers carry on from the stored ones
+        assert database.append_scan(networks, timestamp=1020.0) == 21
+        database.flush()
+    finally:
+        database.close()
+
+
+def test_channel_percentiles_over_window(tmp_path):
+    database = SurveyDatabase(str(tmp_path / "survey.sqlite"))
+    networks = make_networks(4) + [network._replace(bssid=network.bssid.replace("02:", "06:"), channel=11)
+                                   for network in make_networks(2, rssi=-80)]
+    rssi = []
+    now = 50 * ROLLUP_SECONDS + 17.0
+    try:
+        # Three scans per rollup bucket; the window starts mid-bucket
+        for step in range(150):
+            timestamp = step * ROLLUP_SECONDS / 3
+            scan = scan_at(networks, step)
+            database.append_scan(scan, timestamp=timestamp)
+            if timestamp >= now - 1200:
+                rssi.extend(network.rssi for network in scan if network.channel == 6)
+        database.flush()
+        stats = database.channel_percentiles(window=1200, now=now)
+        assert sorted(stats) == [6, 11]
+        assert stats[6]['count'] == len(rssi)
+        assert stats[6]['mean'] == pytest.approx(np.mean(rssi))
+        assert [stats[6][key] for key in ('p10', 'p50', 'p90')] == pytest.approx(np.percentile(rssi, [10, 50, 90]))
+    finally:
+        database.close()
+
+
+def test_history_rebuilds_scan_history(tmp_path):
+    database = SurveyDatabase(str(tmp_path / "survey.sqlite"))
+    networks = make_networks(3)
+    try:
+        for step in range(10):
+            database.append_scan(scan_at(networks, step), timestamp=float(step * 100))
+        database.flush()
+        history = database.history(retention=450, now=900.0)
+        samples = history.samples(networks[2].bssid)
+        np.testing.assert_array_equal(samples['timestamp'], [500.0, 600.0, 700.0, 800.0, 900.0])
+        np.testing.assert_array_equal(samples['rssi'], [-52 - step % 7 for step in range(5, 10)])
+    finally:
+        database.close()
+
+
+def test_add_point_needs_a_scan(tmp_path):
+    database = SurveyDatabase(str(tmp_path / "survey.sqlite"))
+    try:
+        with pytest.raises(ValueError):
+            database.add_point(1, 2)
+    finally:
+        database.close()
+
+
+def flush_within(database, timeout=10):
+    # The exception flush() raised, or None; fails instead of waiting forever
+    # on a dead writer thread
+    errors = []
+
+    def flush():
+        try:
+            database.flush()
+            errors.append(None)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=flush, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert errors, "flush() did not return"
+    return errors[0]
+
+
+def test_writer_survives_errors(tmp_path):
+    database = SurveyDatabase(str(tmp_path / "survey.sqlite"))
+    try:
+        database.append_scan([object()], timestamp=1.0)
+        assert isinstance(flush_within(database), AttributeError)
+        database.append_scan(make_networks(3), timestamp=2.0)
+        assert flush_within(database) is None
+        assert database.summary()['samples'] == 3
+    finally:
+        database.close()
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from wifimapper_core import tiles
+from wifimapper_core.tiles import PYRAMID_MANIFEST, FloorPlanPyramid
+
+TILE = 64
+
+
+@pytest.fixture
+def plan(tmp_path):
+    # 300x200 plan with noise and a dark one-pixel wall
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(120, 256, (200, 300, 3), dtype=np.uint8)
+    pixels[:, 150] = 0
+    file_name = tmp_path / "plan.png"
+    Image.fromarray(pixels).save(file_name)
+    return str(file_name), pixels
+
+
+def assemble(pyramid, level):
+    width, height = pyramid.levels[level]
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    rows, cols = pyramid.tile_grid(level)
+    for row in range(rows):
+        for col in range(cols):
+            tile = pyramid.load_tile(level, row, col)
+            image[row * TILE:row * TILE + tile.shape[0], col * TILE:col * TILE + tile.shape[1]] = tile
+    return image
+
+
+def test_levels_halve_until_one_tile(plan, tmp_path):
+    pyramid = FloorPlanPyramid(plan[0], cache_root=str(tmp_path / "cache"), tile_size=TILE)
+    assert pyramid.size == (300, 200)
+    assert pyramid.levels == [(300, 200), (150, 100), (75, 50), (38, 25)]
+    np.testing.assert_array_equal(assemble(pyramid, 0), plan[1])
+
+
+def test_coarser_levels_average_the_level_below(plan, tmp_path):
+    pyramid = FloorPlanPyramid(plan[0], cache_root=str(tmp_path / "cache"), tile_size=TILE)
+    expected = np.asarray(Image.fromarray(plan[1]).reduce(2), dtype=np.int16)
+    assert np.abs(assemble(pyramid, 1).astype(np.int16) - expected).max() <= 1
+
+
+def test_reopening_reads_the_manifest(plan, tmp_path, monkeypatch):
+    cache_root = str(tmp_path / "cache")
+    first = FloorPlanPyramid(plan[0], cache_root=cache_root, tile_size=TILE)
+    monkeypatch.setattr(FloorPlanPyramid, 'build', lambda self: pytest.fail("pyramid rebuilt"))
+    again = FloorPlanPyramid(plan[0], cache_root=cache_root, tile_size=TILE)
+    assert again.directory == first.directory
+    assert again.levels == first.levels
+
+
+def test_unfinished_build_is_redone(plan, tmp_path):
+    cache_root = str(tmp_path / "cache")
+    pyramid = FloorPlanPyramid(plan[0], cache_root=cache_root, tile_size=TILE)
+    os.remove(os.path.join(pyramid.directory, PYRAMID_MANIFEST))
+    assert FloorPlanPyramid(plan[0], cache_root=cache_root, tile_size=TILE).levels == pyramid.levels
+
+
+def test_level_and_visible_tiles(plan, tmp_path):
+    pyramid = FloorPlanPyramid(plan[0], cache_root=str(tmp_path / "cache"), tile_size=TILE)
+    assert [pyramid.level_for_scale(scale) for scale in (0.5, 1, 1.9, 2, 4, 64)] == [0, 0, 0, 1, 2, 3]
+    assert pyramid.visible_tiles(0, 100, 50, 140, 70) == [(0, 1), (0, 2), (1, 1), (1, 2)]
+    assert pyramid.visible_tiles(1, 0, 0, 300, 200) == [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)]
+    assert pyramid.tile_rect(1, 1, 2) == (256, 128, 44, 72)
+
+
+def test_block_min_gray_matches_full_image(plan, tmp_path):
+    pyramid = FloorPlanPyramid(plan[0], cache_root=str(tmp_path / "cache"), tile_size=TILE)
+    gray = np.asarray(Image.fromarray(plan[1]).convert('L'))
+    for resolution in (5, 7):
+        rows, cols = 200 // resolution, 300 // resolution
+        expected = gray[:rows * resolution, :cols * resolution].reshape(
+            rows, resolution, cols, resolution).min(axis=(1, 3))
+        np.testing.assert_array_equal(pyramid.block_min_gray(resolution), expected)
+
+
+def test_palette_plan_tiles_are_rgb(tmp_path):
+    pixels = np.zeros((100, 150), dtype=np.uint8)
+    pixels[:, 70:72] = 1
+    plan = Image.fromarray(pixels, mode='P')
+    plan.putpalette([255, 255, 255, 40, 40, 40] + [0] * 762)
+    file_name = str(tmp_path / "plan.png")
+    plan.save(file_name)
+    pyramid = FloorPlanPyramid(file_name, cache_root=str(tmp_path / "cache"), tile_size=TILE)
+    np.testing.assert_array_equal(assemble(pyramid, 0), np.asarray(plan.convert('RGB')))
+
+
+def test_pixel_limit_is_scoped_to_the_build(plan, tmp_path, monkeypatch):
+    previous = Image.MAX_IMAGE_PIXELS
+    FloorPlanPyramid(plan[0], cache_root=str(tmp_path / "cache"), tile_size=TILE)
+    assert Image.MAX_IMAGE_PIXELS == previous
+    # Pillow refuses images over twice the limit, and the limit is restored
+    monkeypatch.setattr(tiles, 'FLOOR_PLAN_MAX_PIXELS', 300 * 200 // 3)
+    with pytest.raises(Image.DecompressionBombError):
+        FloorPlanPyramid(plan[0], cache_root=str(tmp_path / "other"), tile_size=TILE)
+    assert Image.MAX_IMAGE_PIXELS == previous
@@ -0,0 +1,4 @@
+# GUI-free WiFiMapper core: scanning, scan records and history, heatmap and
+# propagation engines, survey interpolation, project files, the SQLite survey
+# database and exporters.
+# Submodules are imported on demand so that the CLI starts quickly
@@ -0,0 +1,205 @@
+import hashlib
+import json
+
+import numpy as np
+
+from .heatmap import (
+    DEFAULT_METERS_PER_PIXEL, HEATMAP_BATCH_CELLS, HEATMAP_DISPLAY_MIN_DBM, NOISE_FLOOR_MW,
+    PATH_LOSS_EXPONENT, HeatmapCancelled, default_ap_position, reference_loss_db
+)
+from .metrics import timed
+
+# Multi-floor buildings: a stack of floors, ground floor first, each with its
+# own plan and AP positions. Signal reaching another floor travels the 3D
+# distance and loses the attenuation of every slab in between
+FLOOR_HEIGHT_M = 3.5
+FLOOR_ATTENUATION_DB = 15.0  # Reinforced concrete slab at 2.4 GHz
+# An AP is only evaluated on floors where it can exceed this level, 30 dB
+# under the bottom of the colour scale, so even hundreds of skipped APs sum
+# to less than the lowest displayed level
+BUILDING_CUTOFF_DBM = HEATMAP_DISPLAY_MIN_DBM - 30.0
+
+
+class Floor:
+    def __init__(self, name, floor_plan="", height_m=FLOOR_HEIGHT_M,
+                 slab_loss_db=FLOOR_ATTENUATION_DB, ap_positions=None):
+        self.name = name
+        self.floor_plan = floor_plan  # Image file name, "" until one is loaded
+        self.height_m = height_m  # Floor-to-floor height
+        self.slab_loss_db = slab_loss_db  # Slab below this floor; unused for the ground floor
+        self.ap_positions = ap_positions if ap_positions is not None else {}  # BSSID -> (x, y)
+
+    def to_dict(self):
+        return {
+            'name': self.name, 'floor_plan': self.floor_plan, 'height_m': self.height_m,
+            'slab_loss_db': self.slab_loss_db,
+            'ap_positions': {bssid: list(xy) for bssid, xy in self.ap_positions.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['name'], data.get('floor_plan', ""), data.get('height_m', FLOOR_HEIGHT_M),
+            data.get('slab_loss_db', FLOOR_ATTENUATION_DB),
+            {bssid: tuple(xy) for bssid, xy in data.get('ap_positions', {}).items()}
+        )
+
+
+class Building:
+    def __init__(self, floors=None):
+        self.floors = floors if floors is not None else [Floor("Floor 1")]
+
+    def __len__(self):
+        return len(self.floors)
+
+    def add_floor(self, floor_plan="", name=None):
+        floor = Floor(name or f"Floor {len(self.floors) + 1}", floor_plan)
+        self.floors.append(floor)
+        return floor
+
+    def remove_floor(self, index):
+        if len(self.floors) > 1:
+            del self.floors[index]
+
+    def elevations(self):
+        # Height of each floor above the ground floor, in metres
+        heights = np.array([floor.height_m for floor in self.floors], dtype=np.float32)
+        return np.concatenate(([0.0], np.cumsum(heights[:-1]))).astype(np.float32)
+
+    def slab_loss_matrix(self):
+        # [i, j]: total slab attenuation between floors i and j, in dB
+        slabs = np.array([floor.slab_loss_db for floor in self.floors[1:]], dtype=np.float32)
+        level = np.concatenate(([0.0], np.cumsum(slabs))).astype(np.float32)
+        return np.abs(level[:, None] - level[None, :])
+
+    def ap_floors(self):
+        # BSSID -> index of the floor it has been placed on
+        return {bssid: index for index, floor in enumerate(self.floors) for bssid in floor.ap_positions}
+
+    def digest(self):
+        # Identifies the geometry for heatmap caching
+        geometry = [(floor.floor_plan, floor.height_m, floor.slab_loss_db) for floor in self.floors]
+        return hashlib.sha1(json.dumps(geometry).encode()).hexdigest()
+
+    def to_dict(self):
+        return {'floors': [floor.to_dict() for floor in self.floors]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls([Floor.from_dict(floor) for floor in data['floors']] or None)
+
+
+def building_sources(building, networks, width, height, scanner_floor=0, scanner_position=None,
+                     meters_per_pixel=DEFAULT_METERS_PER_PIXEL):
+    # Per-AP (x, y, floor, tx_dbm, freq_mhz) arrays for compute_building_heatmap.
+    # APs not placed on any floor are assumed to be on the scanner's floor
+    floors = building.ap_floors()
+    count = len(networks)
+    ap_x = np.empty(count, dtype=np.float32)
+    ap_y = np.empty(count, dtype=np.float32)
+    ap_floor = np.empty(count, dtype=np.intp)
+    rssi = np.empty(count, dtype=np.float32)
+    freq_mhz = np.empty(count, dtype=np.float32)
+    for i, network in enumerate(networks):
+        floor = floors.get(network.bssid, scanner_floor)
+        position = building.floors[floor].ap_positions.get(network.bssid)
+        if position is None:
+            position = default_ap_position(network.bssid, width, height)
+        ap_x[i], ap_y[i] = position
+        ap_floor[i] = floor
+        rssi[i] = network.rssi
+        freq_mhz[i] = network.frequency
+
+    # Calibrate transmit power from the RSSI at the scanner, through any slabs
+    scanner_x, scanner_y = scanner_position or (width / 2, height / 2)
+    dz = building.elevations()[ap_floor] - building.elevations()[scanner_floor]
+    scan_distance = np.sqrt(
+        np.square(np.hypot(ap_x - scanner_x, ap_y - scanner_y) * meters_per_pixel) + np.square(dz)
+    )
+    tx_dbm = (rssi + reference_loss_db(freq_mhz)
+              + 10 * PATH_LOSS_EXPONENT * np.log10(np.maximum(scan_distance, 1.0))
+              + building.slab_loss_matrix()[scanner_floor, ap_floor])
+    return ap_x, ap_y, ap_floor, tx_dbm, freq_mhz
+
+
+def reachable_floors(building, ap_floor, p0, exponent=PATH_LOSS_EXPONENT, cutoff_dbm=BUILDING_CUTOFF_DBM):
+    # Per AP, the floors [lo, hi) where it can exceed cutoff_dbm, judged at
+    # the nearest point (straight above or below it). Slab loss and height
+    # both grow with floor distance, so the range is contiguous
+    elevations = building.elevations()
+    dz2 = np.square(elevations[:, None] - elevations[ap_floor][None, :])
+    peak_dbm = (10 * np.log10(p0)[None, :] - building.slab_loss_matrix()[:, ap_floor]
+                - 5 * exponent * np.log10(np.maximum(dz2, 1.0)))
+    reached = peak_dbm >= cutoff_dbm
+    reached[ap_floor, np.arange(len(ap_floor))] = True
+    lo = np.argmax(reached, axis=0)
+    hi = len(building) - np.argmax(reached[::-1], axis=0)
+    return lo, hi
+
+
+def building_power_mw(building, shape, resolution, ap_x, ap_y, ap_floor, tx_dbm, freq_mhz,
+                      meters_per_pixel=DEFAULT_METERS_PER_PIXEL, exponent=PATH_LOSS_EXPONENT,
+                      batch_cells=HEATMAP_BATCH_CELLS, cutoff_dbm=BUILDING_CUTOFF_DBM,
+                      progress=None, cancelled=None):
+    # Summed received power in mW on every floor, as a (floors, rows, cols)
+    # array. Every (floor, AP) pair where the AP reaches the floor is one
+    # plane of the broadcast, batched like heatmap_power_mw; each batch is
+    # then summed per floor. progress(done, total) and cancelled() are
+    # called between batches, as in compute_heatmap_parallel
+    rows, cols = shape
+    floors = len(building)
+    total_mw = np.zeros((floors, rows, cols), dtype=np.float32)
+    if not rows or not cols or not len(ap_x):
+        return total_mw
+
+    ap_floor = np.asarray(ap_floor, dtype=np.intp)
+    p0 = np.power(10.0, (np.asarray(tx_dbm) - reference_loss_db(np.asarray(freq_mhz))) / 10)
+    # [floor, ap]: squared height difference and linear gain after the slabs
+    elevations = building.elevations()
+    dz2 = np.square(elevations[:, None] - elevations[ap_floor][None, :]).astype(np.float32)
+    gain = (p0[None, :] * np.power(10.0, -building.slab_loss_matrix()[:, ap_floor] / 10)).astype(np.float32)
+    lo, hi = reachable_floors(building, ap_floor, p0, exponent, cutoff_dbm)
+
+    xs = ((np.arange(cols, dtype=np.float32) + 0.5) * resolution * meters_per_pixel)
+    ys = ((np.arange(rows, dtype=np.float32) + 0.5) * resolution * meters_per_pixel)
+    ap_x = np.asarray(ap_x, dtype=np.float32) * np.float32(meters_per_pixel)
+    ap_y = np.asarray(ap_y, dtype=np.float32) * np.float32(meters_per_pixel)
+
+    # Reached (floor, AP) pairs, floor-major so each floor's pairs are adjacent
+    floor_index = np.arange(floors)[:, None]
+    pair_floor, pair_ap = np.nonzero((floor_index >= lo[None, :]) & (floor_index < hi[None, :]))
+
+    batch = max(1, min(batch_cells // (rows * cols), len(pair_ap)))  # Pairs per broadcast
+    half_exponent = np.float32(-exponent / 2)
+    # One buffer for every batch; fresh allocations this size cost more in
+    # page faults than the arithmetic
+    buffer = np.empty((batch, rows, cols), dtype=np.float32)
+    for start in range(0, len(pair_ap), batch):
+        if cancelled is not None and cancelled():
+            raise HeatmapCancelled()
+        floor, ap = pair_floor[start:start + batch], pair_ap[start:start + batch]
+        dx2 = np.square(xs[None, None, :] - ap_x[ap, None, None])
+        dy2 = np.square(ys[None, :, None] - ap_y[ap, None, None]) + dz2[floor, ap, None, None]
+        d2 = np.add(dx2, dy2, out=buffer[:len(ap)])
+        np.maximum(d2, np.float32(1.0), out=d2)  # Clamp to the reference distance
+        np.power(d2, half_exponent, out=d2)
+        d2 *= gain[floor, ap, None, None]
+        # One sum per floor in the batch; np.add.reduceat is far slower along axis 0
+        bounds = np.flatnonzero(np.diff(floor)) + 1
+        for first, last in zip(np.r_[0, bounds], np.r_[bounds, len(floor)]):
+            total_mw[floor[first]] += d2[first:last].sum(axis=0)
+        if progress is not None:
+            progress(start + len(ap), len(pair_ap))
+    return total_mw
+
+
+@timed("heatmap_compute", mode="building")
+def compute_building_heatmap(building, shape, resolution, ap_x, ap_y, ap_floor, tx_dbm, freq_mhz,
+                             meters_per_pixel=DEFAULT_METERS_PER_PIXEL,
+                             exponent=PATH_LOSS_EXPONENT, batch_cells=HEATMAP_BATCH_CELLS,
+                             cutoff_dbm=BUILDING_CUTOFF_DBM, progress=None, cancelled=None):
+    # dBm heatmaps of every floor; result[i] is floor i's grid
+    total_mw = building_power_mw(building, shape, resolution, ap_x, ap_y, ap_floor, tx_dbm, freq_mhz,
+                                 meters_per_pixel, exponent, batch_cells, cutoff_dbm, progress, cancelled)
+    np.maximum(total_mw, np.float32(NOISE_FLOOR_MW), out=total_mw)
+    return 10 * np.log10(total_mw)
@@ -0,0 +1,233 @@
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from .heatmap import DEFAULT_METERS_PER_PIXEL, PATH_LOSS_EXPONENT, reference_loss_db
+
+CHANNEL_CANDIDATES = {
+    "2.4 GHz": (1, 6, 11),  # Common non-overlapping 2.4 GHz channels
+    "5 GHz": (36, 40, 44, 48),
+    "6 GHz": (1, 5, 9, 13)
+}
+
+# Channel planning. Candidates are channel centres for each width; bonded
+# 5 GHz channels only exist on these centres, 6 GHz ones follow a fixed grid
+PLAN_CHANNELS = {
+    ("2.4 GHz", 20): (1, 6, 11),
+    ("2.4 GHz", 40): (3, 11),
+    ("5 GHz", 20): tuple(range(36, 65, 4)) + tuple(range(100, 145, 4)) + tuple(range(149, 166, 4)),
+    ("5 GHz", 40): (38, 46, 54, 62, 102, 110, 118, 126, 134, 142, 151, 159),
+    ("5 GHz", 80): (42, 58, 106, 122, 138, 155),
+    ("5 GHz", 160): (50, 114),
+    ("6 GHz", 20): tuple(range(1, 234, 4)),
+    ("6 GHz", 40): tuple(range(3, 234, 8)),
+    ("6 GHz", 80): tuple(range(7, 234, 16)),
+    ("6 GHz", 160): tuple(range(15, 234, 32))
+}
+DEFAULT_WIDTH_MHZ = 20  # Assumed for scanned networks, whose width is not reported
+INTERFERENCE_FLOOR_DBM = -95.0  # Interference weights are linear power relative to this level
+PLAN_IMPROVEMENT = 1e-9  # Smallest cost decrease accepted as a move
+
+
+def channel_usage(networks, band):
+    channels = dict.fromkeys(CHANNEL_CANDIDATES.get(band, CHANNEL_CANDIDATES["2.4 GHz"]), 0)
+    for network in networks:
+        if network.channel in channels:
+            channels[network.channel] += 1
+    return channels
+
+
+def channel_center_mhz(channel, band):
+    channel = np.asarray(channel, dtype=np.float64)
+    if band == "2.4 GHz":
+        return np.where(channel == 14, 2484.0, 2407.0 + 5 * channel)
+    if band == "6 GHz":
+        return 5950.0 + 5 * channel
+    return 5000.0 + 5 * channel
+
+
+def spectral_overlap(center_a, width_a, center_b, width_b):
+    # Fraction of channel a's bandwidth covered by channel b (broadcasts)
+    low = np.maximum(center_a - width_a / 2, center_b - width_b / 2)
+    high = np.minimum(center_a + width_a / 2, center_b + width_b / 2)
+    return np.clip(high - low, 0, None) / width_a
+
+
+def interference_weight(rssi_dbm):
+    return 10 ** ((np.asarray(rssi_dbm, dtype=np.float64) - INTERFERENCE_FLOOR_DBM) / 10)
+
+
+def interferers(networks, band, history=None, window=None, exclude=()):
+    # (centre MHz, width MHz, RSSI dBm) of the foreign networks in `band`. With
+    # a scan history the RSSI is each BSSID's median over the window, so one
+    # unlucky scan neither hides nor inflates a neighbour
+    centers, rssi = [], []
+    for network in networks:
+        if network.band != band or network.bssid in exclude:
+            continue
+        level = network.rssi
+        if history is not None:
+            samples = history.samples(network.bssid, window)
+            if samples is not None and len(samples['rssi']):
+                level = float(np.median(samples['rssi']))
+        centers.append(network.frequency or channel_center_mhz(network.channel, band))
+        rssi.append(level)
+    centers = np.asarray(centers, dtype=np.float64)
+    return centers, np.full(len(centers), float(DEFAULT_WIDTH_MHZ)), np.asarray(rssi, dtype=np.float64)
+
+
+def external_costs(candidates, band, width, centers, widths, rssi):
+    # Interference each candidate channel receives from foreign networks,
+    # weighted by how much of its band they overlap and how loud they are
+    candidate_mhz = channel_center_mhz(candidates, band)
+    overlap = spectral_overlap(candidate_mhz[:, None], width, centers[None, :], widths[None, :])
+    return overlap @ interference_weight(rssi)
+
+
+def recommend_channel(networks, band, width=DEFAULT_WIDTH_MHZ, history=None):
+    # Least interfered candidate channel for a single AP
+    candidates = np.array(PLAN_CHANNELS.get((band, width), CHANNEL_CANDIDATES.get(band, (1, 6, 11))))
+    costs = external_costs(candidates, band, width, *interferers(networks, band, history))
+    return int(candidates[np.argmin(costs)])
+
+
+def ap_coupling_dbm(ap_x, ap_y, tx_dbm, freq_mhz, meters_per_pixel=DEFAULT_METERS_PER_PIXEL,
+                    exponent=PATH_LOSS_EXPONENT):
+    # Signal level (dBm) of each planned AP at every other one, log-distance
+    # model without walls, so coupling errs on the strong side
+    ap_x = np.asarray(ap_x, dtype=np.float64)
+    ap_y = np.asarray(ap_y, dtype=np.float64)
+    distance = np.hypot(ap_x[:, None] - ap_x[None, :], ap_y[:, None] - ap_y[None, :]) * meters_per_pixel
+    coupling = (np.asarray(tx_dbm, dtype=np.float64)[None, :] - reference_loss_db(freq_mhz)
+                - 10 * exponent * np.log10(np.maximum(distance, 1.0)))
+    np.fill_diagonal(coupling, -np.inf)
+    return coupling
+
+
+class ChannelPlan(NamedTuple):
+    channels: list  # Centre channel per AP
+    width: int
+    cost: float  # External plus AP-to-AP interference, relative to INTERFERENCE_FLOOR_DBM
+    interference_dbm: np.ndarray  # Co/adjacent-channel interference seen by each AP
+    greedy_cost: float
+    sweeps: int
+
+
+class _PlanState:
+    # Assignment plus, for every AP and channel, the interference the other
+    # APs would cause there; a move updates it in O(APs x channels)
+    def __init__(self, weights, overlap, external):
+        self.weights = weights
+        self.overlap = overlap
+        self.external = external
+        self.assigned = np.full(len(weights), -1)
+        self.received = np.zeros_like(external)
+
+    def move(self, ap, channel):
+        old = self.assigned[ap]
+        delta = self.overlap[channel] - (self.overlap[old] if old >= 0 else 0)
+        self.received += self.weights[:, ap, None] * delta[None, :]
+        self.assigned[ap] = channel
+
+    def local_costs(self, ap):
+        return self.external[ap] + self.received[ap]
+
+    def ap_costs(self):
+        index = np.arange(len(self.assigned))
+        return self.external[index, self.assigned] + self.received[index, self.assigned]
+
+    def cost(self):
+        # AP-to-AP terms are shared between both ends
+        index = np.arange(len(self.assigned))
+        return float(self.external[index, self.assigned].sum()
+                     + self.received[index, self.assigned].sum() / 2)
+
+
+def _plan_state(coupling_dbm, band, width, external, candidates):
+    coupling_dbm = np.asarray(coupling_dbm, dtype=np.float64)
+    candidate_mhz = channel_center_mhz(candidates, band)
+    overlap = spectral_overlap(candidate_mhz[:, None], width, candidate_mhz[None, :], width)
+    weights = interference_weight(coupling_dbm)
+    weights = (weights + weights.T) / 2
+    np.fill_diagonal(weights, 0)
+    external = np.zeros(len(candidates)) if external is None else np.asarray(external, dtype=np.float64)
+    external = np.broadcast_to(external, (len(weights), len(candidates)))
+    return _PlanState(weights, overlap, external)
+
+
+def plan_cost(coupling_dbm, band, channels, width=DEFAULT_WIDTH_MHZ, external=None, candidates=None):
+    # Cost of a given assignment, comparable with ChannelPlan.cost
+    if candidates is None:
+        candidates = PLAN_CHANNELS[(band, width)]
+    candidates = list(candidates)
+    state = _plan_state(coupling_dbm, band, width, external, np.asarray(candidates))
+    for ap, channel in enumerate(channels):
+        state.move(ap, candidates.index(channel))
+    return state.cost()
+
+
+def plan_channels(coupling_dbm, band, width=DEFAULT_WIDTH_MHZ, external=None, candidates=None,
+                  time_budget=2.0, max_stall=50, kick_fraction=0.1, seed=0):
+    # Channel per AP minimising interference: a saturation-ordered greedy
+    # colouring, refined by best-response sweeps and randomly kicked restarts
+    # (iterated local search) until the time budget runs out or max_stall
+    # kicks in a row bring no improvement
+    if candidates is None:
+        candidates = PLAN_CHANNELS[(band, width)]
+    candidates = np.asarray(candidates)
+    state = _plan_state(coupling_dbm, band, width, external, candidates)
+    weights, external = state.weights, state.external
+    count = len(weights)
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + time_budget
+
+    pending = np.ones(count, dtype=bool)
+    strength = weights.sum(axis=1)
+    for _ in range(count):
+        # Most constrained next: the AP whose best channel is already worst off
+        best = np.where(pending, (external + state.received).min(axis=1) + strength * 1e-12, -np.inf)
+        ap = int(np.argmax(best))
+        state.move(ap, int(np.argmin(state.local_costs(ap))))
+        pending[ap] = False
+    greedy_cost = state.cost()
+
+    sweeps = _descend(state, rng)
+    best_assigned, best_cost = state.assigned.copy(), state.cost()
+    kick = max(1, int(count * kick_fraction))
+    stall = 0
+    while count > 1 and stall < max_stall and time.perf_counter() < deadline:
+        for ap in rng.choice(count, kick, replace=False):
+            state.move(ap, int(rng.integers(len(candidates))))
+        sweeps += _descend(state, rng)
+        cost = state.cost()
+        if cost < best_cost - PLAN_IMPROVEMENT:
+            best_assigned, best_cost = state.assigned.copy(), cost
+            stall = 0
+        else:
+            stall += 1
+            # Restart the next kick from the best plan found so far
+            for ap in np.flatnonzero(state.assigned != best_assigned):
+                state.move(ap, int(best_assigned[ap]))
+
+    interference = state.ap_costs()
+    with np.errstate(divide='ignore'):
+        interference_dbm = INTERFERENCE_FLOOR_DBM + 10 * np.log10(interference)
+    return ChannelPlan([int(candidates[c]) for c in best_assigned], width, best_cost,
+                       interference_dbm, greedy_cost, sweeps)
+
+
+def _descend(state, rng):
+    # Best-response sweeps in random order until no AP can lower its cost
+    sweeps = 0
+    moved = True
+    while moved:
+        moved = False
+        sweeps += 1
+        for ap in rng.permutation(len(state.assigned)):
+            costs = state.local_costs(ap)
+            channel = int(np.argmin(costs))
+            if costs[channel] < costs[state.assigned[ap]] - PLAN_IMPROVEMENT:
+                state.move(ap, channel)
+                moved = True
+    return sweeps
@@ -0,0 +1,298 @@
+import argparse
+import os
+import sys
+import time
+
+# Subcommands import what they need when they run, so `--help` and argument
+# errors return without loading numpy, pywifi or the report libraries
+
+
+def load_floor_plan(file_name):
+    from PIL import Image
+    return Image.open(file_name)
+
+
+def project_floor_plan(args, settings):
+    file_name = args.floor_plan or settings.get('floor_plan')
+    if file_name and os.path.exists(file_name):
+        return load_floor_plan(file_name)
+    return None
+
+
+def cmd_scan(args):
+    from .history import ScanHistory
+    from .scanner import ScanTimingPolicy, open_wifi, scan_all
+
+    try:
+        wifi = open_wifi(args.backend)
+    except (TypeError, ValueError) as e:
+        print(f"Cannot open scanner backend: {str(e)}", file=sys.stderr)
+        return 1
+    if wifi is None:
+        print("WiFi scanning unavailable: pywifi not installed", file=sys.stderr)
+        return 1
+    policy = ScanTimingPolicy()
+    history = ScanHistory()
+    database = None
+    if args.database:
+        from .surveydb import SurveyDatabase
+        database = SurveyDatabase(args.database)
+    networks = []
+    scans = 0
+    try:
+        while not args.count or scans < args.count:
+            started = time.monotonic()
+            networks = scan_all(
+                wifi, args.band, policy,
+                on_error=lambda index, message: print(f"Interface {index + 1}: {message}", file=sys.stderr)
+            )
+            history.append_scan(networks)
+            if database is not None:
+                database.append_scan(networks)
+            scans += 1
+            strongest = max(networks, key=lambda network: network.rssi, default=None)
+            print(
+                f"{time.strftime('%H:%M:%S')} scan {scans}: {len(networks)} networks"
+                + (f", strongest {strongest.ssid} ({strongest.rssi} dBm)" if strongest else ""),
+                flush=True
+            )
+            if args.count and scans >= args.count:
+                break
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Network scan failed: {str(e)}", file=sys.stderr)
+        if not scans:
+            return 1
+    finally:
+        if database is not None:
+            database.close()
+        
+    if args.project:
+        import numpy as np
+        from .project import save_project_file
+        save_project_file(args.project, networks, np.empty((0, 0), dtype=np.float32), history,
+                          {'band': args.band})
+        print(f"Project saved to {args.project}")
+    if args.history:
+        return export_history(history, args.history)
+    return 0
+
+
+def export_history(history, file_name):
+    from .exporters import HISTORY_EXPORTERS
+    exporter = HISTORY_EXPORTERS.get(os.path.splitext(file_name)[1].lower())
+    if exporter is None:
+        print(f"Unsupported history export format: {file_name}", file=sys.stderr)
+        return 1
+    rows = exporter(history, file_name)
+    print(f"Exported {rows} samples to {file_name}")
+    return 0
+
+
+def cmd_info(args):
+    from .project import load_project_file
+    project = load_project_file(args.project)
+    history = project['history']
+    print(f"Format version: {project['version']}")
+    print(f"Networks: {len(project['scan_data'])}")
+    print(f"History: {len(history.rings)} BSSIDs, {len(history)} samples")
+    print(f"Heatmap: {'x'.join(map(str, project['heatmap'].shape))}")
+    for key, value in sorted(project['settings'].items()):
+        print(f"  {key}: {value}")
+    return 0
+
+
+def cmd_heatmap(args):
+    import numpy as np
+    from .heatmap import DEFAULT_METERS_PER_PIXEL, calibrated_sources, compute_heatmap
+    from .project import load_project_file
+    from .reports import render_heatmap_image
+
+    project = load_project_file(args.project)
+    settings = project['settings']
+    floor_plan = project_floor_plan(args, settings)
+    if args.stored:
+        heatmap = project['heatmap']
+        if not heatmap.size:
+            print("Project has no stored heatmap", file=sys.stderr)
+            return 1
+    else:
+        if floor_plan is None:
+            print("A floor plan is required to compute the heatmap", file=sys.stderr)
+            return 1
+        resolution = args.resolution or settings.get('heatmap_resolution', 50)
+        meters_per_pixel = settings.get('meters_per_pixel', DEFAULT_METERS_PER_PIXEL)
+        width, height = floor_plan.size
+        start = time.perf_counter()
+        sources = calibrated_sources(project['scan_data'], project['ap_positions'], width, height,
+                                     meters_per_pixel=meters_per_pixel)
+        heatmap = np.clip(compute_heatmap((height // resolution, width // resolution), resolution,
+                                          *sources, meters_per_pixel=meters_per_pixel), -100, -30)
+        print(f"Computed {heatmap.shape[0]}x{heatmap.shape[1]} heatmap in "
+              f"{time.perf_counter() - start:.2f} s")
+    render_heatmap_image(heatmap, floor_plan).save(args.output)
+    print(f"Heatmap written to {args.output}")
+    return 0
+
+
+def cmd_report(args):
+    from .project import load_project_file
+    from .reports import REPORT_WRITERS
+
+    writer = REPORT_WRITERS.get(os.path.splitext(args.output)[1].lower())
+    if writer is None:
+        print(f"Unsupported report format: {args.output}", file=sys.stderr)
+        return 1
+    project = load_project_file(args.project)
+    # CSV reports list the networks only
+    options = {} if writer is REPORT_WRITERS['.csv'] else {'heatmap': project['heatmap']}
+    if writer is REPORT_WRITERS['.kmz']:
+        from .georef import GeoTransform
+        from .reports import network_positions
+        settings = project['settings']
+        try:
+            if args.control_point:
+                transform = GeoTransform(args.control_point)
+            elif settings.get('georeference'):
+                transform = GeoTransform.from_dict(settings['georeference'])
+            else:
+                print("KMZ export needs a georeferenced floor plan: pass --control-point "
+                      "at least three times", file=sys.stderr)
+                return 1
+        except ValueError as e:
+            print(f"Cannot georeference the floor plan: {str(e)}", file=sys.stderr)
+            return 1
+        options.update(
+            transform=transform, resolution=settings.get('heatmap_resolution'),
+            positions=network_positions(project['scan_data'], project['ap_positions'])
+        )
+    writer(args.output, project['scan_data'], **options)
+    print(f"Report exported to {args.output}")
+    return 0
+
+
+def cmd_export_history(args):
+    from .project import load_project_file
+    return export_history(load_project_file(args.project)['history'], args.output)
+
+
+def cmd_db(args):
+    from .surveydb import SurveyDatabase
+
+    if not os.path.exists(args.database):
+        print(f"No such survey database: {args.database}", file=sys.stderr)
+        return 1
+    database = SurveyDatabase(args.database)
+    try:
+        if args.strongest:
+            for x, y, bssid, ssid, rssi in database.strongest_per_point(args.floor):
+                print(f"({x:.0f}, {y:.0f}): {ssid} [{bssid}] {rssi} dBm")
+        elif args.channels:
+            for channel, stats in sorted(database.channel_percentiles(args.channels).items()):
+                print(f"Channel {channel}: {stats['count']} samples, p10 {stats['p10']:.0f} / "
+                      f"median {stats['p50']:.0f} / p90 {stats['p90']:.0f} dBm")
+        else:
+            summary = database.summary()
+            print(f"Networks: {summary['networks']}")
+            print(f"Scans: {summary['scans']}, {summary['samples']} samples")
+            print(f"Survey points: {summary['points']}")
+            if summary['samples']:
+                print(f"From {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(summary['first']))} "
+                      f"to {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(summary['last']))}")
+    finally:
+        database.close()
+    return 0
+
+
+def cmd_channels(args):
+    from .channels import PLAN_CHANNELS, channel_usage, recommend_channel
+    from .project import load_project_file
+
+    project = load_project_file(args.project)
+    networks = project['scan_data']
+    band = args.band or project['settings'].get('band', "2.4 GHz")
+    if (band, args.width) not in PLAN_CHANNELS:
+        print(f"{args.width} MHz channels are not available in the {band} band", file=sys.stderr)
+        return 1
+    for channel, count in channel_usage(networks, band).items():
+        print(f"Channel {channel}: {count} networks")
+    channel = recommend_channel(networks, band, args.width, project['history'])
+    print(f"Recommended channel: {channel} (Least interference)")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="wifimapper", description="WiFiMapper headless tools")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="time the run and write the spans to FILE (.json, otherwise Prometheus text)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    scan = commands.add_parser("scan", help="scan networks at an interval")
+    scan.add_argument("--band", default="2.4 GHz", choices=["2.4 GHz", "5 GHz", "6 GHz"])
+    scan.add_argument("--interval", type=float, default=5.0, help="seconds between scan starts")
+    scan.add_argument("--count", type=int, default=1, help="number of scans, 0 to run until interrupted")
+    scan.add_argument("--project", help="save the last scan and the history to a .wmp project")
+    scan.add_argument("--history", help="export the scan history (.csv, .parquet or .feather)")
+    scan.add_argument("--database", help="append every scan to an SQLite survey database")
+    scan.add_argument("--backend", help="scanner backend, e.g. simulated:bssids=200,churn=0.05 "
+                                        "(default: $WIFIMAPPER_BACKEND or pywifi)")
+    scan.set_defaults(func=cmd_scan)
+    
+    info = commands.add_parser("info", help="summarise a project file")
+    info.add_argument("project")
+    info.set_defaults(func=cmd_info)
+    
+    heatmap = commands.add_parser("heatmap", help="render a project's heatmap to an image")
+    heatmap.add_argument("project")
+    heatmap.add_argument("-o", "--output", required=True, help="image file (.png, .jpg, ...)")
+    heatmap.add_argument("--floor-plan", help="floor plan image (defaults to the project's)")
+    heatmap.add_argument("--resolution", type=int, help="pixels per heatmap cell")
+    heatmap.add_argument("--stored", action="store_true", help="render the heatmap saved in the project")
+    heatmap.set_defaults(func=cmd_heatmap)
+    
+    report = commands.add_parser("report", help="export a report from a project")
+    report.add_argument("project")
+    report.add_argument("-o", "--output", required=True, help="report file (.pdf, .csv or .kmz)")
+    report.add_argument("--control-point", nargs=4, type=float, action="append",
+                        metavar=("X", "Y", "LAT", "LON"),
+                        help="floor plan pixel and its coordinates, for .kmz (repeat 3+ times; "
+                             "defaults to the project's georeference)")
+    report.set_defaults(func=cmd_report)
+    
+    history = commands.add_parser("export-history", help="export a project's scan history")
+    history.add_argument("project")
+    history.add_argument("output", help="history file (.csv, .parquet or .feather)")
+    history.set_defaults(func=cmd_export_history)
+    
+    db = commands.add_parser("db", help="query an SQLite survey database")
+    db.add_argument("database")
+    query = db.add_mutually_exclusive_group()
+    query.add_argument("--strongest", action="store_true", help="strongest BSSID at each survey point")
+    query.add_argument("--channels", type=float, metavar="SECONDS",
+                       help="RSSI percentiles per channel over the last SECONDS")
+    db.add_argument("--floor", type=int, help="only survey points on this floor (with --strongest)")
+    db.set_defaults(func=cmd_db)
+    
+    channels = commands.add_parser("channels", help="recommend a channel from a project's scan")
+    channels.add_argument("project")
+    channels.add_argument("--band", choices=["2.4 GHz", "5 GHz", "6 GHz"])
+    channels.add_argument("--width", type=int, default=20, choices=[20, 40, 80, 160], help="channel width (MHz)")
+    channels.set_defaults(func=cmd_channels)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        from .metrics import METRICS
+        METRICS.enabled = True
+    try:
+        return args.func(args)
+    except ImportError as e:
+        print(f"Missing optional dependency: {e.name}", file=sys.stderr)
+        return 1
+    finally:
+        if args.metrics:
+            METRICS.dump(args.metrics)
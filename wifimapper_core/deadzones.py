@@ -0,0 +1,117 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .heatmap import DEFAULT_METERS_PER_PIXEL
+
+DEAD_ZONE_DBM = -80.0
+_LABEL = False  # Not looked up yet
+
+
+class DeadZone(NamedTuple):
+    label: int
+    cells: int
+    area_m2: float
+    centroid_x: float  # Floor plan pixels
+    centroid_y: float
+    worst_rssi: float
+
+
+def label_function():
+    # scipy.ndimage.label when scipy is installed (imported on first use),
+    # otherwise None and label_regions uses the run-based fallback
+    global _LABEL
+    if _LABEL is False:
+        try:
+            from scipy.ndimage import label
+        except ImportError:
+            label = None
+        _LABEL = label
+    return _LABEL
+
+
+def label_regions(mask):
+    # 4-connected components of a boolean grid; returns (labels, count)
+    label = label_function()
+    if label is not None:
+        return label(mask)
+    return _label_runs(mask)
+
+
+def _label_runs(mask):
+    # Labels horizontal runs of set cells, then joins runs that overlap a run
+    # in the row above, working on runs rather than cells
+    rows, cols = mask.shape
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    run_row, run_start = np.nonzero(edges == 1)
+    _, run_stop = np.nonzero(edges == -1)  # Exclusive; same row-major order as the starts
+    count = len(run_row)
+    if not count:
+        return np.zeros(mask.shape, dtype=np.int32), 0
+
+    # Pairs (run below, run above) that overlap; keys place every row in
+    # its own span so one searchsorted covers the whole grid
+    width = cols + 2
+    start_key = run_row * width + run_start
+    stop_key = run_row * width + run_stop
+    below = np.flatnonzero(run_row > 0)
+    shifted = (run_row[below] - 1) * width
+    first = np.searchsorted(stop_key, shifted + run_start[below], side='right')
+    last = np.searchsorted(start_key, shifted + run_stop[below], side='left')
+    overlaps = np.maximum(last - first, 0)
+    pair_below = np.repeat(below, overlaps)
+    pair_above = np.repeat(first - np.cumsum(overlaps) + overlaps, overlaps) + np.arange(overlaps.sum())
+
+    # Connected components of the run graph: propagate the minimum run
+    # index across pairs, with pointer jumping, until nothing changes
+    root = np.arange(count)
+    while True:
+        low = np.minimum(root[pair_below], root[pair_above])
+        updated = root.copy()
+        np.minimum.at(updated, pair_below, low)
+        np.minimum.at(updated, pair_above, low)
+        updated = updated[updated]
+        if np.array_equal(updated, root):
+            break
+        root = updated
+    _, run_label = np.unique(root, return_inverse=True)
+    labels = np.zeros(mask.shape, dtype=np.int32)
+    lengths = run_stop - run_start
+    flat_start = run_row * cols + run_start
+    # Scatter every run's label over its cells
+    cells = np.repeat(flat_start - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    labels.reshape(-1)[cells] = np.repeat(run_label.reshape(-1) + 1, lengths)
+    return labels, int(run_label.max()) + 1
+
+
+def find_dead_zones(heatmap, resolution, meters_per_pixel=DEFAULT_METERS_PER_PIXEL,
+                    threshold=DEAD_ZONE_DBM, min_cells=1):
+    # Connected regions below `threshold`, largest first, with the label grid
+    labels, count = label_regions(heatmap < threshold)
+    if not count:
+        return labels, []
+    flat = labels.reshape(-1)
+    inside = np.flatnonzero(flat)
+    region = flat[inside]
+    rows, cols = np.divmod(inside, heatmap.shape[1])
+    cells = np.bincount(region, minlength=count + 1)
+    row_sum = np.bincount(region, weights=rows, minlength=count + 1)
+    col_sum = np.bincount(region, weights=cols, minlength=count + 1)
+    worst = np.full(count + 1, np.inf, dtype=np.float64)
+    np.minimum.at(worst, region, heatmap.reshape(-1)[inside])
+
+    cell_area = (resolution * meters_per_pixel) ** 2
+    zones = [
+        DeadZone(
+            int(label), int(cells[label]), float(cells[label] * cell_area),
+            float((col_sum[label] / cells[label] + 0.5) * resolution),
+            float((row_sum[label] / cells[label] + 0.5) * resolution),
+            float(worst[label])
+        )
+        for label in np.flatnonzero(cells >= max(min_cells, 1))
+        if label
+    ]
+    zones.sort(key=lambda zone: -zone.cells)
+    return labels, zones
@@ -0,0 +1,110 @@
+import csv
+
+import numpy as np
+
+from .metrics import timed
+
+
+# History exports stream ScanHistory.iter_chunks so memory stays bounded by
+# the chunk size; each returns the number of rows written
+HISTORY_EXPORT_CHUNK = 262144
+
+
+@timed("export_history", format="csv")
+def export_history_csv(history, file_name, chunk_size=HISTORY_EXPORT_CHUNK):
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return _export_history_csv_module(history, file_name, chunk_size)
+        
+    schema, batches = _history_batches(history, chunk_size)
+    # Arrow's CSV writer does not take dictionary columns; write them as plain strings
+    plain = pa.schema([
+        field.with_type(pa.string()) if pa.types.is_dictionary(field.type) else field
+        for field in schema
+    ])
+    rows = 0
+    with pa_csv.CSVWriter(file_name, plain) as writer:
+        for batch in batches:
+            writer.write_batch(batch.cast(plain))
+            rows += batch.num_rows
+    return rows
+
+
+def _export_history_csv_module(history, file_name, chunk_size):
+    bssids = history.bssids()
+    bssid_names = np.array(bssids, dtype=object)
+    ssid_names = np.array([history.ssids[bssid] for bssid in bssids], dtype=object)
+    rows = 0
+    with open(file_name, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "ssid", "bssid", "channel", "rssi", "snr"])
+        for chunk in history.iter_chunks(chunk_size, bssids):
+            timestamps = (chunk['timestamp'] * 1000).astype('datetime64[ms]').astype(str)
+            writer.writerows(zip(
+                timestamps.tolist(), ssid_names[chunk['bssid']].tolist(),
+                bssid_names[chunk['bssid']].tolist(), chunk['channel'].tolist(),
+                chunk['rssi'].tolist(), chunk['snr'].tolist()
+            ))
+            rows += len(timestamps)
+    return rows
+
+
+def _history_batches(history, chunk_size):
+    import pyarrow as pa
+    bssids = history.bssids()
+    bssid_dictionary = pa.array(bssids, type=pa.string())
+    ssid_dictionary = pa.array([history.ssids[bssid] for bssid in bssids], type=pa.string())
+    schema = pa.schema([
+        ('timestamp', pa.timestamp('ms', tz='UTC')),
+        ('ssid', pa.dictionary(pa.int32(), pa.string())),
+        ('bssid', pa.dictionary(pa.int32(), pa.string())),
+        ('channel', pa.int16()),
+        ('rssi', pa.float32()),
+        ('snr', pa.float32())
+    ])
+    
+    def batches():
+        for chunk in history.iter_chunks(chunk_size, bssids):
+            codes = pa.array(chunk['bssid'], type=pa.int32())
+            yield pa.record_batch([
+                pa.array((chunk['timestamp'] * 1000).astype(np.int64), type=pa.timestamp('ms', tz='UTC')),
+                pa.DictionaryArray.from_arrays(codes, ssid_dictionary),
+                pa.DictionaryArray.from_arrays(codes, bssid_dictionary),
+                pa.array(chunk['channel']),
+                pa.array(chunk['rssi']),
+                pa.array(chunk['snr'])
+            ], schema=schema)
+    return schema, batches()
+
+
+@timed("export_history", format="parquet")
+def export_history_parquet(history, file_name, chunk_size=HISTORY_EXPORT_CHUNK):
+    import pyarrow.parquet as pq
+    schema, batches = _history_batches(history, chunk_size)
+    rows = 0
+    with pq.ParquetWriter(file_name, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+@timed("export_history", format="feather")
+def export_history_feather(history, file_name, chunk_size=HISTORY_EXPORT_CHUNK):
+    import pyarrow as pa
+    schema, batches = _history_batches(history, chunk_size)
+    rows = 0
+    with pa.OSFile(file_name, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+HISTORY_EXPORTERS = {
+    '.csv': export_history_csv,
+    '.parquet': export_history_parquet,
+    '.feather': export_history_feather
+}
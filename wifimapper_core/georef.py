@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+
+# Floor plan georeferencing: an affine map from plan pixels to longitude and
+# latitude, fitted by least squares to control points. An affine map is
+# exact for a scanned plan at any rotation and scale and, over a site a few
+# hundred metres across, the curvature it ignores is well under a pixel
+EARTH_RADIUS_M = 6371008.8
+MIN_CONTROL_POINTS = 3
+
+
+class GeoTransform:
+    def __init__(self, control_points):
+        # control_points: (x, y, latitude, longitude) with x, y in plan pixels
+        points = np.asarray(control_points, dtype=np.float64).reshape(-1, 4)
+        if len(points) < MIN_CONTROL_POINTS:
+            raise ValueError(f"At least {MIN_CONTROL_POINTS} control points are needed, got {len(points)}")
+        design = np.column_stack((points[:, 0], points[:, 1], np.ones(len(points))))
+        if np.linalg.matrix_rank(design) < 3:
+            raise ValueError("Control points must not all lie on one line")
+        # [lon, lat] = [x, y, 1] @ coefficients
+        self.coefficients, _, _, _ = np.linalg.lstsq(design, points[:, [3, 2]], rcond=None)
+        self.control_points = [tuple(map(float, point)) for point in points]
+
+    def to_geo(self, x, y):
+        # Plan pixels -> (longitude, latitude), element-wise
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        a, b, c = self.coefficients
+        return a[0] * x + b[0] * y + c[0], a[1] * x + b[1] * y + c[1]
+
+    def to_pixels(self, longitude, latitude):
+        linear = self.coefficients[:2]
+        offset = np.stack((np.asarray(longitude, dtype=np.float64) - self.coefficients[2, 0],
+                           np.asarray(latitude, dtype=np.float64) - self.coefficients[2, 1]), axis=-1)
+        pixels = offset @ np.linalg.inv(linear)
+        return pixels[..., 0], pixels[..., 1]
+
+    def residuals_m(self):
+        # Distance between each control point and where the fit puts it
+        points = np.asarray(self.control_points)
+        longitude, latitude = self.to_geo(points[:, 0], points[:, 1])
+        north = np.radians(latitude - points[:, 2]) * EARTH_RADIUS_M
+        east = np.radians(longitude - points[:, 3]) * EARTH_RADIUS_M * np.cos(np.radians(points[:, 2]))
+        return np.hypot(north, east)
+
+    def meters_per_pixel(self):
+        # Mean ground size of a plan pixel
+        (lon_x, lat_x), (lon_y, lat_y) = self.coefficients[:2]
+        scale = EARTH_RADIUS_M * math.pi / 180
+        east = math.cos(math.radians(self.coefficients[2, 1]))
+        return (math.hypot(lon_x * east, lat_x) + math.hypot(lon_y * east, lat_y)) / 2 * scale
+
+    def to_dict(self):
+        return {'control_points': [list(point) for point in self.control_points]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['control_points'])
@@ -0,0 +1,357 @@
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .metrics import timed
+
+
+# Heatmap propagation model
+DEFAULT_METERS_PER_PIXEL = 0.05
+PATH_LOSS_EXPONENT = 3.0  # Indoor log-distance exponent
+HEATMAP_BATCH_CELLS = 4000000  # Upper bound on (APs x cells) evaluated per broadcast pass
+NOISE_FLOOR_MW = 1e-13  # -130 dBm
+
+
+def reference_loss_db(freq_mhz):
+    # Free-space path loss at the 1 m reference distance
+    return 20 * np.log10(freq_mhz) - 27.55
+
+
+def default_ap_position(bssid, width, height):
+    # Stable placement for access points that have not been positioned on the plan
+    digest = hashlib.md5(str(bssid).encode()).digest()
+    x = int.from_bytes(digest[:4], 'little') / 2 ** 32 * width
+    y = int.from_bytes(digest[4:8], 'little') / 2 ** 32 * height
+    return x, y
+
+
+def calibrated_sources(networks, ap_positions, width, height, scanner_position=None,
+                       meters_per_pixel=DEFAULT_METERS_PER_PIXEL):
+    # Per-AP (x, y, tx_dbm, freq_mhz) arrays for the heatmap engine
+    count = len(networks)
+    ap_x = np.empty(count, dtype=np.float32)
+    ap_y = np.empty(count, dtype=np.float32)
+    rssi = np.empty(count, dtype=np.float32)
+    freq_mhz = np.empty(count, dtype=np.float32)
+    for i, network in enumerate(networks):
+        position = ap_positions.get(network.bssid)
+        if position is None:
+            position = default_ap_position(network.bssid, width, height)
+        ap_x[i], ap_y[i] = position
+        rssi[i] = network.rssi
+        freq_mhz[i] = network.frequency
+        
+    # Calibrate each AP's transmit power from the RSSI seen at the scanner position
+    scanner_x, scanner_y = scanner_position or (width / 2, height / 2)
+    scan_distance = np.hypot(ap_x - scanner_x, ap_y - scanner_y) * meters_per_pixel
+    tx_dbm = (rssi + reference_loss_db(freq_mhz)
+              + 10 * PATH_LOSS_EXPONENT * np.log10(np.maximum(scan_distance, 1.0)))
+    return ap_x, ap_y, tx_dbm, freq_mhz
+
+
+def heatmap_power_mw(shape, resolution, ap_x, ap_y, tx_dbm, freq_mhz,
+                     meters_per_pixel=DEFAULT_METERS_PER_PIXEL,
+                     exponent=PATH_LOSS_EXPONENT, batch_cells=HEATMAP_BATCH_CELLS,
+                     row_offset=0, col_offset=0):
+    # Summed received power in mW over `shape` cells starting at
+    # (row_offset, col_offset) of the full grid
+    rows, cols = shape
+    total_mw = np.zeros((rows, cols), dtype=np.float32)
+    if not rows or not cols or not len(ap_x):
+        return total_mw
+
+    ap_x = np.asarray(ap_x, dtype=np.float32)
+    ap_y = np.asarray(ap_y, dtype=np.float32)
+    # Received power at 1 m in mW, so that P(d) = p0 * d ** -n
+    p0 = np.power(10.0, (np.asarray(tx_dbm) - reference_loss_db(np.asarray(freq_mhz))) / 10)
+    p0 = p0.astype(np.float32)
+
+    # Cell centres in metres
+    xs = ((np.arange(cols, dtype=np.float32) + col_offset + 0.5) * resolution * meters_per_pixel)
+    ys = ((np.arange(rows, dtype=np.float32) + row_offset + 0.5) * resolution * meters_per_pixel)
+    ap_x = ap_x * np.float32(meters_per_pixel)
+    ap_y = ap_y * np.float32(meters_per_pixel)
+
+    batch = max(1, batch_cells // (rows * cols))
+    half_exponent = np.float32(-exponent / 2)
+    for start in range(0, len(ap_x), batch):
+        stop = start + batch
+        dx2 = np.square(xs[None, None, :] - ap_x[start:stop, None, None])
+        dy2 = np.square(ys[None, :, None] - ap_y[start:stop, None, None])
+        d2 = np.maximum(dx2 + dy2, np.float32(1.0))  # Clamp to the reference distance
+        np.power(d2, half_exponent, out=d2)
+        d2 *= p0[start:stop, None, None]
+        total_mw += d2.sum(axis=0)
+    return total_mw
+
+
+@timed("heatmap_compute", mode="serial")
+def compute_heatmap(shape, resolution, ap_x, ap_y, tx_dbm, freq_mhz,
+                    meters_per_pixel=DEFAULT_METERS_PER_PIXEL,
+                    exponent=PATH_LOSS_EXPONENT, batch_cells=HEATMAP_BATCH_CELLS,
+                    row_offset=0, col_offset=0):
+    total_mw = heatmap_power_mw(shape, resolution, ap_x, ap_y, tx_dbm, freq_mhz,
+                                meters_per_pixel, exponent, batch_cells, row_offset, col_offset)
+    np.maximum(total_mw, np.float32(NOISE_FLOOR_MW), out=total_mw)
+    return 10 * np.log10(total_mw)
+
+
+# Live heatmaps: the grid is kept as a running sum of per-AP contributions so
+# a scan that changes a few readings only recomputes those APs, and only
+# within the radius where they are still above a cutoff level. The cutoff
+# sits far enough below the lowest displayed level that the dropped tails of
+# every AP together stay HEATMAP_LAYER_MARGIN_DB under it (at most 0.4 dB of
+# error where the map is not clipped)
+HEATMAP_DISPLAY_MIN_DBM = -100.0  # Bottom of the colour scale
+HEATMAP_LAYER_MARGIN_DB = 10.0
+HEATMAP_LAYER_REBUILD = 1000  # Layer updates between full recomputes
+
+
+def layer_cutoff_dbm(aps):
+    return HEATMAP_DISPLAY_MIN_DBM - HEATMAP_LAYER_MARGIN_DB - 10 * np.log10(max(aps, 1))
+
+
+class HeatmapLayers:
+    def __init__(self, shape, resolution, meters_per_pixel=DEFAULT_METERS_PER_PIXEL,
+                 exponent=PATH_LOSS_EXPONENT, cutoff_dbm=None):
+        self.shape = shape
+        self.resolution = resolution
+        self.meters_per_pixel = meters_per_pixel
+        self.exponent = exponent
+        # Without a fixed cutoff, sync() sizes it for the number of APs
+        self.fixed_cutoff = cutoff_dbm is not None
+        self.capacity = 1
+        self.cutoff_dbm = cutoff_dbm if self.fixed_cutoff else layer_cutoff_dbm(self.capacity)
+        # float64 so that removing a layer cancels its earlier addition
+        self.total_mw = np.zeros(shape, dtype=np.float64)
+        self.sources = {}
+        self.updates = 0
+        
+    def matches(self, shape, resolution, meters_per_pixel):
+        return (self.shape, self.resolution, self.meters_per_pixel) == (shape, resolution, meters_per_pixel)
+        
+    def extent(self, source):
+        # Cell window outside which the AP is below the cutoff level
+        x, y, tx_dbm, freq_mhz = source
+        margin_db = tx_dbm - reference_loss_db(freq_mhz) - self.cutoff_dbm
+        radius_m = 10 ** (max(margin_db, 0.0) / (10 * self.exponent))
+        cell_m = self.resolution * self.meters_per_pixel
+        rows, cols = self.shape
+        x_m, y_m = x * self.meters_per_pixel, y * self.meters_per_pixel
+        r0 = min(max(int((y_m - radius_m) // cell_m), 0), rows)
+        r1 = min(max(int((y_m + radius_m) // cell_m) + 1, 0), rows)
+        c0 = min(max(int((x_m - radius_m) // cell_m), 0), cols)
+        c1 = min(max(int((x_m + radius_m) // cell_m) + 1, 0), cols)
+        return r0, r1, c0, c1
+        
+    def apply(self, source, sign):
+        r0, r1, c0, c1 = self.extent(source)
+        if r1 <= r0 or c1 <= c0:
+            return
+        x, y, tx_dbm, freq_mhz = source
+        layer = heatmap_power_mw(
+            (r1 - r0, c1 - c0), self.resolution, [x], [y], [tx_dbm], [freq_mhz],
+            self.meters_per_pixel, self.exponent, row_offset=r0, col_offset=c0
+        )
+        if sign > 0:
+            self.total_mw[r0:r1, c0:c1] += layer
+        else:
+            self.total_mw[r0:r1, c0:c1] -= layer
+            
+    def set_source(self, key, source):
+        source = tuple(float(v) for v in source)
+        previous = self.sources.get(key)
+        if previous == source:
+            return False
+        if previous is not None:
+            self.apply(previous, -1)
+        self.apply(source, 1)
+        self.sources[key] = source
+        self.updates += 1
+        return True
+        
+    def remove_source(self, key):
+        previous = self.sources.pop(key, None)
+        if previous is None:
+            return False
+        self.apply(previous, -1)
+        self.updates += 1
+        return True
+        
+    def fit_capacity(self, aps):
+        # AP count the cutoff allows for: doubled as APs appear, and only
+        # lowered when they fall to a quarter of it, so one AP coming and
+        # going at the boundary doesn't rebuild the grid every scan
+        if aps > self.capacity or aps < self.capacity // 4:
+            return 1 << max(aps - 1, 0).bit_length()
+        return self.capacity
+        
+    def sync(self, sources):
+        # `sources` maps key -> (x, y, tx_dbm, freq_mhz); returns the number of layers touched
+        capacity = self.fit_capacity(len(sources))
+        if not self.fixed_cutoff and capacity != self.capacity:
+            # Every window depends on the cutoff, so start over
+            self.capacity = capacity
+            self.cutoff_dbm = layer_cutoff_dbm(capacity)
+            self.sources = {key: tuple(float(v) for v in source) for key, source in sources.items()}
+            self.rebuild()
+            return len(self.sources)
+        changed = sum(self.remove_source(key) for key in set(self.sources) - set(sources))
+        changed += sum(self.set_source(key, source) for key, source in sources.items())
+        if self.updates >= HEATMAP_LAYER_REBUILD:
+            self.rebuild()
+        return changed
+        
+    def rebuild(self):
+        # Clears accumulated rounding from repeated add/remove cycles
+        self.total_mw[:] = 0
+        for source in self.sources.values():
+            self.apply(source, 1)
+        self.updates = 0
+        
+    def grid(self):
+        return (10 * np.log10(np.maximum(self.total_mw, NOISE_FLOOR_MW))).astype(np.float32)
+
+
+# Multi-core heatmaps: the grid is split into tiles computed in worker
+# processes that write straight into one shared-memory output array, so only
+# the (small) per-AP arrays are pickled
+HEATMAP_TILE_SIZE = 256
+PARALLEL_MIN_EVALUATIONS = 50000000  # AP x cell evaluations below which one core is faster
+
+
+def heatmap_tiles(shape, tile_size=HEATMAP_TILE_SIZE):
+    rows, cols = shape
+    return [
+        (r, min(r + tile_size, rows), c, min(c + tile_size, cols))
+        for r in range(0, rows, tile_size)
+        for c in range(0, cols, tile_size)
+    ]
+
+
+def heatmap_executor(workers):
+    # Start the resource tracker first so worker processes share the parent's;
+    # otherwise each worker tracks the segments it attaches and "cleans them
+    # up" on exit while the parent still owns them
+    resource_tracker.ensure_running()
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _heatmap_tile(shm_name, shape, tile, resolution, sources, options):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        grid = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        r0, r1, c0, c1 = tile
+        grid[r0:r1, c0:c1] = compute_heatmap(
+            (r1 - r0, c1 - c0), resolution, *sources, row_offset=r0, col_offset=c0, **options
+        )
+        del grid
+    finally:
+        shm.close()
+    return (tile[1] - tile[0]) * (tile[3] - tile[2])
+
+
+class HeatmapCancelled(Exception):
+    pass
+
+
+@timed("heatmap_compute", mode="parallel")
+def compute_heatmap_parallel(executor, shape, resolution, ap_x, ap_y, tx_dbm, freq_mhz,
+                             tile_size=HEATMAP_TILE_SIZE, progress=None, cancelled=None,
+                             **options):
+    rows, cols = shape
+    shm = shared_memory.SharedMemory(create=True, size=max(rows * cols * 4, 1))
+    try:
+        sources = tuple(np.asarray(a, dtype=np.float32) for a in (ap_x, ap_y, tx_dbm, freq_mhz))
+        tiles = heatmap_tiles(shape, tile_size)
+        pending = {
+            executor.submit(_heatmap_tile, shm.name, shape, tile, resolution, sources, options)
+            for tile in tiles
+        }
+        done_count = 0
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                done_count += len(done)
+                if progress is not None and done:
+                    progress(done_count, len(tiles))
+                if cancelled is not None and cancelled():
+                    raise HeatmapCancelled()
+        finally:
+            for future in pending:
+                future.cancel()
+            # Tiles already running must finish before the segment is released
+            wait(pending)
+        grid = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        result = grid.copy()
+        del grid
+        return result
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+# Heatmap results are cached so that toggling settings back and forth, or
+# redrawing after dead zone highlighting, does not recompute the grid
+HEATMAP_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def heatmap_cache_key(floor_plan_key, resolution, band, sources, meters_per_pixel):
+    digest = hashlib.sha1(f"{floor_plan_key}:{resolution}:{band}:{meters_per_pixel}".encode())
+    for array in sources:
+        digest.update(np.ascontiguousarray(array, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class HeatmapCache:
+    # LRU of read-only heatmap grids bounded by total bytes; entries pushed
+    # out of memory are written to spill_dir (when set) and reloaded on a hit.
+    # put() stores its own copy, so the caller's array stays writeable and
+    # later edits to it never reach the cache
+    def __init__(self, max_bytes=HEATMAP_CACHE_BYTES, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        
+    def spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.npy")
+        
+    def get(self, key):
+        grid = self.entries.get(key)
+        if grid is not None:
+            self.entries.move_to_end(key)
+            return grid
+        if self.spill_dir and os.path.exists(self.spill_path(key)):
+            grid = np.load(self.spill_path(key))
+            self.put(key, grid)
+            return self.entries.get(key, grid)
+        return None
+        
+    def put(self, key, grid):
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key).nbytes
+        grid = np.array(grid, order='C')
+        grid.setflags(write=False)
+        self.entries[key] = grid
+        self.nbytes += grid.nbytes
+        self.shrink()
+        
+    def shrink(self):
+        while self.nbytes > self.max_bytes and self.entries:
+            key, grid = self.entries.popitem(last=False)
+            self.nbytes -= grid.nbytes
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                if not os.path.exists(self.spill_path(key)):
+                    np.save(self.spill_path(key), grid)
+                    
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
@@ -0,0 +1,191 @@
+import time
+
+import numpy as np
+
+
+class SampleRing:
+    # Fixed-capacity ring of (timestamp, RSSI, SNR, channel) columns for one BSSID.
+    # Storage starts small and doubles up to the capacity limit
+    __slots__ = ('capacity', 'timestamp', 'rssi', 'snr', 'channel', 'start', 'count')
+    
+    def __init__(self, capacity, initial=64):
+        self.capacity = capacity
+        size = min(initial, capacity)
+        self.timestamp = np.empty(size, dtype=np.float64)
+        self.rssi = np.empty(size, dtype=np.float32)
+        self.snr = np.empty(size, dtype=np.float32)
+        self.channel = np.empty(size, dtype=np.int16)
+        self.start = 0
+        self.count = 0
+        
+    def _grow(self):
+        size = min(len(self.timestamp) * 2, self.capacity)
+        for name in ('timestamp', 'rssi', 'snr', 'channel'):
+            column = getattr(self, name)
+            grown = np.empty(size, dtype=column.dtype)
+            grown[:self.count] = self._ordered(column)
+            setattr(self, name, grown)
+        self.start = 0
+        
+    def append(self, timestamp, rssi, snr, channel):
+        if self.count == len(self.timestamp) and self.count < self.capacity:
+            self._grow()
+        size = len(self.timestamp)
+        if self.count == size:
+            # Full: overwrite the oldest sample
+            slot = self.start
+            self.start = (self.start + 1) % size
+        else:
+            slot = (self.start + self.count) % size
+            self.count += 1
+        self.timestamp[slot] = timestamp
+        self.rssi[slot] = rssi
+        self.snr[slot] = snr
+        self.channel[slot] = channel
+        
+    def _ordered(self, column):
+        end = self.start + self.count
+        if end <= len(column):
+            return column[self.start:end]
+        return np.concatenate((column[self.start:], column[:end - len(column)]))
+        
+    def oldest(self):
+        return self.timestamp[self.start] if self.count else None
+        
+    def evict_before(self, cutoff):
+        if not self.count or self.timestamp[self.start] >= cutoff:
+            return
+        stale = int(np.searchsorted(self._ordered(self.timestamp), cutoff, side='left'))
+        self.start = (self.start + stale) % len(self.timestamp)
+        self.count -= stale
+        
+    def columns(self, since=None):
+        timestamp = self._ordered(self.timestamp)
+        first = int(np.searchsorted(timestamp, since, side='left')) if since is not None else 0
+        return {
+            'timestamp': timestamp[first:],
+            'rssi': self._ordered(self.rssi)[first:],
+            'snr': self._ordered(self.snr)[first:],
+            'channel': self._ordered(self.channel)[first:]
+        }
+
+
+class ScanHistory:
+    # In-memory scan history: one SampleRing per BSSID, bounded both by a
+    # retention window and by a per-BSSID sample capacity
+    def __init__(self, retention=8 * 3600, capacity=8192):
+        self.retention = retention
+        self.capacity = capacity
+        self.rings = {}
+        self.ssids = {}
+        
+    def __len__(self):
+        return sum(ring.count for ring in self.rings.values())
+        
+    def bssids(self):
+        return list(self.rings)
+        
+    def append_scan(self, networks, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        for network in networks:
+            ring = self.rings.get(network.bssid)
+            if ring is None:
+                ring = self.rings[network.bssid] = SampleRing(self.capacity)
+            ring.append(timestamp, network.rssi, network.snr, network.channel)
+            self.ssids[network.bssid] = network.ssid
+        self.evict(timestamp)
+        
+    def evict(self, now=None):
+        cutoff = (time.time() if now is None else now) - self.retention
+        for bssid in list(self.rings):
+            ring = self.rings[bssid]
+            ring.evict_before(cutoff)
+            if not ring.count:
+                del self.rings[bssid]
+                del self.ssids[bssid]
+                
+    def to_columns(self):
+        # Flatten all rings into one columnar table, BSSIDs as integer codes
+        bssids = list(self.rings)
+        parts = [self.rings[bssid].columns() for bssid in bssids]
+        columns = {
+            'bssid': np.repeat(np.arange(len(bssids), dtype=np.int32),
+                               [len(part['timestamp']) for part in parts])
+        }
+        for name, dtype in (('timestamp', np.float64), ('rssi', np.float32),
+                            ('snr', np.float32), ('channel', np.int16)):
+            columns[name] = (np.concatenate([part[name] for part in parts]) if parts
+                             else np.empty(0, dtype=dtype))
+        return bssids, [self.ssids[bssid] for bssid in bssids], columns
+        
+    @classmethod
+    def from_columns(cls, bssids, ssids, columns, retention=8 * 3600, capacity=8192):
+        history = cls(retention, capacity)
+        codes = np.asarray(columns['bssid'])
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(bssids) + 1))
+        for code, (bssid, ssid) in enumerate(zip(bssids, ssids)):
+            rows = order[bounds[code]:bounds[code + 1]]
+            if not len(rows):
+                continue
+            ring = history.rings[bssid] = SampleRing(capacity, initial=len(rows))
+            for name in ('timestamp', 'rssi', 'snr', 'channel'):
+                values = np.asarray(columns[name])[rows][-ring.capacity:]
+                getattr(ring, name)[:len(values)] = values
+            ring.count = min(len(rows), ring.capacity)
+            history.ssids[bssid] = ssid
+        return history
+        
+    def iter_chunks(self, chunk_size=65536, bssids=None):
+        # Yields the history as columnar chunks of at most chunk_size samples;
+        # 'bssid' holds integer codes into `bssids` so no per-row strings are built
+        bssids = self.bssids() if bssids is None else bssids
+        pending = []
+        pending_rows = 0
+        for code, bssid in enumerate(bssids):
+            ring = self.rings.get(bssid)
+            if ring is None:
+                continue
+            columns = ring.columns()
+            for start in range(0, ring.count, chunk_size):
+                part = {name: values[start:start + chunk_size] for name, values in columns.items()}
+                part['bssid'] = np.full(len(part['timestamp']), code, dtype=np.int32)
+                pending.append(part)
+                pending_rows += len(part['timestamp'])
+                if pending_rows >= chunk_size:
+                    yield _concat_chunk(pending)
+                    pending = []
+                    pending_rows = 0
+        if pending:
+            yield _concat_chunk(pending)
+            
+    def samples(self, bssid, window=None, now=None):
+        ring = self.rings.get(bssid)
+        if ring is None:
+            return None
+        since = None
+        if window is not None:
+            since = (time.time() if now is None else now) - window
+        return ring.columns(since)
+        
+    def stats(self, bssid, window=None, percentiles=(10, 50, 90), now=None):
+        samples = self.samples(bssid, window, now)
+        if samples is None or not len(samples['rssi']):
+            return None
+        rssi = samples['rssi']
+        result = {
+            'count': len(rssi),
+            'min': float(rssi.min()),
+            'mean': float(rssi.mean()),
+            'max': float(rssi.max()),
+            'snr_mean': float(samples['snr'].mean())
+        }
+        for p, value in zip(percentiles, np.percentile(rssi, percentiles)):
+            result[f'p{p}'] = float(value)
+        return result
+
+
+def _concat_chunk(parts):
+    if len(parts) == 1:
+        return parts[0]
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
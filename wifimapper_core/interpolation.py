@@ -0,0 +1,185 @@
+import numpy as np
+
+
+# Survey interpolation: RSSI measured at clicked floor plan positions is
+# spread over the heatmap grid from the k nearest survey points
+SURVEY_NEIGHBOURS = 8
+IDW_POWER = 2.0
+KRIGING_NEIGHBOURS = 12
+INTERPOLATION_CHUNK = 65536  # Grid cells per neighbour query
+_KD_TREE = False  # Not looked up yet
+
+
+def kd_tree_class():
+    # scipy is imported on first use, since loading scipy.spatial takes
+    # longer than the rest of start-up; None when scipy is not installed
+    global _KD_TREE
+    if _KD_TREE is False:
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            cKDTree = None
+        _KD_TREE = cKDTree
+    return _KD_TREE
+
+
+class SurveyPoints:
+    # Scan results pinned to floor plan positions (in pixels)
+    def __init__(self):
+        self.positions = []
+        self.sample_point = []
+        self.sample_bssid = []
+        self.sample_rssi = []
+        
+    def __len__(self):
+        return len(self.positions)
+        
+    def add(self, x, y, networks):
+        point = len(self.positions)
+        self.positions.append((x, y))
+        for network in networks:
+            self.sample_point.append(point)
+            self.sample_bssid.append(network.bssid)
+            self.sample_rssi.append(network.rssi)
+            
+    def clear(self):
+        self.__init__()
+        
+    def strongest_positions(self):
+        # BSSID -> position of the survey point with its strongest reading
+        best = {}
+        for point, bssid, rssi in zip(self.sample_point, self.sample_bssid, self.sample_rssi):
+            if bssid not in best or rssi > best[bssid][0]:
+                best[bssid] = (rssi, point)
+        return {bssid: self.positions[point] for bssid, (_, point) in best.items()}
+        
+    def samples(self, bssid=None):
+        # (x, y, rssi) per survey point that heard `bssid`, or the strongest
+        # reading at each point when no BSSID is given
+        positions = np.asarray(self.positions, dtype=np.float64).reshape(-1, 2)
+        point = np.asarray(self.sample_point, dtype=np.int64)
+        rssi = np.asarray(self.sample_rssi, dtype=np.float32)
+        if bssid is not None:
+            mask = np.asarray(self.sample_bssid, dtype=object) == bssid
+            point, rssi = point[mask], rssi[mask]
+            return positions[point, 0], positions[point, 1], rssi
+        strongest = np.full(len(positions), -np.inf, dtype=np.float32)
+        np.maximum.at(strongest, point, rssi)
+        heard = np.isfinite(strongest)
+        return positions[heard, 0], positions[heard, 1], strongest[heard]
+
+
+def _nearest_brute_force(points, queries, k):
+    # Fallback when scipy is unavailable; O(points) per query
+    d2 = (np.square(queries[:, None, 0] - points[None, :, 0])
+          + np.square(queries[:, None, 1] - points[None, :, 1]))
+    idx = np.argpartition(d2, k - 1, axis=1)[:, :k] if k < len(points) else np.broadcast_to(
+        np.arange(len(points)), d2.shape).copy()
+    return np.sqrt(np.take_along_axis(d2, idx, axis=1)), idx
+
+
+def nearest_neighbours(points, k):
+    # Returns query(queries) -> (distances, indices), both (n, k)
+    cKDTree = kd_tree_class()
+    if cKDTree is not None:
+        tree = cKDTree(points)
+        
+        def query(queries):
+            distances, idx = tree.query(queries, k=k, workers=-1)
+            return distances.reshape(len(queries), k), idx.reshape(len(queries), k)
+        return query
+    chunk = max(1, INTERPOLATION_CHUNK * 16 // max(len(points), 1))
+    
+    def query(queries):
+        parts = [_nearest_brute_force(points, queries[i:i + chunk], k)
+                 for i in range(0, len(queries), chunk)]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+    return query
+
+
+def _grid_cells(shape, resolution, start, stop):
+    # Cell centres (in pixels) of flattened cells start..stop
+    cols = shape[1]
+    flat = np.arange(start, stop)
+    return np.column_stack(((flat % cols + 0.5) * resolution, (flat // cols + 0.5) * resolution))
+
+
+def interpolate_idw(shape, resolution, xs, ys, values, k=SURVEY_NEIGHBOURS, power=IDW_POWER):
+    rows, cols = shape
+    points = np.column_stack((xs, ys))
+    values = np.asarray(values, dtype=np.float64)
+    k = min(k, len(points))
+    query = nearest_neighbours(points, k)
+    grid = np.empty(rows * cols, dtype=np.float32)
+    for start in range(0, rows * cols, INTERPOLATION_CHUNK):
+        stop = min(start + INTERPOLATION_CHUNK, rows * cols)
+        distances, idx = query(_grid_cells(shape, resolution, start, stop))
+        # A cell on top of a survey point takes that point's value
+        weights = 1.0 / np.maximum(distances, 1e-6) ** power
+        grid[start:stop] = (weights * values[idx]).sum(axis=1) / weights.sum(axis=1)
+    return grid.reshape(rows, cols)
+
+
+def fit_variogram(xs, ys, values, max_pairs=200000, bins=20, seed=0):
+    # Exponential variogram (sill, range) from a binned empirical variogram
+    values = np.asarray(values, dtype=np.float64)
+    sill = max(float(values.var()), 1e-6)
+    rng = np.random.default_rng(seed)
+    i = rng.integers(0, len(values), max_pairs)
+    j = rng.integers(0, len(values), max_pairs)
+    h = np.hypot(xs[i] - xs[j], ys[i] - ys[j])
+    gamma = 0.5 * np.square(values[i] - values[j])
+    if not h.max() > 0:
+        return sill, 1.0
+    edges = np.linspace(0, h.max() / 2, bins + 1)
+    which = np.digitize(h, edges) - 1
+    for b in range(bins):
+        in_bin = which == b
+        # Practical range: where the semivariance reaches 95% of the sill
+        if in_bin.any() and gamma[in_bin].mean() >= 0.95 * sill:
+            return sill, max(float(edges[b + 1]), 1.0)
+    return sill, float(edges[-1])
+
+
+def interpolate_kriging(shape, resolution, xs, ys, values, k=KRIGING_NEIGHBOURS, variogram=None):
+    # Ordinary kriging over each cell's k nearest survey points
+    rows, cols = shape
+    points = np.column_stack((xs, ys))
+    values = np.asarray(values, dtype=np.float64)
+    k = min(k, len(points))
+    sill, vrange = variogram or fit_variogram(points[:, 0], points[:, 1], values)
+    
+    def gamma(h):
+        return sill * (1 - np.exp(-3 * h / vrange))
+        
+    query = nearest_neighbours(points, k)
+    grid = np.empty(rows * cols, dtype=np.float32)
+    chunk = max(1, INTERPOLATION_CHUNK // 4)
+    for start in range(0, rows * cols, chunk):
+        stop = min(start + chunk, rows * cols)
+        distances, idx = query(_grid_cells(shape, resolution, start, stop))
+        order = np.argsort(idx, axis=1)
+        idx = np.take_along_axis(idx, order, axis=1)
+        distances = np.take_along_axis(distances, order, axis=1)
+        # Neighbouring cells mostly share a neighbour set, so each distinct
+        # kriging matrix is built and inverted once
+        neighbour_sets, which = np.unique(idx, axis=0, return_inverse=True)
+        near = points[neighbour_sets]
+        system = np.ones((len(neighbour_sets), k + 1, k + 1))
+        system[:, :k, :k] = gamma(np.hypot(near[:, :, None, 0] - near[:, None, :, 0],
+                                           near[:, :, None, 1] - near[:, None, :, 1]))
+        # Small nugget on the diagonal keeps co-located points solvable
+        system[:, np.arange(k), np.arange(k)] = -1e-6 * sill
+        system[:, k, k] = 0
+        inverse = np.linalg.inv(system)
+        target = np.ones((stop - start, k + 1))
+        target[:, :k] = gamma(distances)
+        weights = np.einsum('nij,nj->ni', inverse[which.reshape(-1)][:, :k], target)
+        grid[start:stop] = (weights * values[idx]).sum(axis=1)
+    return grid.reshape(rows, cols)
+
+
+INTERPOLATORS = {
+    "Survey (IDW)": interpolate_idw,
+    "Survey (Kriging)": interpolate_kriging
+}
@@ -0,0 +1,170 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Timing spans around the hot paths (scans, table updates, heatmaps,
+# exports). Disabled by default: span() then hands back one shared no-op
+# context manager, so instrumented code pays a call and a flag check.
+# Set WIFIMAPPER_METRICS=1 to collect from startup
+METRICS_ENV = "WIFIMAPPER_METRICS"
+SPAN_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_METRIC = "wifimapper_span_seconds"
+
+
+class SpanStats:
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'last', 'buckets')
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = 0.0
+        self.last = 0.0
+        self.buckets = [0] * (len(SPAN_BUCKETS) + 1)  # Last one is +Inf
+        
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+        self.last = seconds
+        self.buckets[bisect_left(SPAN_BUCKETS, seconds)] += 1
+
+
+class _Span:
+    __slots__ = ('registry', 'key', 'start')
+    
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+        
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+        
+    def __exit__(self, *exc):
+        self.registry.record(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = {}  # (name, sorted label items) -> SpanStats
+        self.lock = threading.Lock()  # Spans close on scan and heatmap worker threads
+        self.started = time.time()
+        
+    def span(self, name, **labels):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, (name, tuple(sorted(labels.items()))))
+        
+    def record(self, key, seconds):
+        with self.lock:
+            stats = self.spans.get(key)
+            if stats is None:
+                stats = self.spans[key] = SpanStats()
+            stats.add(seconds)
+            
+    def reset(self):
+        with self.lock:
+            self.spans = {}
+            self.started = time.time()
+            
+    def snapshot(self):
+        with self.lock:
+            items = sorted(self.spans.items())
+            return [{
+                'name': name,
+                'labels': dict(labels),
+                'count': stats.count,
+                'total_s': stats.total,
+                'mean_s': stats.total / stats.count,
+                'min_s': stats.minimum,
+                'max_s': stats.maximum,
+                'last_s': stats.last,
+                'buckets': list(stats.buckets)
+            } for (name, labels), stats in items]
+            
+    def to_json(self):
+        spans = self.snapshot()
+        for span in spans:
+            # Cumulative counts keyed by upper bound, as in the Prometheus output
+            span['buckets'] = dict(zip(
+                [str(bound) for bound in SPAN_BUCKETS] + ["+Inf"], _cumulative(span['buckets'])
+            ))
+        return json.dumps({'started': self.started, 'collected': time.time(), 'spans': spans}, indent=2)
+        
+    def to_prometheus(self):
+        lines = [
+            f"# HELP {PROMETHEUS_METRIC} Duration of instrumented WiFiMapper operations.",
+            f"# TYPE {PROMETHEUS_METRIC} histogram"
+        ]
+        for span in self.snapshot():
+            labels = {'span': span['name'], **span['labels']}
+            bounds = [repr(bound) for bound in SPAN_BUCKETS] + ["+Inf"]
+            for bound, count in zip(bounds, _cumulative(span['buckets'])):
+                lines.append(f"{PROMETHEUS_METRIC}_bucket{_label_text({**labels, 'le': bound})} {count}")
+            lines.append(f"{PROMETHEUS_METRIC}_sum{_label_text(labels)} {span['total_s']!r}")
+            lines.append(f"{PROMETHEUS_METRIC}_count{_label_text(labels)} {span['count']}")
+        return "\n".join(lines) + "\n"
+        
+    def dump(self, file_name):
+        # JSON for .json files, Prometheus text exposition format otherwise
+        # (e.g. .prom for node_exporter's textfile collector)
+        text = self.to_json() if file_name.lower().endswith('.json') else self.to_prometheus()
+        with open(file_name, 'w') as f:
+            f.write(text)
+
+
+def _cumulative(buckets):
+    total = 0
+    counts = []
+    for count in buckets:
+        total += count
+        counts.append(total)
+    return counts
+
+
+def _label_text(labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+METRICS = MetricsRegistry(enabled=os.environ.get(METRICS_ENV, "") not in ("", "0"))
+
+
+def span(name, **labels):
+    if not METRICS.enabled:
+        return _NULL_SPAN
+    return _Span(METRICS, (name, tuple(sorted(labels.items()))))
+
+
+def timed(name, **labels):
+    # Decorator form of span() for whole functions
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            with METRICS.span(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
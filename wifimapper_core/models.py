@@ -0,0 +1,73 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+def parse_frequency_mhz(frequency):
+    if isinstance(frequency, (int, float)):
+        return float(frequency)
+    return float(str(frequency).split()[0])
+
+
+BAND_RANGES_MHZ = {
+    "2.4 GHz": (2400, 2500),
+    "5 GHz": (5000, 5900),
+    "6 GHz": (5900, 7100)
+}
+
+
+class ScanRecord(NamedTuple):
+    ssid: str
+    bssid: str
+    channel: int
+    rssi: int
+    security: str
+    frequency: float  # MHz
+    band: str
+    snr: int
+    
+    @classmethod
+    def from_dict(cls, data):
+        # Accepts legacy project entries where frequency is a "2437.0 MHz" string
+        frequency = parse_frequency_mhz(data['frequency'])
+        return cls(
+            data['ssid'], data['bssid'],
+            data.get('channel') or channel_from_frequency(frequency),
+            data['rssi'], str(data['security']), frequency,
+            data.get('band') or band_of(frequency), data['snr']
+        )
+
+
+# Structured layout for bulk record sets (exports, project files, analysis).
+# ASCII-only fields are stored as bytes to keep rows compact
+SCAN_RECORD_DTYPE = np.dtype([
+    ('ssid', 'U32'), ('bssid', 'S17'), ('channel', np.int16), ('rssi', np.int16),
+    ('security', 'S16'), ('frequency', np.float32), ('band', 'S7'), ('snr', np.int16)
+])
+
+
+def records_to_array(records):
+    return np.array([
+        (r.ssid, r.bssid, r.channel, r.rssi, str(r.security), r.frequency, r.band, r.snr)
+        for r in records
+    ], dtype=SCAN_RECORD_DTYPE)
+
+
+def band_of(freq_mhz):
+    for band, (low, high) in BAND_RANGES_MHZ.items():
+        if low <= freq_mhz <= high:
+            return band
+    return ""
+
+
+def channel_from_frequency(freq_mhz):
+    freq_mhz = int(round(freq_mhz))
+    if freq_mhz == 2484:
+        return 14
+    if 2400 <= freq_mhz < 2500:
+        return (freq_mhz - 2407) // 5
+    if freq_mhz > 5950:
+        return (freq_mhz - 5950) // 5
+    if 5000 <= freq_mhz <= 5950:
+        return (freq_mhz - 5000) // 5
+    return 0
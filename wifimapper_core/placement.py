@@ -0,0 +1,232 @@
+import math
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from .heatmap import DEFAULT_METERS_PER_PIXEL, PATH_LOSS_EXPONENT, reference_loss_db
+
+# AP placement: the fewest candidate sites whose best-server signal reaches
+# the coverage threshold on the target share of the floor area, with at
+# least as many APs as the device load needs
+COVERAGE_THRESHOLD_DBM = -67.0
+COVERAGE_TARGET = 0.95
+PLACEMENT_MAX_CELLS = 250000  # Coverage is evaluated on a coarser grid beyond this
+PLACEMENT_NEIGHBOURS = 8  # Nearby sites tried first when annealing moves an AP
+
+
+class PlacementResult(NamedTuple):
+    positions: list  # (x, y) per AP in floor plan pixels
+    coverage: float  # Share of the floor area at or above the threshold
+    capacity_aps: int  # APs needed for the device load alone
+    greedy_aps: int
+    candidates: int
+    elapsed: float
+
+
+def placement_resolution(size, resolution, max_cells=PLACEMENT_MAX_CELLS):
+    # Smallest multiple of `resolution` whose grid stays under max_cells
+    width, height = size
+    factor = max(1, math.ceil(math.sqrt(width * height / max_cells) / resolution))
+    return resolution * factor
+
+
+def candidate_sites(area_mask, spacing_cells):
+    # Regular grid of floor cells, offset half a spacing from the edges
+    spacing_cells = max(1, int(spacing_cells))
+    rows, cols = np.meshgrid(
+        np.arange(spacing_cells // 2, area_mask.shape[0], spacing_cells),
+        np.arange(spacing_cells // 2, area_mask.shape[1], spacing_cells),
+        indexing='ij'
+    )
+    keep = area_mask[rows, cols]
+    return rows[keep], cols[keep]
+
+
+class SiteCoverage:
+    # Floor cells covered by each candidate site, stored sparsely (CSR-style
+    # flat cell indices) since a site only reaches cells within its link
+    # budget's range. The transpose maps each cell to the sites covering it
+    def __init__(self, indptr, indices, area_cells):
+        self.indptr = indptr
+        self.indices = indices
+        self.area_cells = area_cells
+        sites = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+        order = np.argsort(indices, kind='stable')
+        self.cell_sites = sites[order]
+        self.cell_indptr = np.searchsorted(indices[order], np.arange(indices.max(initial=-1) + 2))
+        
+    def __len__(self):
+        return len(self.indptr) - 1
+        
+    def cells(self, site):
+        return self.indices[self.indptr[site]:self.indptr[site + 1]]
+        
+    def sizes(self):
+        return np.diff(self.indptr)
+        
+    def sites_covering(self, cells):
+        cells = cells[cells < len(self.cell_indptr) - 1]
+        starts, stops = self.cell_indptr[cells], self.cell_indptr[cells + 1]
+        lengths = stops - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return self.cell_sites[offsets]
+        
+    def cover_counts(self, plan, grid_cells):
+        count = np.zeros(grid_cells, dtype=np.int16)
+        for site in plan:
+            count[self.cells(site)] += 1
+        return count
+
+
+def site_coverage(area_mask, resolution, site_rows, site_cols, tx_dbm, freq_mhz,
+                  threshold_dbm=COVERAGE_THRESHOLD_DBM, wall_index=None,
+                  meters_per_pixel=DEFAULT_METERS_PER_PIXEL, exponent=PATH_LOSS_EXPONENT):
+    # A cell is covered while distance plus wall loss stays within the link
+    # budget. Only the window within free-space range of a site is evaluated
+    rows, cols = area_mask.shape
+    cell_m = resolution * meters_per_pixel
+    budget = float(tx_dbm - reference_loss_db(freq_mhz) - threshold_dbm)
+    radius = int(10 ** (budget / (10 * exponent)) / cell_m) if budget >= 0 else 0
+    radius = min(radius, max(rows, cols))
+    oy = np.arange(-radius, radius + 1, dtype=np.float32)[:, None] * np.float32(cell_m)
+    ox = np.arange(-radius, radius + 1, dtype=np.float32)[None, :] * np.float32(cell_m)
+    distance_db = np.float32(5 * exponent) * np.log10(np.maximum(np.square(oy) + np.square(ox), np.float32(1.0)))
+    reachable = distance_db <= budget
+    
+    parts = []
+    flat_mask = area_mask.ravel()
+    for row, col in zip(site_rows, site_cols):
+        r0, r1 = max(row - radius, 0), min(row + radius + 1, rows)
+        c0, c1 = max(col - radius, 0), min(col + radius + 1, cols)
+        window = (slice(r0 - row + radius, r1 - row + radius), slice(c0 - col + radius, c1 - col + radius))
+        if wall_index is not None:
+            _, _, wall_loss = wall_index.loss_window(row, col, radius)
+            covered = distance_db[window] + wall_loss <= budget
+        else:
+            covered = reachable[window]
+        local_rows, local_cols = np.nonzero(covered)
+        cells = (local_rows + r0) * cols + (local_cols + c0)
+        parts.append(cells[flat_mask[cells]].astype(np.int32))
+    indptr = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum([len(part) for part in parts], out=indptr[1:])
+    indices = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+    return SiteCoverage(indptr, indices, int(np.count_nonzero(area_mask)))
+
+
+def greedy_placement(coverage, needed, grid_cells):
+    # Adds the site covering the most uncovered cells until `needed` cells
+    # are covered or no site helps any more. Gains are kept up to date from
+    # the cells each pick newly covers
+    gains = coverage.sizes().astype(np.int64)
+    covered = np.zeros(grid_cells, dtype=bool)
+    total = 0
+    plan = []
+    while total < needed:
+        best = int(np.argmax(gains))
+        if gains[best] <= 0:
+            break
+        cells = coverage.cells(best)
+        fresh = cells[~covered[cells]]
+        covered[fresh] = True
+        total += len(fresh)
+        gains -= np.bincount(coverage.sites_covering(fresh), minlength=len(gains))
+        plan.append(best)
+    return plan, total
+
+
+def anneal_placement(coverage, plan, needed, neighbours, grid_cells, deadline, rng):
+    # Simulated annealing over swaps of one planned site for another, with
+    # the number of APs fixed, maximising covered cells. Per-cell cover
+    # counts make a swap's gain a pass over the two sites' cells
+    plan = list(plan)
+    in_plan = np.zeros(len(coverage), dtype=bool)
+    in_plan[plan] = True
+    count = coverage.cover_counts(plan, grid_cells)
+    covered = int(np.count_nonzero(count))
+    best, best_covered = list(plan), covered
+    marked = np.zeros(grid_cells, dtype=bool)
+    temperature = max(1.0, 0.02 * np.mean(coverage.sizes()))
+    while best_covered < needed and time.perf_counter() < deadline:
+        slot = int(rng.integers(len(plan)))
+        old = plan[slot]
+        new = int(rng.choice(neighbours[old]) if rng.random() < 0.7 else rng.integers(len(coverage)))
+        if in_plan[new]:
+            continue
+        old_cells, new_cells = coverage.cells(old), coverage.cells(new)
+        marked[old_cells] = True
+        new_counts = count[new_cells]
+        gained = np.count_nonzero((new_counts == 0) | ((new_counts == 1) & marked[new_cells]))
+        marked[old_cells] = False
+        delta = gained - np.count_nonzero(count[old_cells] == 1)
+        if delta >= 0 or rng.random() < math.exp(delta / temperature):
+            count[old_cells] -= 1
+            count[new_cells] += 1
+            in_plan[old], in_plan[new] = False, True
+            plan[slot] = new
+            covered += delta
+            if covered > best_covered:
+                best, best_covered = list(plan), covered
+        temperature = max(temperature * 0.999, 0.05)
+    return best, best_covered
+
+
+def optimise_placement(coverage, site_rows, site_cols, grid_cells, target=COVERAGE_TARGET,
+                       min_aps=1, time_budget=3.0, seed=0):
+    # Greedy set cover gives a first plan; annealing then tries to meet the
+    # target with one AP fewer at a time, until it fails or the budget ends.
+    # Returns (site indices, covered cells, greedy AP count)
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + time_budget
+    needed = math.ceil(target * coverage.area_cells)
+    plan, covered = greedy_placement(coverage, needed, grid_cells)
+    greedy_aps = len(plan)
+    
+    if covered >= needed and len(plan) > max(min_aps, 1):
+        distance = np.hypot(site_rows[:, None] - site_rows[None, :], site_cols[:, None] - site_cols[None, :])
+        neighbours = np.argsort(distance, axis=1)[:, 1:PLACEMENT_NEIGHBOURS + 1]
+        while len(plan) > max(min_aps, 1) and time.perf_counter() < deadline:
+            # Drop the AP covering the fewest cells on its own, then repair
+            count = coverage.cover_counts(plan, grid_cells)
+            unique = [np.count_nonzero(count[coverage.cells(site)] == 1) for site in plan]
+            weakest = int(np.argmin(unique))
+            trial, trial_covered = anneal_placement(
+                coverage, plan[:weakest] + plan[weakest + 1:], needed, neighbours, grid_cells, deadline, rng
+            )
+            if trial_covered < needed:
+                break
+            plan, covered = trial, trial_covered
+            
+    # Device load: extra APs go where they are farthest from the planned ones
+    while len(plan) < min(min_aps, len(coverage)):
+        spread = np.full(len(coverage), np.inf) if not plan else np.min(
+            np.hypot(site_rows[:, None] - site_rows[plan][None, :],
+                     site_cols[:, None] - site_cols[plan][None, :]), axis=1
+        )
+        spread[plan] = -1
+        plan.append(int(np.argmax(spread)))
+        covered = int(np.count_nonzero(coverage.cover_counts(plan, grid_cells)))
+    return plan, covered, greedy_aps
+
+
+def plan_ap_placement(area_mask, resolution, tx_dbm, freq_mhz, wall_index=None,
+                      threshold_dbm=COVERAGE_THRESHOLD_DBM, target=COVERAGE_TARGET,
+                      devices=0, ap_capacity=20, spacing_m=5.0,
+                      meters_per_pixel=DEFAULT_METERS_PER_PIXEL, time_budget=3.0, seed=0):
+    # area_mask marks the floor cells (`resolution` pixels each) that need
+    # coverage and may hold an AP; walls are usually excluded
+    start = time.perf_counter()
+    spacing_cells = max(1, round(spacing_m / (resolution * meters_per_pixel)))
+    site_rows, site_cols = candidate_sites(area_mask, spacing_cells)
+    capacity_aps = max(1, math.ceil(devices / ap_capacity))
+    if not len(site_rows):
+        return PlacementResult([], 0.0, capacity_aps, 0, 0, time.perf_counter() - start)
+    coverage = site_coverage(area_mask, resolution, site_rows, site_cols, tx_dbm, freq_mhz,
+                             threshold_dbm, wall_index, meters_per_pixel)
+    plan, covered, greedy_aps = optimise_placement(
+        coverage, site_rows, site_cols, area_mask.size, target, capacity_aps,
+        max(time_budget - (time.perf_counter() - start), 0.0), seed
+    )
+    positions = [((site_cols[i] + 0.5) * resolution, (site_rows[i] + 0.5) * resolution) for i in plan]
+    return PlacementResult(positions, covered / coverage.area_cells, capacity_aps, greedy_aps,
+                           len(site_rows), time.perf_counter() - start)
@@ -0,0 +1,118 @@
+import datetime
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from .history import ScanHistory
+from .models import ScanRecord
+
+
+# Project files: version 2 is an uncompressed zip holding a JSON manifest and
+# .npy members, so arrays can be memory-mapped straight out of the container.
+# Version 1 projects are plain JSON
+PROJECT_FORMAT_VERSION = 2
+HISTORY_COLUMNS = ('bssid', 'timestamp', 'rssi', 'snr', 'channel')
+
+
+def save_project_file(file_name, scan_data, heatmap, history, settings, ap_positions=None):
+    arrays = {}
+    if heatmap is not None and np.size(heatmap):
+        arrays['heatmap'] = np.ascontiguousarray(heatmap, dtype=np.float32)
+    bssids, ssids, columns = history.to_columns() if history is not None else ([], [], {})
+    for name in HISTORY_COLUMNS if columns else ():
+        arrays[f'history/{name}'] = np.ascontiguousarray(columns[name])
+        
+    manifest = {
+        'format': "wifimapper-project",
+        'version': PROJECT_FORMAT_VERSION,
+        'created': datetime.datetime.now().isoformat(),
+        'settings': settings,
+        'scan_data': [network._asdict() for network in scan_data],
+        'ap_positions': {bssid: list(xy) for bssid, xy in (ap_positions or {}).items()},
+        'history': {'bssids': bssids, 'ssids': ssids},
+        'arrays': {name: f"{name}.npy" for name in arrays}
+    }
+    # The arrays may be memory-mapped from the file being replaced, so the
+    # project is written next to it and moved over it once complete
+    temp_name = f"{file_name}.tmp"
+    try:
+        with zipfile.ZipFile(temp_name, 'w', zipfile.ZIP_STORED) as zf:
+            zf.writestr("manifest.json", json.dumps(manifest))
+            for name, array in arrays.items():
+                with zf.open(f"{name}.npy", 'w', force_zip64=array.nbytes > 2 ** 31 - 1) as member:
+                    np.lib.format.write_array(member, array, allow_pickle=False)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+                
+                
+def _memmap_member(file_name, zf, member):
+    # Map an uncompressed .npy member in place: skip the zip local header
+    # and the .npy header, then point np.memmap at the raw data
+    info = zf.getinfo(member)
+    if info.compress_type != zipfile.ZIP_STORED:
+        with zf.open(member) as f:
+            return np.lib.format.read_array(f, allow_pickle=False)
+    with open(file_name, 'rb') as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if not int(np.prod(shape)):
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(file_name, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+    
+    
+def load_project_file(file_name, mmap=True):
+    if not zipfile.is_zipfile(file_name):
+        # Version 1: a single JSON document
+        with open(file_name) as f:
+            data = json.load(f)
+        heatmap = np.asarray(data.get('heatmap_data') or np.empty((0, 0)), dtype=np.float32)
+        return {
+            'version': 1,
+            'settings': data.get('settings', {}),
+            'scan_data': [ScanRecord.from_dict(network) for network in data.get('scan_data', [])],
+            'heatmap': heatmap,
+            'history': ScanHistory(),
+            'ap_positions': {}
+        }
+        
+    with zipfile.ZipFile(file_name) as zf:
+        manifest = json.loads(zf.read("manifest.json"))
+        if manifest.get('version', 0) > PROJECT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported project version {manifest['version']}")
+        arrays = {}
+        for name, member in manifest['arrays'].items():
+            if mmap:
+                arrays[name] = _memmap_member(file_name, zf, member)
+            else:
+                with zf.open(member) as f:
+                    arrays[name] = np.lib.format.read_array(f, allow_pickle=False)
+                    
+    history = ScanHistory()
+    if 'history/bssid' in arrays:
+        history = ScanHistory.from_columns(
+            manifest['history']['bssids'], manifest['history']['ssids'],
+            {name: arrays[f'history/{name}'] for name in HISTORY_COLUMNS}
+        )
+    return {
+        'version': manifest['version'],
+        'settings': manifest.get('settings', {}),
+        'scan_data': [ScanRecord.from_dict(network) for network in manifest.get('scan_data', [])],
+        'heatmap': arrays.get('heatmap', np.empty((0, 0), dtype=np.float32)),
+        'history': history,
+        'ap_positions': {bssid: tuple(xy) for bssid, xy in manifest.get('ap_positions', {}).items()}
+    }
@@ -0,0 +1,170 @@
+import math
+
+import numpy as np
+
+from .heatmap import (
+    DEFAULT_METERS_PER_PIXEL, NOISE_FLOOR_MW, PATH_LOSS_EXPONENT, reference_loss_db
+)
+
+
+# Predictive coverage: multi-wall model over a wall raster derived from the floor plan
+WALL_ATTENUATION_DB = {
+    "Concrete": 15,
+    "Brick": 12,
+    "Drywall": 8,
+    "Glass": 5
+}
+AP_TX_POWER_DBM = {
+    "Generic AP": 20,
+    "TP-Link AX6000": 23,
+    "Netgear Orbi": 22,
+    "Cisco Meraki": 21
+}
+AP_CLIENT_CAPACITY = {  # Concurrent clients per AP
+    "Generic AP": 20,
+    "TP-Link AX6000": 100,
+    "Netgear Orbi": 80,
+    "Cisco Meraki": 50
+}
+BAND_CENTER_MHZ = {"2.4 GHz": 2437.0, "5 GHz": 5500.0, "6 GHz": 6115.0}
+WALL_THRESHOLD = 96  # Grey level below which a floor plan pixel is a wall
+WALL_INDEX_MAX_SIDE = 512  # Larger grids trace walls on a max-pooled raster
+
+
+def wall_raster_from_image(image, resolution, loss_db, threshold=WALL_THRESHOLD):
+    # Per-cell wall loss (dB); a cell is a wall if any of its pixels is dark,
+    # so one-pixel lines survive the downsampling
+    gray = np.asarray(image.convert('L'))
+    rows, cols = gray.shape[0] // resolution, gray.shape[1] // resolution
+    blocks = gray[:rows * resolution, :cols * resolution].reshape(rows, resolution, cols, resolution)
+    return wall_raster_from_blocks(blocks.min(axis=(1, 3)), loss_db, threshold)
+
+
+def wall_raster_from_blocks(block_min_gray, loss_db, threshold=WALL_THRESHOLD):
+    # Same as wall_raster_from_image from per-cell minimum grey levels,
+    # e.g. FloorPlanPyramid.block_min_gray
+    return np.where(block_min_gray < threshold, np.float32(loss_db), np.float32(0))
+
+
+def _max_pool(raster, factor):
+    rows = -(-raster.shape[0] // factor) * factor
+    cols = -(-raster.shape[1] // factor) * factor
+    padded = np.zeros((rows, cols), dtype=raster.dtype)
+    padded[:raster.shape[0], :raster.shape[1]] = raster
+    return padded.reshape(rows // factor, factor, cols // factor, factor).max(axis=(1, 3))
+
+
+class WallCrossingIndex:
+    # Wall loss from one AP to every cell, charged each time a ray enters a
+    # wall. Rays are precomputed once per raster as flat offsets, so an AP
+    # costs one gather, one cumulative sum along the rays and one lookup per
+    # quadrant, with no per-cell trigonometry
+    def __init__(self, loss_raster, max_side=WALL_INDEX_MAX_SIDE):
+        self.shape = loss_raster.shape
+        self.factor = max(1, -(-max(self.shape) // max_side))
+        raster = _max_pool(loss_raster, self.factor) if self.factor > 1 else loss_raster
+        rows, cols = raster.shape
+        self.coarse_shape = (rows, cols)
+        
+        reach = int(math.ceil(math.hypot(rows, cols))) + 1
+        quarter = max(2, int(math.ceil(math.pi * reach / 4)))
+        self.n_angles = 4 * quarter  # Rays about two cells apart at the far corner
+        self.pad = reach
+        self.padded = np.zeros((rows + 2 * reach, cols + 2 * reach), dtype=np.int16)
+        self.padded[reach:reach + rows, reach:reach + cols] = np.clip(np.rint(raster), 0, 255)
+        
+        theta = np.arange(self.n_angles + 1) * (2 * np.pi / self.n_angles)
+        radii = np.arange(reach, dtype=np.float64)
+        self.offsets = (np.rint(np.outer(np.sin(theta), radii)).astype(np.int32) * self.padded.shape[1]
+                        + np.rint(np.outer(np.cos(theta), radii)).astype(np.int32))
+        
+        # Polar coordinates of every possible AP-to-cell offset
+        oy = np.arange(-(rows - 1), rows, dtype=np.float64)[:, None]
+        ox = np.arange(-(cols - 1), cols, dtype=np.float64)[None, :]
+        step = 2 * np.pi / self.n_angles
+        self.angle = (np.rint(np.mod(np.arctan2(oy, ox), 2 * np.pi) / step).astype(np.int32)
+                      % self.n_angles)
+        self.radius = np.rint(np.hypot(oy, ox)).astype(np.int32)
+        
+    def loss_from(self, ap_row, ap_col):
+        return self.loss_window(ap_row, ap_col)[2]
+        
+    def loss_window(self, ap_row, ap_col, radius=None):
+        # Wall loss from one AP to the cells within `radius` cells of it (all
+        # cells by default); returns (first row, first column, loss)
+        rows, cols = self.shape
+        ap_row = min(max(int(ap_row), 0), rows - 1)
+        ap_col = min(max(int(ap_col), 0), cols - 1)
+        radius = max(rows, cols) if radius is None else int(radius)
+        r0, r1 = max(ap_row - radius, 0), min(ap_row + radius + 1, rows)
+        c0, c1 = max(ap_col - radius, 0), min(ap_col + radius + 1, cols)
+        factor = self.factor
+        loss = self._coarse_loss_from(ap_row // factor, ap_col // factor,
+                                      (r0 // factor, (r1 - 1) // factor + 1, c0 // factor, (c1 - 1) // factor + 1))
+        if factor > 1:
+            loss = np.repeat(np.repeat(loss, factor, axis=0), factor, axis=1)
+            loss = loss[r0 % factor:r0 % factor + r1 - r0, c0 % factor:c0 % factor + c1 - c0]
+        return r0, c0, loss
+        
+    def _coarse_loss_from(self, ap_row, ap_col, bounds):
+        r0, r1, c0, c1 = bounds
+        quarter = self.n_angles // 4
+        base = (ap_row + self.pad) * self.padded.shape[1] + ap_col + self.pad
+        flat = self.padded.ravel()
+        rows, cols = self.coarse_shape
+        loss = np.empty((r1 - r0, c1 - c0), dtype=np.int16)
+        quadrants = (
+            (slice(ap_row, r1), slice(ap_col, c1)),
+            (slice(ap_row, r1), slice(c0, ap_col + 1)),
+            (slice(r0, ap_row + 1), slice(c0, ap_col + 1)),
+            (slice(r0, ap_row + 1), slice(ap_col, c1))
+        )
+        for k, (row_span, col_span) in enumerate(quadrants):
+            reach = int(math.ceil(math.hypot(row_span.stop - row_span.start,
+                                             col_span.stop - col_span.start))) + 1
+            samples = np.take(flat, self.offsets[k * quarter:(k + 1) * quarter + 1, :reach] + base)
+            # Charge a wall's loss where a ray enters it
+            entering = np.subtract(samples[:, 1:], samples[:, :-1])
+            np.maximum(entering, 0, out=entering)
+            samples[:, 1:] = entering
+            crossed = np.cumsum(samples, axis=1, dtype=np.int16)
+            
+            window = (
+                slice(row_span.start - ap_row + rows - 1, row_span.stop - ap_row + rows - 1),
+                slice(col_span.start - ap_col + cols - 1, col_span.stop - ap_col + cols - 1)
+            )
+            # Cells on the quadrant edges (and the AP cell) fold onto its boundary rays
+            ray = np.minimum((self.angle[window] - k * quarter) % self.n_angles, quarter)
+            ray *= reach
+            ray += self.radius[window]
+            loss[row_span.start - r0:row_span.stop - r0, col_span.start - c0:col_span.stop - c0] = np.take(crossed, ray)
+        return loss
+
+
+def predict_coverage(shape, resolution, ap_x, ap_y, tx_dbm, freq_mhz, wall_index=None,
+                     meters_per_pixel=DEFAULT_METERS_PER_PIXEL, exponent=PATH_LOSS_EXPONENT):
+    # Combined received power (dBm) per cell from APs at known positions.
+    # APs are snapped to their cell so the distance term is a window into one
+    # precomputed offset table
+    rows, cols = shape
+    total_mw = np.zeros((rows, cols), dtype=np.float32)
+    if rows and cols and len(ap_x):
+        cell_m = resolution * meters_per_pixel
+        oy = np.arange(-(rows - 1), rows, dtype=np.float32)[:, None] * np.float32(cell_m)
+        ox = np.arange(-(cols - 1), cols, dtype=np.float32)[None, :] * np.float32(cell_m)
+        distance_gain = np.maximum(np.square(oy) + np.square(ox), np.float32(1.0))
+        np.power(distance_gain, np.float32(-exponent / 2), out=distance_gain)
+        wall_gain = np.power(10.0, -np.arange(256) / 10).astype(np.float32)
+        p0 = np.power(10.0, (np.asarray(tx_dbm) - reference_loss_db(np.asarray(freq_mhz))) / 10)
+        
+        for x, y, power in zip(ap_x, ap_y, p0):
+            row = min(max(int(y // resolution), 0), rows - 1)
+            col = min(max(int(x // resolution), 0), cols - 1)
+            contribution = distance_gain[rows - 1 - row:2 * rows - 1 - row, cols - 1 - col:2 * cols - 1 - col]
+            contribution = contribution * np.float32(power)
+            if wall_index is not None:
+                contribution *= np.take(wall_gain, np.minimum(wall_index.loss_from(row, col), 255))
+            total_mw += contribution
+            
+    np.maximum(total_mw, np.float32(NOISE_FLOOR_MW), out=total_mw)
+    return 10 * np.log10(total_mw)
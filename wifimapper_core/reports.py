@@ -0,0 +1,445 @@
+import contextlib
+import csv
+import datetime
+import io
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from .deadzones import DEAD_ZONE_DBM, label_regions
+from .metrics import timed
+from .placement import COVERAGE_THRESHOLD_DBM
+
+# Viridis sampled at nine evenly spaced points, interpolated linearly
+VIRIDIS_ANCHORS = np.array([
+    (68, 1, 84), (71, 44, 122), (59, 81, 139), (44, 113, 142), (33, 144, 141),
+    (39, 173, 129), (92, 200, 99), (170, 220, 50), (253, 231, 37)
+], dtype=np.float32)
+HEATMAP_LEVELS = (-100, 0)  # dBm range of the colour scale, as in the GUI colour bar
+
+
+def heatmap_colors(heatmap, levels=HEATMAP_LEVELS):
+    low, high = levels
+    scaled = np.clip((np.asarray(heatmap, dtype=np.float32) - low) / (high - low), 0, 1)
+    position = scaled * (len(VIRIDIS_ANCHORS) - 1)
+    lower = np.minimum(position.astype(np.int32), len(VIRIDIS_ANCHORS) - 2)
+    fraction = (position - lower)[..., None]
+    rgb = VIRIDIS_ANCHORS[lower] * (1 - fraction) + VIRIDIS_ANCHORS[lower + 1] * fraction
+    return rgb.astype(np.uint8)
+
+
+def render_heatmap_image(heatmap, floor_plan=None, alpha=0.6, levels=HEATMAP_LEVELS):
+    # PIL image of the heatmap, blended over the floor plan when given
+    from PIL import Image
+    image = Image.fromarray(heatmap_colors(heatmap, levels))
+    if floor_plan is None:
+        return image
+    image = image.resize(floor_plan.size, Image.Resampling.NEAREST)
+    return Image.blend(floor_plan.convert('RGB'), image, alpha)
+
+
+@timed("export_report", format="csv")
+def write_csv_report(file_name, networks):
+    with open(file_name, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["SSID", "BSSID", "Channel", "RSSI", "Security", "Frequency", "SNR"])
+        for network in networks:
+            writer.writerow([
+                network.ssid, network.bssid, network.channel,
+                network.rssi, network.security, f"{network.frequency} MHz",
+                network.snr
+            ])
+            
+            
+# PDF reports are drawn page by page: a new page starts as soon as the next
+# block does not fit, and heatmaps are subsampled to a fixed image size and
+# rendered one floor at a time. reportlab's Canvas still keeps every finished
+# page, and every image (compressed), until save(), so memory grows with the
+# length of the report, by about 20 KB per page of network table
+PDF_MARGIN = 50  # Points
+PDF_ROW_HEIGHT = 13
+PDF_IMAGE_PIXELS = 1000  # Longest side of an embedded heatmap image
+PDF_NETWORK_COLUMNS = (
+    # Header, x offset in points, cell text
+    ("SSID", 0, lambda n: n.ssid[:30]),
+    ("BSSID", 165, lambda n: n.bssid),
+    ("Ch", 270, lambda n: str(n.channel)),
+    ("RSSI", 300, lambda n: f"{n.rssi} dBm"),
+    ("SNR", 350, lambda n: f"{n.snr} dB"),
+    ("Band", 390, lambda n: n.band),
+    ("Security", 440, lambda n: str(n.security)[:14])
+)
+PDF_FLOOR_COLUMNS = ("Floor", "Mean", "Min", "Max", "P10", "Covered", "Dead", "Dead zones", "Largest")
+DEAD_ZONE_COLOR = np.array((255, 0, 0), dtype=np.float32)
+
+
+def network_statistics(networks):
+    # Summary of a scan from columnar arrays
+    rssi = np.fromiter((network.rssi for network in networks), dtype=np.float32, count=len(networks))
+    channels = np.fromiter((network.channel for network in networks), dtype=np.int32, count=len(networks))
+    bands, band_counts = np.unique([network.band for network in networks], return_counts=True)
+    security, security_counts = np.unique([str(network.security) for network in networks], return_counts=True)
+    busiest, busiest_counts = np.unique(channels, return_counts=True)
+    order = np.argsort(-busiest_counts, kind='stable')[:5]
+    return {
+        'count': len(networks),
+        'rssi_quartiles': np.percentile(rssi, [0, 25, 50, 75, 100]) if len(rssi) else None,
+        'bands': dict(zip(bands.tolist(), band_counts.tolist())),
+        'security': dict(zip(security.tolist(), security_counts.tolist())),
+        'busiest_channels': list(zip(busiest[order].tolist(), busiest_counts[order].tolist()))
+    }
+
+
+def floor_statistics(stack, covered_dbm=COVERAGE_THRESHOLD_DBM, dead_dbm=DEAD_ZONE_DBM):
+    # Per-floor coverage figures of a (floors, rows, cols) stack or a list
+    # of floor grids, one floor in memory at a time
+    floors = len(stack)
+    stats = {name: np.zeros(floors) for name in ('mean', 'min', 'max', 'p10', 'covered', 'dead', 'largest')}
+    stats['regions'] = np.zeros(floors, dtype=np.int64)
+    for index, grid in enumerate(stack):
+        grid = np.asarray(grid, dtype=np.float32)
+        stats['mean'][index] = grid.mean()
+        stats['min'][index] = grid.min()
+        stats['max'][index] = grid.max()
+        stats['p10'][index] = np.percentile(grid, 10)
+        stats['covered'][index] = np.count_nonzero(grid >= covered_dbm) / grid.size
+        labels, count = label_regions(grid < dead_dbm)
+        cells = np.bincount(labels.reshape(-1), minlength=count + 1)[1:]
+        stats['dead'][index] = cells.sum() / grid.size
+        stats['regions'][index] = count
+        stats['largest'][index] = cells.max(initial=0) / grid.size
+    return stats
+
+
+def render_report_image(heatmap, max_pixels=PDF_IMAGE_PIXELS, dead_dbm=DEAD_ZONE_DBM, alpha=0.6):
+    # Heatmap subsampled to at most max_pixels on its longest side, with
+    # dead zones tinted red
+    from PIL import Image
+    step = max(1, -(-max(heatmap.shape) // max_pixels))
+    grid = np.asarray(heatmap[::step, ::step], dtype=np.float32)
+    rgb = heatmap_colors(grid).astype(np.float32)
+    dead = grid < dead_dbm
+    rgb[dead] = rgb[dead] * (1 - alpha) + DEAD_ZONE_COLOR * alpha
+    return Image.fromarray(rgb.astype(np.uint8))
+
+
+@contextlib.contextmanager
+def binary_pdf_streams():
+    # reportlab ASCII85-encodes every stream unless told otherwise, in pure
+    # Python when its C accelerator is missing; binary streams are a fifth
+    # smaller and skip that pass
+    from reportlab import rl_config
+    previous = rl_config.useA85
+    rl_config.useA85 = 0
+    try:
+        yield
+    finally:
+        rl_config.useA85 = previous
+
+
+class PdfPages:
+    # Canvas wrapper that keeps a cursor and starts a new page whenever the
+    # next block does not fit
+    def __init__(self, file_name, title):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+        self.canvas = canvas.Canvas(file_name, pagesize=letter, pageCompression=1)
+        self.width, self.height = letter
+        self.title = title
+        self.page = 1
+        self.y = self.height - PDF_MARGIN
+        self.canvas.setFont("Helvetica", 9)
+        
+    def new_page(self):
+        self.footer()
+        self.canvas.showPage()
+        self.page += 1
+        self.y = self.height - PDF_MARGIN
+        self.canvas.setFont("Helvetica", 9)
+        
+    def footer(self):
+        self.canvas.setFont("Helvetica", 8)
+        self.canvas.drawString(PDF_MARGIN, PDF_MARGIN / 2, self.title)
+        self.canvas.drawRightString(self.width - PDF_MARGIN, PDF_MARGIN / 2, f"Page {self.page}")
+        
+    def fits(self, height):
+        return self.y - height >= PDF_MARGIN
+        
+    def reserve(self, height):
+        # True when a new page had to be started
+        if self.fits(height):
+            return False
+        self.new_page()
+        return True
+        
+    def heading(self, text, size=13):
+        self.reserve(size + 3 * PDF_ROW_HEIGHT)
+        self.y -= size
+        self.canvas.setFont("Helvetica-Bold", size)
+        self.canvas.drawString(PDF_MARGIN, self.y, text)
+        self.canvas.setFont("Helvetica", 9)
+        self.y -= PDF_ROW_HEIGHT
+        
+    def text(self, text):
+        self.reserve(PDF_ROW_HEIGHT)
+        self.y -= PDF_ROW_HEIGHT
+        self.canvas.drawString(PDF_MARGIN, self.y, text)
+        
+    def row(self, cells, bold=False):
+        # cells: (x offset, text) pairs
+        self.y -= PDF_ROW_HEIGHT
+        if bold:
+            self.canvas.setFont("Helvetica-Bold", 9)
+        for x, text in cells:
+            self.canvas.drawString(PDF_MARGIN + x, self.y, text)
+        if bold:
+            self.canvas.setFont("Helvetica", 9)
+            
+    def table(self, header, rows):
+        # The header is repeated at the top of every page the rows run onto
+        self.reserve(3 * PDF_ROW_HEIGHT)
+        self.row(header, bold=True)
+        for cells in rows:
+            if self.reserve(PDF_ROW_HEIGHT):
+                self.row(header, bold=True)
+            self.row(cells)
+        self.y -= PDF_ROW_HEIGHT / 2
+            
+    def image(self, image, caption, max_height):
+        from reportlab.lib.utils import ImageReader
+        width = self.width - 2 * PDF_MARGIN
+        height = min(max_height, width * image.height / image.width)
+        width = height * image.width / image.height
+        self.reserve(height + 2 * PDF_ROW_HEIGHT)
+        self.text(caption)
+        self.y -= height + 4
+        self.canvas.drawImage(ImageReader(image), PDF_MARGIN, self.y, width, height)
+        self.y -= PDF_ROW_HEIGHT / 2
+        
+    def close(self):
+        self.footer()
+        self.canvas.save()
+        
+        
+@timed("export_report", format="pdf")
+def write_pdf_report(file_name, networks, heatmap=None, floor_names=None):
+    # `heatmap` is one floor's grid, a (floors, rows, cols) stack or a list
+    # of floor grids, which may differ in size
+    with binary_pdf_streams():
+        pages = PdfPages(file_name, "WiFiMapper Network Analysis Report")
+        pages.heading("WiFiMapper Network Analysis Report", size=16)
+        pages.text(f"Generated: {datetime.datetime.now():%Y-%m-%d %H:%M:%S}")
+        
+        summary = network_statistics(networks)
+        pages.heading("Networks")
+        pages.text(f"Networks detected: {summary['count']}")
+        if summary['rssi_quartiles'] is not None:
+            low, q1, median, q3, high = summary['rssi_quartiles']
+            pages.text(f"RSSI: min {low:.0f} / Q1 {q1:.0f} / median {median:.0f} / Q3 {q3:.0f} / max {high:.0f} dBm")
+            pages.text("Bands: " + ", ".join(f"{band} {count}" for band, count in summary['bands'].items()))
+            pages.text("Security: " + ", ".join(f"{name} {count}" for name, count in summary['security'].items()))
+            pages.text("Busiest channels: " + ", ".join(
+                f"{channel} ({count})" for channel, count in summary['busiest_channels']
+            ))
+        
+        stack = [heatmap] if isinstance(heatmap, np.ndarray) and heatmap.ndim == 2 else heatmap
+        if stack is not None and len(stack) and all(grid.size for grid in stack):
+            names = floor_names or ([f"Floor {i + 1}" for i in range(len(stack))] if len(stack) > 1 else ["Heatmap"])
+            stats = floor_statistics(stack)
+            pages.heading("Coverage")
+            pages.text(f"Covered: share of the area at or above {COVERAGE_THRESHOLD_DBM:.0f} dBm. "
+                       f"Dead: below {DEAD_ZONE_DBM:.0f} dBm.")
+            offsets = (0, 90, 135, 180, 225, 270, 325, 375, 440)
+            pages.table(
+                list(zip(offsets, PDF_FLOOR_COLUMNS)),
+                (
+                    list(zip(offsets, (
+                        names[i][:16], f"{stats['mean'][i]:.1f}", f"{stats['min'][i]:.1f}",
+                        f"{stats['max'][i]:.1f}", f"{stats['p10'][i]:.1f}", f"{stats['covered'][i] * 100:.1f}%",
+                        f"{stats['dead'][i] * 100:.1f}%", str(stats['regions'][i]),
+                        f"{stats['largest'][i] * 100:.1f}%"
+                    )))
+                    for i in range(len(stack))
+                )
+            )
+        
+            pages.heading("Heatmaps")
+            pages.text(f"Signal from {HEATMAP_LEVELS[0]} to {HEATMAP_LEVELS[1]} dBm (viridis); "
+                       f"dead zones tinted red")
+            for name, grid in zip(names, stack):
+                # Rendered one floor at a time; the canvas keeps only the compressed image
+                pages.image(render_report_image(grid), name, max_height=(pages.height - 2 * PDF_MARGIN) / 2 - 40)
+        
+        pages.heading("Network Details")
+        pages.table(
+            [(x, header) for header, x, _ in PDF_NETWORK_COLUMNS],
+            ([(x, cell(network)) for _, x, cell in PDF_NETWORK_COLUMNS] for network in networks)
+        )
+        pages.close()
+
+
+# KMZ reports: networks as placemarks at their plan positions, and the
+# heatmap as a super-overlay, a pyramid of small image tiles where each tile
+# is only fetched once it covers enough of the screen (Region/Lod), so large
+# sites open at a coarse level and refine as Google Earth zooms in
+KMZ_TILE_SIZE = 256
+KMZ_MIN_LOD_PIXELS = 128  # A tile is shown once its region covers this many screen pixels
+KMZ_OVERLAY_COLOR = "b3ffffff"  # aabbggrr: 70% opaque
+KML_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<kml xmlns="http://www.opengis.net/kml/2.2" xmlns:gx="http://www.google.com/kml/ext/2.2">\n')
+
+
+def network_positions(networks, ap_positions=None, survey_points=None):
+    # Plan position per BSSID: where its AP was placed, otherwise the survey
+    # point with its strongest reading. Networks never located are left out
+    positions = survey_points.strongest_positions() if survey_points is not None else {}
+    positions.update(ap_positions or {})
+    return {network.bssid: positions[network.bssid] for network in networks if network.bssid in positions}
+
+
+def superoverlay_levels(shape, tile_size=KMZ_TILE_SIZE):
+    # (width, height) of the image at each level, coarsest (one tile) first
+    rows, cols = shape
+    levels = [(cols, rows)]
+    while max(levels[0]) > tile_size:
+        width, height = levels[0]
+        levels.insert(0, ((width + 1) // 2, (height + 1) // 2))
+    return levels
+
+
+def _kml_box(corners):
+    # Bounding LatLonAltBox of (longitude, latitude) corner arrays
+    longitude, latitude = corners
+    return (f"<LatLonAltBox><north>{latitude.max():.8f}</north><south>{latitude.min():.8f}</south>"
+            f"<east>{longitude.max():.8f}</east><west>{longitude.min():.8f}</west></LatLonAltBox>")
+
+
+def _kml_region(corners, max_lod_pixels=-1):
+    return (f"<Region>{_kml_box(corners)}<Lod><minLodPixels>{KMZ_MIN_LOD_PIXELS}</minLodPixels>"
+            f"<maxLodPixels>{max_lod_pixels}</maxLodPixels></Lod></Region>")
+
+
+class SuperOverlay:
+    # Tile geometry of a heatmap grid laid over a georeferenced plan
+    def __init__(self, shape, resolution, transform, tile_size=KMZ_TILE_SIZE):
+        self.shape = shape
+        self.resolution = resolution
+        self.transform = transform
+        self.tile_size = tile_size
+        self.levels = superoverlay_levels(shape, tile_size)
+        
+    def tile_grid(self, level):
+        width, height = self.levels[level]
+        return -(-width // self.tile_size), -(-height // self.tile_size)
+        
+    def corners(self, level, x, y):
+        # Lower-left, lower-right, upper-right, upper-left of a tile, as
+        # (longitude, latitude) arrays, the order gx:LatLonQuad expects
+        rows, cols = self.shape
+        scale = 2 ** (len(self.levels) - 1 - level) * self.tile_size
+        left, right = x * scale, min((x + 1) * scale, cols)
+        top, bottom = y * scale, min((y + 1) * scale, rows)
+        xs = np.array([left, right, right, left], dtype=np.float64) * self.resolution
+        ys = np.array([bottom, bottom, top, top], dtype=np.float64) * self.resolution
+        return self.transform.to_geo(xs, ys)
+        
+    def children(self, level, x, y):
+        if level + 1 == len(self.levels):
+            return []
+        columns, rows = self.tile_grid(level + 1)
+        return [(2 * x + dx, 2 * y + dy) for dy in (0, 1) for dx in (0, 1)
+                if 2 * x + dx < columns and 2 * y + dy < rows]
+        
+    def tile_kml(self, level, x, y):
+        corners = self.corners(level, x, y)
+        leaf = level + 1 == len(self.levels)
+        quad = " ".join(f"{lon:.8f},{lat:.8f}" for lon, lat in zip(*corners))
+        links = "".join(
+            f"<NetworkLink><name>{level + 1}/{cx}/{cy}</name>"
+            f"{_kml_region(self.corners(level + 1, cx, cy))}"
+            f"<Link><href>../../{level + 1}/{cx}/{cy}.kml</href><viewRefreshMode>onRegion</viewRefreshMode></Link>"
+            f"</NetworkLink>\n"
+            for cx, cy in self.children(level, x, y)
+        )
+        return (
+            f"{KML_HEADER}<Document><name>{level}/{x}/{y}</name>\n"
+            f"{_kml_region(corners, -1 if leaf else 2 * self.tile_size)}\n"
+            f"<GroundOverlay><drawOrder>{level}</drawOrder><color>{KMZ_OVERLAY_COLOR}</color>"
+            f"<Icon><href>{y}.png</href></Icon>"
+            f"<gx:LatLonQuad><coordinates>{quad}</coordinates></gx:LatLonQuad></GroundOverlay>\n"
+            f"{links}</Document></kml>\n"
+        )
+        
+    def root_link(self):
+        return (
+            f"<NetworkLink><name>Heatmap</name>{_kml_region(self.corners(0, 0, 0))}"
+            f"<Link><href>tiles/0/0/0.kml</href><viewRefreshMode>onRegion</viewRefreshMode></Link>"
+            f"</NetworkLink>\n"
+        )
+        
+    def write_tiles(self, kmz, heatmap):
+        # Finest level first; each coarser level is the one below halved, so
+        # at most two levels are in memory
+        from PIL import Image
+        image = Image.fromarray(heatmap_colors(heatmap))
+        for level in range(len(self.levels) - 1, -1, -1):
+            if image.size != self.levels[level]:
+                image = image.resize(self.levels[level], Image.Resampling.BOX)
+            columns, rows = self.tile_grid(level)
+            for y in range(rows):
+                for x in range(columns):
+                    tile = image.crop((x * self.tile_size, y * self.tile_size,
+                                       min((x + 1) * self.tile_size, image.width),
+                                       min((y + 1) * self.tile_size, image.height)))
+                    buffer = io.BytesIO()
+                    tile.save(buffer, format='PNG', compress_level=1)
+                    # PNG is compressed already
+                    kmz.writestr(f"tiles/{level}/{x}/{y}.png", buffer.getvalue(), zipfile.ZIP_STORED)
+                    kmz.writestr(f"tiles/{level}/{x}/{y}.kml", self.tile_kml(level, x, y))
+                    
+                    
+def _network_placemark(network, transform, position):
+    longitude, latitude = transform.to_geo(*position)
+    description = (f"BSSID: {network.bssid}\nRSSI: {network.rssi} dBm\nChannel: {network.channel}\n"
+                   f"Band: {network.band}\nSNR: {network.snr} dB\nSecurity: {network.security}")
+    return (f"<Placemark><name>{escape(network.ssid or network.bssid)}</name>"
+            f"<description>{escape(description)}</description>"
+            f"<Point><coordinates>{float(longitude):.8f},{float(latitude):.8f},0</coordinates></Point>"
+            f"</Placemark>\n")
+
+
+@timed("export_report", format="kmz")
+def write_kmz_report(file_name, networks, heatmap=None, transform=None, resolution=None,
+                     positions=None, tile_size=KMZ_TILE_SIZE):
+    # `transform` maps plan pixels to longitude/latitude (see georef), and
+    # `resolution` is the plan pixels per heatmap cell
+    if transform is None:
+        raise ValueError("KMZ export needs a georeferenced floor plan")
+    positions = positions or {}
+    located = [network for network in networks if network.bssid in positions]
+    overlay = None
+    if heatmap is not None and heatmap.size and resolution:
+        overlay = SuperOverlay(heatmap.shape, resolution, transform, tile_size)
+        
+    document = [
+        f"{KML_HEADER}<Document><name>WiFiMapper Network Analysis Report</name>\n",
+        f"<description>{len(located)} of {len(networks)} networks located; generated "
+        f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S}</description>\n",
+        overlay.root_link() if overlay is not None else "",
+        "<Folder><name>Networks</name>\n",
+        *(_network_placemark(network, transform, positions[network.bssid]) for network in located),
+        "</Folder>\n</Document></kml>\n"
+    ]
+    with zipfile.ZipFile(file_name, 'w', zipfile.ZIP_DEFLATED) as kmz:
+        # Google Earth opens the first .kml entry of the archive
+        kmz.writestr("doc.kml", "".join(document))
+        if overlay is not None:
+            overlay.write_tiles(kmz, heatmap)
+            
+            
+REPORT_WRITERS = {
+    '.pdf': write_pdf_report,
+    '.csv': write_csv_report,
+    '.kmz': write_kmz_report
+}
@@ -0,0 +1,219 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+try:
+    import pywifi
+    from pywifi import const
+except ImportError:
+    pywifi = None
+
+from .metrics import span
+from .models import BAND_RANGES_MHZ, ScanRecord, band_of, channel_from_frequency
+
+
+IFACE_SCANNING = const.IFACE_SCANNING if pywifi else 1
+# Backend spec such as "simulated:bssids=500,churn=0.1,scan_latency=0.5"
+SCANNER_BACKEND_ENV = "WIFIMAPPER_BACKEND"
+DEFAULT_SCANNER_BACKEND = "pywifi"
+
+
+class ScanTimingPolicy:
+    # Polls scan results with backoff instead of sleeping a fixed time, and
+    # learns a typical scan duration per interface to time the first poll
+    def __init__(self, min_wait=0.3, max_wait=8.0, poll_interval=0.1,
+                 backoff=1.5, max_poll_interval=1.0, stable_polls=2, learning_rate=0.3,
+                 unlearned_wait=4.0):
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        # Before a duration is learned, unchanged results are accepted after
+        # this long; Windows requires drivers to finish a scan within 4 s
+        self.unlearned_wait = unlearned_wait
+        self.poll_interval = poll_interval
+        self.backoff = backoff
+        self.max_poll_interval = max_poll_interval
+        self.stable_polls = stable_polls
+        self.learning_rate = learning_rate
+        self.typical = {}  # Interface name -> smoothed scan duration (s)
+        self.latency = {}  # Interface name -> last measured scan duration (s)
+        
+    def first_poll_delay(self, name):
+        typical = self.typical.get(name)
+        if typical is None:
+            return self.min_wait
+        return min(max(self.min_wait, 0.8 * typical), self.max_wait)
+        
+    def record(self, name, elapsed):
+        self.latency[name] = elapsed
+        typical = self.typical.get(name)
+        self.typical[name] = elapsed if typical is None else (
+            (1 - self.learning_rate) * typical + self.learning_rate * elapsed
+        )
+        
+    def wait_for_results(self, iface):
+        # Drivers keep serving the previous (cached) results while a scan runs.
+        # The scan is complete when the interface leaves the scanning state,
+        # or, for drivers that do not report it, once the results have changed
+        # from the cached ones and then held steady for stable_polls polls.
+        # Results that never change (a quiet site) are accepted once they
+        # have held for stable_polls polls past the learned scan duration
+        name = interface_name(iface)
+        baseline = scan_fingerprint(iface.scan_results())
+        settle = self.typical.get(name, self.unlearned_wait)
+        start = time.monotonic()
+        iface.scan()
+        time.sleep(self.first_poll_delay(name))
+        
+        interval = self.poll_interval
+        seen_scanning = False
+        changed = False
+        completed = False
+        previous = None
+        stable = 0
+        settled_polls = 0
+        while True:
+            scanning = interface_scanning(iface)
+            seen_scanning = seen_scanning or scanning
+            profiles = iface.scan_results()
+            elapsed = time.monotonic() - start
+            if seen_scanning:
+                if not scanning:
+                    completed = True
+                    break
+            else:
+                fingerprint = scan_fingerprint(profiles)
+                if not changed and fingerprint != baseline:
+                    changed = True
+                    interval = self.poll_interval
+                stable = stable + 1 if fingerprint == previous else 1
+                previous = fingerprint
+                if changed and stable >= self.stable_polls:
+                    completed = True
+                    break
+                if not changed and elapsed >= settle:
+                    settled_polls += 1
+                    if settled_polls >= self.stable_polls:
+                        break
+                    if settled_polls == 1:
+                        interval = self.poll_interval
+            if elapsed >= self.max_wait:
+                break
+            time.sleep(min(interval, max(0.0, self.max_wait - elapsed)))
+            interval = min(interval * self.backoff, self.max_poll_interval)
+            
+        # Only observed completions teach the typical duration; timeouts and
+        # unchanged results say nothing about how long a scan takes
+        if completed:
+            self.record(name, elapsed)
+        else:
+            self.latency[name] = elapsed
+        return profiles
+
+
+def scan_fingerprint(profiles):
+    return frozenset((profile.bssid, profile.signal) for profile in profiles)
+
+
+def interface_name(iface):
+    try:
+        return iface.name()
+    except Exception:
+        return str(id(iface))
+
+
+def interface_scanning(iface):
+    # Drivers that cannot report their state are treated as idle, so the
+    # result stability check alone decides when the scan is complete
+    try:
+        return iface.status() == IFACE_SCANNING
+    except Exception:
+        return False
+
+
+def scan_interface(iface, band, policy=None):
+    with span("scan_interface", interface=interface_name(iface)):
+        profiles = (policy or ScanTimingPolicy()).wait_for_results(iface)
+    low, high = BAND_RANGES_MHZ.get(band, (0, float('inf')))
+    networks = []
+    for profile in profiles:
+        frequency = profile.freq / 1000000  # Convert Hz to MHz
+        if not (low <= frequency <= high):
+            continue
+            
+        snr = profile.signal - profile.noise if hasattr(profile, 'noise') and profile.noise else 0
+        # pywifi reports auth as an AUTH_ALG_* integer
+        security = str(profile.auth) if hasattr(profile, 'auth') else "Open"
+        networks.append(ScanRecord(
+            profile.ssid or "Hidden", profile.bssid,
+            getattr(profile, 'channel', 0) or channel_from_frequency(frequency),
+            profile.signal, security, frequency, band_of(frequency), snr
+        ))
+    return networks
+
+
+def _pywifi_backend():
+    # None when pywifi is not installed
+    return pywifi.PyWiFi() if pywifi else None
+
+
+def _simulated_backend(**options):
+    from .simulated import SimulatedWiFi
+    return SimulatedWiFi(**options)
+
+
+# Backends return an object with pywifi's interface: interfaces() giving
+# objects with name(), scan(), scan_results() and optionally status()
+SCANNER_BACKENDS = {
+    "pywifi": _pywifi_backend,
+    "simulated": _simulated_backend
+}
+
+
+def parse_backend_spec(spec):
+    # "name:key=value,..." -> (name, options); numeric values are converted
+    name, _, option_text = spec.partition(":")
+    options = {}
+    for item in filter(None, option_text.split(",")):
+        key, _, value = item.partition("=")
+        for convert in (int, float):
+            try:
+                value = convert(value)
+                break
+            except ValueError:
+                pass
+        options[key.strip()] = value
+    return name.strip(), options
+
+
+def open_wifi(spec=None):
+    # Spec from the argument, else $WIFIMAPPER_BACKEND, else pywifi
+    name, options = parse_backend_spec(
+        spec or os.environ.get(SCANNER_BACKEND_ENV) or DEFAULT_SCANNER_BACKEND
+    )
+    backend = SCANNER_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown scanner backend: {name}")
+    return backend(**options)
+
+
+def scan_all(wifi, band, policy=None, progress=None, on_error=None):
+    # Scans every interface concurrently; progress(done, total) after each
+    # interface and on_error(index, message) for interfaces that failed
+    interfaces = wifi.interfaces()
+    if not interfaces:
+        raise RuntimeError("No wireless interfaces found")
+    policy = policy or ScanTimingPolicy()
+    networks = []
+    with span("scan_networks"), ThreadPoolExecutor(max_workers=len(interfaces)) as pool:
+        futures = {
+            pool.submit(scan_interface, iface, band, policy): i
+            for i, iface in enumerate(interfaces)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                networks.extend(future.result())
+            except Exception as e:
+                if on_error is not None:
+                    on_error(futures[future], str(e))
+            if progress is not None:
+                progress(done, len(interfaces))
+    return networks
@@ -0,0 +1,96 @@
+import random
+import time
+
+# Deterministic stand-in for pywifi, used by the "simulated" scanner backend
+# for demos, benchmarks and machines without a wireless interface. Results
+# depend only on the seed and the number of scans, never on timing
+IFACE_DISCONNECTED = 0
+IFACE_SCANNING = 1
+SIMULATED_FREQUENCIES_MHZ = (2412, 2437, 2462, 5180, 5200, 5500, 5745, 5955, 6115)
+
+
+class SimulatedProfile:
+    __slots__ = ('ssid', 'bssid', 'freq', 'signal', 'noise', 'auth')
+    
+    def __init__(self, ssid, bssid, freq_mhz, signal, noise=-95, auth="WPA2"):
+        self.ssid = ssid
+        self.bssid = bssid
+        self.freq = int(freq_mhz * 1000000)  # pywifi reports Hz
+        self.signal = signal
+        self.noise = noise
+        self.auth = auth
+
+
+class SimulatedInterface:
+    # Mirrors pywifi.iface.Interface. scan() returns immediately; until
+    # scan_latency has passed, scan_results() keeps returning the previous
+    # (cached) results, as real drivers do. Each scan replaces `churn` of
+    # the BSSIDs with new ones and moves every RSSI by up to `jitter` dB
+    def __init__(self, name="wlan0", bssids=40, churn=0.0, scan_latency=2.0, seed=0,
+                 reports_status=True, jitter=3):
+        self._name = name
+        self.churn = churn
+        self.jitter = jitter
+        self.scan_latency = scan_latency
+        self.reports_status = reports_status
+        self.scan_calls = 0
+        self._seed = seed
+        self._rng = random.Random(seed)
+        self._next_id = 0
+        self._churn_due = 0.0
+        self._networks = [self._new_network() for _ in range(bssids)]
+        self._scan_started = None
+        self._cached = []
+        self._pending = []
+        
+    def _new_network(self):
+        i = self._next_id
+        self._next_id += 1
+        return (f"Net-{self._seed}-{i}", f"02:{self._seed % 256:02x}:{i >> 24 & 255:02x}:"
+                f"{i >> 16 & 255:02x}:{i >> 8 & 255:02x}:{i & 255:02x}",
+                self._rng.choice(SIMULATED_FREQUENCIES_MHZ), self._rng.randint(-90, -35))
+                
+    def name(self):
+        return self._name
+        
+    def scanning(self):
+        return (self._scan_started is not None
+                and time.monotonic() - self._scan_started < self.scan_latency)
+                
+    def status(self):
+        if not self.reports_status:
+            raise NotImplementedError("driver does not report interface state")
+        return IFACE_SCANNING if self.scanning() else IFACE_DISCONNECTED
+        
+    def scan(self):
+        self.scan_calls += 1
+        if self._scan_started is not None and not self.scanning():
+            self._cached = self._pending
+        self._scan_started = time.monotonic()
+        
+        self._churn_due += self.churn * len(self._networks)
+        replaced = min(int(self._churn_due), len(self._networks))
+        self._churn_due -= replaced
+        for i in self._rng.sample(range(len(self._networks)), replaced):
+            self._networks[i] = self._new_network()
+        randint = self._rng.randint
+        self._pending = [
+            SimulatedProfile(ssid, bssid, freq, signal + randint(-self.jitter, self.jitter))
+            for ssid, bssid, freq, signal in self._networks
+        ]
+        
+    def scan_results(self):
+        if self._scan_started is None or self.scanning():
+            return list(self._cached)
+        return list(self._pending)
+
+
+class SimulatedWiFi:
+    # Mirrors pywifi.PyWiFi
+    def __init__(self, interfaces=1, seed=0, **options):
+        self._interfaces = [
+            SimulatedInterface(name=f"sim{i}", seed=seed + i, **options) for i in range(interfaces)
+        ]
+        
+    def interfaces(self):
+        return self._interfaces
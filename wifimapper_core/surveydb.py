@@ -0,0 +1,329 @@
+import math
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from .history import ScanHistory
+from .interpolation import SurveyPoints
+from .metrics import span, timed
+from .models import ScanRecord
+
+# Durable survey storage. Scans are queued by append_scan() and written by a
+# background thread, which commits everything queued so far in one
+# transaction; the database is in WAL mode, so queries on the opening
+# thread's connection never wait for the writer. One process writes at a time
+SURVEY_DB_BATCH = 256  # Queued scans and survey points per transaction at most
+ROLLUP_SECONDS = 60  # Bucket width of the per-channel RSSI histograms
+
+SURVEY_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS networks (
+    id INTEGER PRIMARY KEY,
+    bssid TEXT NOT NULL UNIQUE,
+    ssid TEXT NOT NULL,
+    security TEXT NOT NULL,
+    frequency REAL NOT NULL,
+    band TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    scan INTEGER NOT NULL,
+    network INTEGER NOT NULL REFERENCES networks (id),
+    timestamp REAL NOT NULL,
+    rssi INTEGER NOT NULL,
+    snr INTEGER NOT NULL,
+    channel INTEGER NOT NULL,
+    PRIMARY KEY (scan, network)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rssi_rollup (
+    bucket INTEGER NOT NULL,
+    channel INTEGER NOT NULL,
+    rssi INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (bucket, channel, rssi)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS points (
+    id INTEGER PRIMARY KEY,
+    scan INTEGER NOT NULL,
+    floor INTEGER NOT NULL,
+    x REAL NOT NULL,
+    y REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_network_time ON samples (network, timestamp);
+CREATE INDEX IF NOT EXISTS samples_time ON samples (timestamp, channel, rssi);
+CREATE INDEX IF NOT EXISTS samples_scan_rssi ON samples (scan, rssi);
+CREATE INDEX IF NOT EXISTS points_position ON points (floor, x, y);
+"""
+
+
+def connect(file_name):
+    connection = sqlite3.connect(file_name, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL only syncs at checkpoints: a power cut can lose the
+    # last transactions but never corrupts the database
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def histogram_percentiles(values, counts, percentiles):
+    # np.percentile (linear) of a sample given as sorted distinct values and
+    # their counts; the i-th smallest sample is the first value whose
+    # cumulative count exceeds i
+    cumulative = np.cumsum(counts)
+    rank = (cumulative[-1] - 1) * np.asarray(percentiles, dtype=np.float64) / 100
+    below = values[np.searchsorted(cumulative, np.floor(rank), side='right')]
+    above = values[np.searchsorted(cumulative, np.ceil(rank), side='right')]
+    return below + (above - below) * (rank - np.floor(rank))
+
+
+class SurveyDatabase:
+    def __init__(self, file_name, batch=SURVEY_DB_BATCH):
+        self.file_name = file_name
+        self.batch = batch
+        self.connection = connect(file_name)  # Queries; only usable on this thread
+        with self.connection:
+            self.connection.executescript(SURVEY_DB_SCHEMA)
+        # Scan numbers are handed out here so that survey points can refer
+        # to a scan before the writer has stored it
+        self.last_scan = self.connection.execute(
+            "SELECT max(scan) FROM (SELECT max(scan) AS scan FROM samples UNION ALL SELECT max(scan) FROM points)"
+        ).fetchone()[0]
+        self.queue = queue.Queue()
+        self.error = None  # First failed write since the last flush() or take_error()
+        self.writer = threading.Thread(target=self._write_loop, name="survey-db-writer", daemon=True)
+        self.writer.start()
+        
+    def append_scan(self, networks, timestamp=None):
+        # Returns the scan number at once; the write happens in the background
+        self.last_scan = (self.last_scan or 0) + 1
+        self.queue.put(('scan', self.last_scan, time.time() if timestamp is None else timestamp, list(networks)))
+        return self.last_scan
+        
+    def add_point(self, x, y, floor=0, scan=None):
+        # Pins a scan (by default the last one) to a floor plan position
+        scan = self.last_scan if scan is None else scan
+        if scan is None:
+            raise ValueError("No scan has been recorded yet")
+        self.queue.put(('point', scan, floor, float(x), float(y)))
+        
+    def flush(self):
+        # Waits until everything queued is committed
+        self.queue.join()
+        error = self.take_error()
+        if error is not None:
+            raise error
+        
+    def take_error(self):
+        error, self.error = self.error, None
+        return error
+        
+    def close(self):
+        # Writes whatever is still queued first
+        self.queue.put(None)
+        self.writer.join()
+        self.connection.close()
+        error = self.take_error()
+        if error is not None:
+            raise error
+        
+    def _write_loop(self):
+        # Never dies on an error: it is kept for flush() and close() to raise,
+        # and the loop goes on so that they don't wait forever
+        connection = None
+        networks = None
+        while True:
+            items = [self.queue.get()]
+            while items[-1] is not None and len(items) < self.batch:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if connection is None:
+                    connection = connect(self.file_name)
+                if networks is None:
+                    networks = self._load_networks(connection)
+                with span("survey_db_write"):
+                    self._write(connection, networks, [item for item in items if item is not None])
+            except Exception as e:
+                # The transaction was rolled back, and with it any new networks
+                networks = None
+                self.error = self.error or e
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+            if items[-1] is None:
+                break
+        if connection is not None:
+            connection.close()
+        
+    @staticmethod
+    def _load_networks(connection):
+        # BSSID -> (id, (ssid, security, frequency, band)) as stored
+        return {row[1]: (row[0], tuple(row[2:])) for row in connection.execute(
+            "SELECT id, bssid, ssid, security, frequency, band FROM networks"
+        )}
+        
+    def _write(self, connection, networks, items):
+        samples = []
+        points = []
+        rollup = Counter()
+        with connection:
+            for kind, *fields in items:
+                if kind == 'point':
+                    points.append(fields)
+                    continue
+                scan, timestamp, records = fields
+                bucket = int(timestamp // ROLLUP_SECONDS)
+                # A BSSID reported twice in one scan keeps its last reading
+                for network in {network.bssid: network for network in records}.values():
+                    details = (network.ssid, str(network.security), float(network.frequency), network.band)
+                    known = networks.get(network.bssid)
+                    if known is None:
+                        network_id = connection.execute(
+                            "INSERT INTO networks (bssid, ssid, security, frequency, band) VALUES (?, ?, ?, ?, ?)",
+                            (network.bssid, *details)
+                        ).lastrowid
+                        networks[network.bssid] = (network_id, details)
+                    else:
+                        network_id = known[0]
+                        if known[1] != details:
+                            connection.execute(
+                                "UPDATE networks SET ssid = ?, security = ?, frequency = ?, band = ? WHERE id = ?",
+                                (*details, network_id)
+                            )
+                            networks[network.bssid] = (network_id, details)
+                    samples.append((scan, network_id, timestamp, network.rssi, network.snr, network.channel))
+                    rollup[bucket, network.channel, network.rssi] += 1
+            connection.executemany("INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)", samples)
+            connection.executemany(
+                "INSERT INTO rssi_rollup VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (bucket, channel, rssi) DO UPDATE SET count = count + excluded.count",
+                [(*key, count) for key, count in rollup.items()]
+            )
+            connection.executemany("INSERT INTO points (scan, floor, x, y) VALUES (?, ?, ?, ?)", points)
+        
+    def summary(self):
+        row = self.connection.execute(
+            "SELECT count(*), count(DISTINCT scan), min(timestamp), max(timestamp) FROM samples"
+        ).fetchone()
+        return {
+            'networks': self.connection.execute("SELECT count(*) FROM networks").fetchone()[0],
+            'samples': row[0], 'scans': row[1], 'first': row[2], 'last': row[3],
+            'points': self.connection.execute("SELECT count(*) FROM points").fetchone()[0]
+        }
+        
+    @timed("survey_db_query", query="latest_scan")
+    def latest_scan(self):
+        # ScanRecords of the most recent stored scan
+        return [ScanRecord(*row) for row in self.connection.execute(
+            "SELECT n.ssid, n.bssid, s.channel, s.rssi, n.security, n.frequency, n.band, s.snr "
+            "FROM samples s JOIN networks n ON n.id = s.network "
+            "WHERE s.scan = (SELECT max(scan) FROM samples)"
+        )]
+        
+    @timed("survey_db_query", query="strongest_per_point")
+    def strongest_per_point(self, floor=None):
+        # (x, y, bssid, ssid, rssi) per survey point. Each point's strongest
+        # sample is the last entry of its scan in the (scan, rssi) index, so
+        # the scan's other samples are never read
+        where = "WHERE p.floor = ? " if floor is not None else ""
+        return self.connection.execute(
+            "SELECT p.x, p.y, n.bssid, n.ssid, s.rssi FROM points p "
+            "JOIN samples s ON s.scan = p.scan AND s.network = "
+            "(SELECT network FROM samples WHERE scan = p.scan ORDER BY rssi DESC LIMIT 1) "
+            f"JOIN networks n ON n.id = s.network {where}ORDER BY p.id", () if floor is None else (floor,)
+        ).fetchall()
+        
+    @timed("survey_db_query", query="channel_percentiles")
+    def channel_percentiles(self, window=3600, percentiles=(10, 50, 90), now=None):
+        # channel -> RSSI statistics over the last `window` seconds, computed
+        # from a per-channel RSSI histogram rather than the samples: whole
+        # buckets come from the rollup table, the samples before the first
+        # whole bucket from the (timestamp, channel, rssi) index
+        since = (time.time() if now is None else now) - window
+        first_bucket = math.ceil(since / ROLLUP_SECONDS)
+        rows = np.array(self.connection.execute(
+            "SELECT channel, rssi, sum(count) FROM ("
+            "SELECT channel, rssi, count FROM rssi_rollup WHERE bucket >= ? UNION ALL "
+            "SELECT channel, rssi, 1 FROM samples WHERE timestamp >= ? AND timestamp < ?"
+            ") GROUP BY channel, rssi ORDER BY channel, rssi",
+            (first_bucket, since, first_bucket * ROLLUP_SECONDS)
+        ).fetchall(), dtype=np.float64).reshape(-1, 3)
+        result = {}
+        bounds = np.flatnonzero(np.diff(rows[:, 0])) + 1
+        for group in np.split(rows, bounds) if len(rows) else ():
+            values, counts = group[:, 1], group[:, 2]
+            stats = {
+                'count': int(counts.sum()),
+                'min': float(values[0]),
+                'mean': float((values * counts).sum() / counts.sum()),
+                'max': float(values[-1])
+            }
+            for p, value in zip(percentiles, histogram_percentiles(values, counts, percentiles)):
+                stats[f'p{p}'] = float(value)
+            result[int(group[0, 0])] = stats
+        return result
+        
+    @timed("survey_db_query", query="samples")
+    def samples(self, bssid, window=None, now=None):
+        # Same columns as ScanHistory.samples, from the (network, timestamp) index
+        since = float('-inf') if window is None else (time.time() if now is None else now) - window
+        rows = self.connection.execute(
+            "SELECT s.timestamp, s.rssi, s.snr, s.channel FROM samples s JOIN networks n ON n.id = s.network "
+            "WHERE n.bssid = ? AND s.timestamp >= ? ORDER BY s.timestamp", (bssid, since)
+        ).fetchall()
+        if not rows:
+            return None
+        timestamp, rssi, snr, channel = zip(*rows)
+        return {
+            'timestamp': np.array(timestamp, dtype=np.float64),
+            'rssi': np.array(rssi, dtype=np.float32),
+            'snr': np.array(snr, dtype=np.float32),
+            'channel': np.array(channel, dtype=np.int16)
+        }
+        
+    @timed("survey_db_query", query="history")
+    def history(self, retention=8 * 3600, capacity=8192, now=None):
+        # The last `retention` seconds as an in-memory ScanHistory
+        since = (time.time() if now is None else now) - retention
+        ids, bssids, ssids = [], [], []
+        for network_id, bssid, ssid in self.connection.execute("SELECT id, bssid, ssid FROM networks ORDER BY id"):
+            ids.append(network_id)
+            bssids.append(bssid)
+            ssids.append(ssid)
+        rows = np.array(self.connection.execute(
+            "SELECT network, timestamp, rssi, snr, channel FROM samples WHERE timestamp >= ? ORDER BY timestamp",
+            (since,)
+        ).fetchall(), dtype=np.float64).reshape(-1, 5)
+        columns = {
+            'bssid': np.searchsorted(np.asarray(ids, dtype=np.int64), rows[:, 0].astype(np.int64)),
+            'timestamp': rows[:, 1],
+            'rssi': rows[:, 2].astype(np.float32),
+            'snr': rows[:, 3].astype(np.float32),
+            'channel': rows[:, 4].astype(np.int16)
+        }
+        return ScanHistory.from_columns(bssids, ssids, columns, retention, capacity)
+        
+    @timed("survey_db_query", query="survey_points")
+    def survey_points(self, floor=None):
+        # The stored survey points, for interpolated heatmaps
+        where = "WHERE p.floor = ? " if floor is not None else ""
+        parameters = () if floor is None else (floor,)
+        points = SurveyPoints()
+        index = {}
+        for point_id, x, y in self.connection.execute(
+            f"SELECT p.id, p.x, p.y FROM points p {where}ORDER BY p.id", parameters
+        ):
+            index[point_id] = len(points.positions)
+            points.positions.append((x, y))
+        for point_id, bssid, rssi in self.connection.execute(
+            "SELECT p.id, n.bssid, s.rssi FROM points p JOIN samples s ON s.scan = p.scan "
+            f"JOIN networks n ON n.id = s.network {where}ORDER BY p.id", parameters
+        ):
+            points.sample_point.append(index[point_id])
+            points.sample_bssid.append(bssid)
+            points.sample_rssi.append(rssi)
+        return points
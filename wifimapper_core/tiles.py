@@ -0,0 +1,154 @@
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+# Floor plans are served from a tile pyramid cached on disk: level 0 is the
+# full-resolution image cut into tiles, each further level halves the
+# previous one, until the whole plan fits in a single tile. The source image
+# is decoded once while the pyramid is built; afterwards only tiles are read
+FLOOR_PLAN_TILE_SIZE = 512
+# Pillow's decompression bomb limit while a plan is decoded: it warns above
+# this many pixels and refuses twice as many. Its default (89 Mpx) is below
+# a large campus plan
+FLOOR_PLAN_MAX_PIXELS = 25000 * 20000
+TILE_CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "wifimapper", "tiles")
+PYRAMID_MANIFEST = "pyramid.json"
+
+
+def file_digest(file_name, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FloorPlanPyramid:
+    def __init__(self, file_name, cache_root=TILE_CACHE_ROOT, tile_size=FLOOR_PLAN_TILE_SIZE, digest=None):
+        self.file_name = file_name
+        self.tile_size = tile_size
+        self.digest = digest or file_digest(file_name)
+        self.directory = os.path.join(cache_root, f"{self.digest}-{tile_size}")
+        manifest = os.path.join(self.directory, PYRAMID_MANIFEST)
+        if not os.path.exists(manifest):
+            self.build()
+        with open(manifest) as f:
+            self.levels = [tuple(size) for size in json.load(f)['levels']]
+
+    @property
+    def size(self):
+        return self.levels[0]
+
+    def tile_path(self, level, row, col):
+        return os.path.join(self.directory, str(level), f"{row}_{col}.png")
+
+    def tile_grid(self, level):
+        width, height = self.levels[level]
+        return math.ceil(height / self.tile_size), math.ceil(width / self.tile_size)
+
+    def build(self):
+        from PIL import Image
+        # The limit is process-wide, so it is only raised for this decode
+        previous = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = FLOOR_PLAN_MAX_PIXELS
+        try:
+            with Image.open(self.file_name) as image:
+                self.levels = levels = [image.size]
+                self._write_tiles(0, image)
+        finally:
+            Image.MAX_IMAGE_PIXELS = previous
+
+        # Each further level is assembled from 2x2 blocks of the level below
+        while max(levels[-1]) > self.tile_size:
+            level = len(levels)
+            width, height = levels[-1]
+            levels.append(((width + 1) // 2, (height + 1) // 2))
+            rows, cols = self.tile_grid(level - 1)
+            for row in range(0, rows, 2):
+                for col in range(0, cols, 2):
+                    block = Image.new('RGB', (2 * self.tile_size, 2 * self.tile_size), 'white')
+                    for dr in range(min(2, rows - row)):
+                        for dc in range(min(2, cols - col)):
+                            with Image.open(self.tile_path(level - 1, row + dr, col + dc)) as tile:
+                                block.paste(tile, (dc * self.tile_size, dr * self.tile_size))
+                    tile_width = min(self.tile_size, levels[-1][0] - col // 2 * self.tile_size)
+                    tile_height = min(self.tile_size, levels[-1][1] - row // 2 * self.tile_size)
+                    block = block.reduce(2).crop((0, 0, tile_width, tile_height))
+                    self._save_tile(level, row // 2, col // 2, block)
+
+        # Written last, so an interrupted build is redone on the next load
+        with open(os.path.join(self.directory, PYRAMID_MANIFEST), 'w') as f:
+            json.dump({'source': os.path.abspath(self.file_name), 'tile_size': self.tile_size,
+                       'levels': levels}, f)
+
+    def _write_tiles(self, level, image):
+        # The image stays in its own mode (often palette or greyscale for
+        # plans); only one band of tile rows at a time is converted to RGB
+        width, height = image.size
+        for top in range(0, height, self.tile_size):
+            band = image.crop((0, top, width, min(top + self.tile_size, height))).convert('RGB')
+            for left in range(0, width, self.tile_size):
+                tile = band.crop((left, 0, min(left + self.tile_size, width), band.height))
+                self._save_tile(level, top // self.tile_size, left // self.tile_size, tile)
+
+    def _save_tile(self, level, row, col, tile):
+        path = self.tile_path(level, row, col)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tile.save(path, compress_level=1)
+
+    def load_tile(self, level, row, col):
+        from PIL import Image
+        with Image.open(self.tile_path(level, row, col)) as tile:
+            return np.asarray(tile.convert('RGB'))
+
+    def level_for_scale(self, image_pixels_per_screen_pixel):
+        # Coarsest level that still has at least one image pixel per screen pixel
+        level = int(math.floor(math.log2(max(image_pixels_per_screen_pixel, 1.0))))
+        return min(max(level, 0), len(self.levels) - 1)
+
+    def tile_rect(self, level, row, col):
+        # (x, y, width, height) of a tile in full-resolution pixels
+        scale = 2 ** level
+        width, height = self.levels[level]
+        tile_width = min(self.tile_size, width - col * self.tile_size)
+        tile_height = min(self.tile_size, height - row * self.tile_size)
+        return (col * self.tile_size * scale, row * self.tile_size * scale,
+                tile_width * scale, tile_height * scale)
+
+    def visible_tiles(self, level, left, top, right, bottom):
+        # Tiles of `level` overlapping a full-resolution pixel rectangle
+        span = self.tile_size * 2 ** level
+        rows, cols = self.tile_grid(level)
+        row0, row1 = max(int(top // span), 0), min(int(bottom // span) + 1, rows)
+        col0, col1 = max(int(left // span), 0), min(int(right // span) + 1, cols)
+        return [(row, col) for row in range(row0, row1) for col in range(col0, col1)]
+
+    def block_min_gray(self, resolution):
+        # Darkest grey level in each resolution x resolution cell, read one
+        # row of level 0 tiles at a time
+        width, height = self.levels[0]
+        rows, cols = height // resolution, width // resolution
+        result = np.empty((rows, cols), dtype=np.uint8)
+        tile_rows, tile_cols = self.tile_grid(0)
+        pending = np.empty((0, width), dtype=np.uint8)
+        done = 0
+        for row in range(tile_rows):
+            strip = np.hstack([
+                np.asarray(self._load_gray(row, col)) for col in range(tile_cols)
+            ])
+            pending = np.vstack((pending, strip))
+            usable = min(len(pending) // resolution, rows - done)
+            if usable:
+                blocks = pending[:usable * resolution, :cols * resolution]
+                result[done:done + usable] = blocks.reshape(usable, resolution, cols, resolution).min(axis=(1, 3))
+                done += usable
+                pending = pending[usable * resolution:]
+        return result
+
+    def _load_gray(self, row, col):
+        from PIL import Image
+        with Image.open(self.tile_path(0, row, col)) as tile:
+            return tile.convert('L')